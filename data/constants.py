@@ -1,6 +1,12 @@
 # Constants and configuration data
 PROFILE_PATH = "profiles.json"
+PROFILE_DB_PATH = "profiles.db"
 EPHEMERIS_PATH = './ephemeris'
+GAZETTEER_PATH = 'cache/geonames_gazetteer.sqlite'
+GEOCODE_CACHE_PATH = 'cache/geocode_cache.sqlite'
+PLACE_INDEX_PATH = 'cache/place_index'
+CHART_ARCHIVE_PATH = 'cache/charts.acar'
+EPHEMERIS_CACHE_PATH = 'cache/ephemeris'
 POSITIONSTACK_API_KEY = 'df58d69f3a320dd1da9f2e805bacf8c9'
 
 # Nakshatra data
@@ -0,0 +1,54 @@
+import time
+import numpy as np
+from datetime import datetime
+from utils.astro_calc import AstroCalc
+from utils.ashtakavarga import (AshtakavargaCalculator, BENEFIC_HOUSES, CONTRIBUTORS, PLANETS, SIGNS,
+                                ashtakavarga, transit_quality_batch)
+
+def test_chart_ashtakavarga():
+    calc = AstroCalc()
+    chart = calc.calculate_chart(datetime(1990, 5, 1, 11, 20), 28.61, 77.21, calc_type="Geocentric",
+                                 ayanamsa="Lahiri")
+    ashtakavarga_chart = AshtakavargaCalculator(chart)
+    assert ashtakavarga_chart.totals() == {"Sun": 48, "Moon": 49, "Mars": 39, "Mercury": 54,
+                                           "Jupiter": 56, "Venus": 52, "Saturn": 39}
+    bav = ashtakavarga_chart.bhinnashtakavarga()
+    sav = ashtakavarga_chart.sarvashtakavarga()
+    assert sum(sav.values()) == 337
+
+    # Counting houses by hand gives the same bindus
+    for planet in PLANETS:
+        for sign_index, sign in enumerate(SIGNS):
+            bindus = 0
+            for contributor in CONTRIBUTORS:
+                origin = SIGNS.index(chart["points"][contributor]["sign"])
+                if (sign_index - origin) % 12 + 1 in BENEFIC_HOUSES[planet][contributor]:
+                    bindus += 1
+            assert bav[planet][sign] == bindus
+    assert sav == {sign: sum(bav[planet][sign] for planet in PLANETS) for sign in SIGNS}
+
+    transits = calc.calculate_transits(chart, when=datetime(2024, 1, 1))
+    quality = ashtakavarga_chart.transit_quality(transits)
+    assert set(quality["planets"]) == set(PLANETS)
+    assert quality["score"] == sum(bav[p][transits[p]["sign"]] - 4 for p in PLANETS)
+    print(f"\nSAV: {list(sav.values())}, transit score {quality['score']}")
+
+def test_batch():
+    rng = np.random.default_rng(7)
+    signs = rng.integers(0, 12, size=(100000, 8))
+    start = time.perf_counter()
+    bav, sav = ashtakavarga(signs)
+    elapsed = time.perf_counter() - start
+    print(f"\n100k charts in {elapsed:.3f}s")
+    assert bav.shape == (100000, 7, 12) and sav.shape == (100000, 12)
+    assert (sav.sum(axis=1) == 337).all()
+    single_bav, single_sav = ashtakavarga(signs[123])
+    assert np.array_equal(single_bav, bav[123]) and np.array_equal(single_sav, sav[123])
+
+    transit_signs = rng.integers(0, 12, size=7)
+    scores = transit_quality_batch(signs, transit_signs)
+    assert scores[5] == sum(bav[5, i, transit_signs[i]] - 4 for i in range(7))
+
+if __name__ == "__main__":
+    test_chart_ashtakavarga()
+    test_batch()
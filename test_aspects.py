@@ -0,0 +1,59 @@
+from datetime import datetime
+import numpy as np
+from utils.astro_calc import AstroCalc
+from utils.aspects import AspectEngine
+
+def point(longitude):
+    return {"longitude": longitude}
+
+def test_aspect_matrix():
+    engine = AspectEngine(orbs={"Sextile": 3})
+    points = {"Sun": point(10.0), "Moon": point(128.0), "Mars": point(355.0),
+              "Jupiter": point(193.5), "Saturn": point(72.0)}
+    result = engine.compute(points)
+    found = {(a["from"], a["to"]): (a["aspect"], round(a["orb"], 6)) for a in result["aspects"]}
+    assert found == {
+        ("Sun", "Moon"): ("Trine", 2.0),
+        ("Sun", "Jupiter"): ("Opposition", 3.5),
+        ("Sun", "Saturn"): ("Sextile", 2.0),
+        ("Jupiter", "Saturn"): ("Trine", 1.5)
+    }
+    # Moon - Saturn is 56 degrees apart, outside the 3 degree sextile orb
+    assert ("Moon", "Saturn") not in found
+    # The matrices are symmetric within one chart and each pair is listed once
+    assert np.allclose(result["distance"], result["distance"].T)
+    assert all(a["from"] != a["to"] for a in result["aspects"])
+
+    # Graha drishti by whole signs: Mars (Pisces) aspects the 4th, 7th and 8th signs
+    drishti = {(d["from"], d["to"]): d["houses"] for d in result["drishti_aspects"]}
+    assert drishti[("Mars", "Saturn")] == 4
+    assert drishti[("Saturn", "Mars")] == 10
+    assert ("Moon", "Sun") not in drishti
+    assert drishti[("Sun", "Jupiter")] == 7
+    assert drishti[("Jupiter", "Sun")] == 7
+
+def test_chart_transit_and_synastry():
+    calc = AstroCalc()
+    chart = calc.calculate_chart(datetime(1990, 5, 1, 11, 20), 28.61, 77.21, calc_type="Geocentric",
+                                 ayanamsa="Krishnamurti")
+    other = calc.calculate_chart(datetime(1992, 8, 15, 6, 45), 19.07, 72.88, calc_type="Geocentric",
+                                 ayanamsa="Krishnamurti")
+    engine = AspectEngine()
+    result = engine.chart_aspects(chart)
+    assert ("Rahu", "Ketu", "Opposition") in [(a["from"], a["to"], a["aspect"]) for a in result["aspects"]]
+    for found in result["aspects"]:
+        first = chart["points"][found["from"]]["longitude"]
+        second = chart["points"][found["to"]]["longitude"]
+        distance = abs((first - second + 180) % 360 - 180)
+        assert abs(abs(distance - found["angle"]) - found["orb"]) < 1e-9
+
+    synastry = engine.synastry(chart, other)
+    assert synastry["distance"].shape == (len(chart["points"]), len(other["points"]))
+    transits = calc.calculate_transits(chart, when=datetime(2024, 1, 1))
+    result = engine.transit_aspects(chart, transits)
+    assert result["first"] == list(transits) and result["second"] == list(chart["points"])
+    print(f"\n{len(synastry['aspects'])} synastry aspects, {len(result['aspects'])} transit aspects")
+
+if __name__ == "__main__":
+    test_aspect_matrix()
+    test_chart_transit_and_synastry()
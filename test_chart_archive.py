@@ -0,0 +1,57 @@
+import os
+import tempfile
+import numpy as np
+from datetime import datetime, timedelta
+from utils.astro_calc import AstroCalc
+from utils.chart_archive import ChartArchive
+
+def test_chart_archive():
+    calc = AstroCalc()
+    charts = [calc.calculate_chart(datetime(1960, 1, 1) + timedelta(days=97 * i), 10 + i * 0.5, 70,
+                                   house_system=["Placidus", "Koch"][i % 2])
+              for i in range(12)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "charts.acar")
+        writer = ChartArchive(path, writable=True, astro_calc=calc)
+        try:
+            ChartArchive(path, writable=True)
+            assert False, "second writer should be refused"
+        except RuntimeError as e:
+            print(f"\n{e}")
+
+        writer.append_many((profile_id, chart) for profile_id, chart in enumerate(charts[:8], 1))
+        reader = ChartArchive(path, astro_calc=calc)
+        assert len(reader) == 8 and reader.chart(3) == charts[2]
+
+        # The reader picks up later appends, replacements and deletions
+        writer.append(3, charts[8])
+        writer.append(50, charts[9])
+        writer.delete(4)
+        assert reader.chart(3) == charts[8] and reader.chart(50) == charts[9]
+        assert reader.chart(4) is None and reader.chart(999) is None
+        assert list(reader.ids()) == [1, 2, 3, 5, 6, 7, 8, 50]
+
+        # Column scans are views of the mapped records
+        moon = reader.bodies.index("Moon")
+        assert np.shares_memory(reader["longitude"], reader.records)
+        assert reader["longitude"][reader.live_positions(), moon].shape == (8,)
+
+        writer.compact()
+        assert writer.count == 8
+        assert reader.chart(3) == charts[8] and reader.chart(1) == charts[0]
+        writer.close()
+
+        # A torn append and a stale index are repaired by the next writer
+        with open(path, "ab") as f:
+            f.write(b"\1" * 100)
+        with open(path + ".idx", "r+b") as f:
+            f.seek(8)
+            f.write(bytes(8))
+        writer = ChartArchive(path, writable=True, astro_calc=calc)
+        assert os.path.getsize(path) == 4096 + 8 * writer.dtype.itemsize
+        assert writer.chart(50) == charts[9] and writer.chart(4) is None
+        writer.close()
+
+if __name__ == "__main__":
+    test_chart_archive()
@@ -0,0 +1,53 @@
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from utils.chart_cli import main
+from utils.chart_columns import ChartColumns
+
+RECORDS = [
+    {"name": "mihir", "datetime": "20/12/1969 22:55:00", "latitude": "20° 15' 37\" N", "longitude": "85° 50' 22\" E"},
+    {"name": "bad", "datetime": "not a date", "latitude": 1, "longitude": 2},
+    {"name": "london", "datetime": "1990-01-01T00:00:00", "latitude": 51.5, "longitude": -0.1, "house_system": "Koch"},
+]
+
+def test_chart_cli():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(record) + "\n" for record in RECORDS)
+
+        output_path = os.path.join(tmp, "charts.jsonl")
+        assert main([input_path, "-o", output_path, "--dasha-levels", "2"]) == 0
+        with open(output_path, encoding="utf-8") as f:
+            results = [json.loads(line) for line in f]
+        assert [r["name"] for r in results] == ["mihir", "bad", "london"]
+        assert results[0]["chart"]["points"]["Moon"]["sign"] == "Taurus"
+        assert len(results[0]["dashas"]) == 9 and len(results[0]["dashas"][0]["sub_dashas"]) == 9
+        assert results[0]["dashas"][0]["sub_dashas"][0]["sub_dashas"] == []
+        assert set(results[0]["house_strengths"]) >= {"Moon", "Sun", "Rahu", "Ketu"}
+        assert "error" in results[1]
+        assert results[2]["chart"]["meta"]["house_system"] == "Koch"
+
+        csv_path = os.path.join(tmp, "charts.csv")
+        assert main([input_path, "-o", csv_path, "-f", "csv", "--no-strengths"]) == 0
+        with open(csv_path, encoding="utf-8") as f:
+            assert len(f.readlines()) == 4
+
+        columns_path = os.path.join(tmp, "charts.acol")
+        assert main([input_path, "-o", columns_path, "-f", "columnar"]) == 0
+        columns = ChartColumns(columns_path)
+        assert len(columns) == 3 and list(columns["valid"]) == [1, 0, 1]
+        assert columns.name(2) == "london"
+        assert columns.labels("sign")[0, columns.body_index("Moon")] == "Taurus"
+
+    # Only the compute core is imported
+    code = "import sys, utils.chart_cli; print(sorted(m for m in ('PyQt6', 'kerykeion', 'pandas') if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    print(f"\nGUI/heavy modules loaded by the CLI: {loaded}")
+    assert loaded == "[]"
+
+if __name__ == "__main__":
+    test_chart_cli()
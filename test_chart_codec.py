@@ -0,0 +1,29 @@
+import json
+from datetime import datetime
+from utils.astro_calc import AstroCalc
+from utils.chart_codec import encode_chart, decode_chart, chart_settings_hash
+
+def test_chart_codec():
+    calc = AstroCalc()
+    birth_dt = datetime(1969, 12, 20, 22, 55, 0)
+    lat, lon = 20.260277777777777, 85.83944444444444
+
+    for settings in [
+        {},
+        {"zodiac": "Tropical", "house_system": "Koch", "node_type": "Mean Node (Rahu/Ketu)"},
+        {"calc_type": "Geocentric", "ayanamsa": "Krishnamurti", "house_system": "Whole Sign"},
+    ]:
+        chart = calc.calculate_chart(birth_dt, lat, lon, **settings)
+        snapshot = encode_chart(chart)
+        print(f"\n{settings}: {len(snapshot)} bytes (JSON {len(json.dumps(chart))} bytes)")
+        assert decode_chart(snapshot, calc) == chart
+
+    # The hash changes with any input or setting
+    inputs = {"dt": birth_dt, "lat": lat, "lon": lon, "calc_type": "Topocentric", "zodiac": "Sidereal",
+              "ayanamsa": "Lahiri", "house_system": "Placidus", "node_type": "True Node (Rahu/Ketu)"}
+    assert chart_settings_hash(**inputs) == chart_settings_hash(**dict(inputs))
+    assert chart_settings_hash(**inputs) != chart_settings_hash(**dict(inputs, house_system="Koch"))
+    assert chart_settings_hash(**inputs) != chart_settings_hash(**dict(inputs, lat=lat + 0.001))
+
+if __name__ == "__main__":
+    test_chart_codec()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import numpy as np
+from datetime import datetime, timedelta
+from utils.astro_calc import AstroCalc
+from utils.chart_columns import ChartColumnWriter, ChartColumns
+
+def test_chart_columns():
+    calc = AstroCalc()
+    charts = [calc.calculate_chart(datetime(1960, 1, 1) + timedelta(days=97 * i, minutes=13 * i),
+                                   10 + i * 0.5, 70 + i * 0.25,
+                                   house_system=["Placidus", "Koch", "Whole Sign"][i % 3])
+              for i in range(40)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "charts.acol")
+        writer = ChartColumnWriter(path, chunk_size=16)
+        writer.write(None, "failed first")
+        for i, chart in enumerate(charts):
+            writer.write(chart, f"chart {i}")
+            assert len(writer.name_offsets) < 16  # Spilled like the other columns
+        writer.close()
+
+        columns = ChartColumns(path)
+        print(f"\n{len(columns)} charts, {os.path.getsize(path)} bytes")
+        assert len(columns) == 41
+        assert isinstance(columns["longitude"], np.memmap)
+        assert columns["longitude"].shape == (41, 13) and columns["cusp"].shape == (41, 12)
+        assert columns.chart(0, calc) is None and columns.name(0) == "failed first"
+        # Speeds come from the chart engine; failed rows and the Ascendant have none
+        assert np.isnan(columns["speed"][0]).all() and np.isnan(columns["speed"][:, 0]).all()
+        assert list(columns["speed"][1:, columns.body_index("Moon")]) == \
+            [c["points"]["Moon"]["speed"] for c in charts]
+
+        # Column scans agree with the chart dicts
+        moon = columns.body_index("Moon")
+        assert list(columns["longitude"][1:, moon]) == [c["points"]["Moon"]["longitude"] for c in charts]
+        assert list(columns.labels("star_lord")[1:, moon]) == [c["points"]["Moon"]["star_lord"] for c in charts]
+        assert list(columns.labels("cusp_sub_lord")[1:, 0]) == [c["houses"]["House_1"]["sub_lord"] for c in charts]
+
+        # Every row round-trips to the same dict
+        for row, chart in enumerate(charts, 1):
+            assert columns.name(row) == f"chart {row - 1}"
+            assert columns.chart(row, calc) == chart
+        del columns
+
+if __name__ == "__main__":
+    test_chart_columns()
@@ -0,0 +1,90 @@
+import os
+import json
+import tempfile
+from utils.chart_cli import JsonlWriter
+from utils.chart_pipeline import ChartPipeline
+
+class Crash(Exception):
+    pass
+
+class CrashingPipeline(ChartPipeline):
+    """Dies after a number of chunks, like a killed run"""
+
+    def results(self, records):
+        for number, item in enumerate(super().results(records)):
+            if number == 3:
+                raise Crash()
+            yield item
+
+def test_chart_pipeline():
+    with tempfile.TemporaryDirectory() as tmp:
+        input_path = os.path.join(tmp, "records.jsonl")
+        with open(input_path, "w", encoding="utf-8") as f:
+            for i in range(15):
+                record = {"name": f"person {i}", "datetime": f"{1 + i:02d}/06/19{50 + i} 0{i % 10}:30",
+                          "latitude": 10 + i, "longitude": 75 + i / 2}
+                if i == 4:
+                    record["latitude"] = "north"
+                f.write(json.dumps(record) + "\n")
+
+        def read(path):
+            with open(path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f]
+
+        expected_path = os.path.join(tmp, "expected.jsonl")
+        assert ChartPipeline(workers=0, chunk_size=2).run([input_path], expected_path, JsonlWriter) == (15, 1)
+        expected = read(expected_path)
+        assert [r["name"] for r in expected] == [f"person {i}" for i in range(15)]
+
+        # A process pool gives the same results in the same order
+        pooled_path = os.path.join(tmp, "pooled.jsonl")
+        assert ChartPipeline(workers=2, chunk_size=2, max_pending=2).run(
+            [input_path], pooled_path, JsonlWriter) == (15, 1)
+        assert read(pooled_path) == expected
+
+        # An interrupted run resumes from its checkpoint
+        output_path = os.path.join(tmp, "charts.jsonl")
+        checkpoint_path = os.path.join(tmp, "charts.checkpoint")
+        try:
+            CrashingPipeline(workers=0, chunk_size=2).run(
+                [input_path], output_path, JsonlWriter, checkpoint_path, checkpoint_every=0)
+            assert False, "the run should have crashed"
+        except Crash:
+            pass
+        with open(checkpoint_path, encoding="utf-8") as f:
+            state = json.load(f)
+        with open(input_path, "rb") as f:
+            done = b"".join(f.readline() for _ in range(6))
+        assert state["records"] == 6 and state["position"] == [0, len(done)]
+        # The resumed run seeks past the written records instead of reading
+        # them again: blanking them out doesn't change the result
+        with open(input_path, "r+b") as f:
+            f.write(b" " * (len(done) - 1) + b"\n")
+        with open(output_path, "a", encoding="utf-8") as f:
+            f.write('{"name": "half written')
+        assert ChartPipeline(workers=0, chunk_size=2).run(
+            [input_path], output_path, JsonlWriter, checkpoint_path) == (15, 1)
+        assert read(output_path) == expected
+        assert not os.path.exists(checkpoint_path)
+
+        # CSV inputs resume the same way, keeping their header
+        csv_path = os.path.join(tmp, "records.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            f.write("Name,Datetime,Latitude,Longitude\r\n")
+            for i in range(15):
+                f.write(f"person {i},\"{1 + i:02d}/06/19{50 + i} 0{i % 10}:30\",{10 + i},75\r\n")
+        csv_output = os.path.join(tmp, "csv.jsonl")
+        full_output = os.path.join(tmp, "csv_full.jsonl")
+        ChartPipeline(workers=0, chunk_size=2).run([csv_path], full_output, JsonlWriter)
+        try:
+            CrashingPipeline(workers=0, chunk_size=2).run(
+                [csv_path], csv_output, JsonlWriter, checkpoint_path, checkpoint_every=0)
+            assert False, "the run should have crashed"
+        except Crash:
+            pass
+        assert ChartPipeline(workers=0, chunk_size=2).run(
+            [csv_path], csv_output, JsonlWriter, checkpoint_path) == (15, 0)
+        assert read(csv_output) == read(full_output)
+
+if __name__ == "__main__":
+    test_chart_pipeline()
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import contextlib
+import numpy as np
+from datetime import datetime, timedelta
+from utils.astro_calc import AstroCalc
+from utils.aspects import AspectEngine
+from utils.chart_columns import ChartColumnWriter, ChartColumns
+from utils.compatibility import (CompatibilityEngine, KOOTAS, KOOTA_POINTS, KOOTA_TABLE, GUNA_TABLE,
+                                 YONI_SCORES, ASPECT_HARMONY)
+
+def test_koota_table():
+    assert KOOTA_TABLE.shape == (8, 108, 108)
+    for index, koota in enumerate(KOOTAS):
+        assert KOOTA_TABLE[index].max() == KOOTA_POINTS[koota]
+    assert np.array_equal(np.array(YONI_SCORES), np.array(YONI_SCORES).T)
+    # Groom's Moon in Rohini 1 (Taurus), bride's in Hasta 1 (Virgo)
+    scores = dict(zip(KOOTAS, KOOTA_TABLE[:, 3 * 4, 12 * 4]))
+    assert scores == {"Varna": 1, "Vashya": 1, "Tara": 3, "Yoni": 1, "Graha Maitri": 5,
+                      "Gana": 5, "Bhakoot": 0, "Nadi": 8}
+    assert GUNA_TABLE[12, 48] == 24
+    # The same nakshatra shares a nadi
+    assert (KOOTA_TABLE[7][np.arange(108), np.arange(108)] == 0).all()
+
+def test_top_matches():
+    calc = AstroCalc()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profiles.acol")
+        writer = ChartColumnWriter(path)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for i in range(60):
+                writer.write(calc.calculate_chart(datetime(1980, 1, 1) + timedelta(days=41 * i, minutes=97 * i),
+                                                  20 + i % 10, 75, calc_type="Geocentric"), f"person {i}")
+        writer.write(None, "failed")
+        writer.close()
+
+        columns = ChartColumns(path)
+        engine = CompatibilityEngine(columns)
+        result = engine.top_matches(k=5, block_size=16)
+        assert result["match"].shape == (61, 5)
+        assert (result["match"][60] == -1).all()
+
+        # Brute force over pairs for a few people
+        aspects = AspectEngine()
+        bodies = [columns.body_index(body) for body in engine.bodies]
+        for row in (0, 17, 42):
+            scores = []
+            for other in range(60):
+                if other == row:
+                    continue
+                guna = engine.kootas(row, other)
+                found = aspects.compute(
+                    {f"a{i}": {"longitude": columns["longitude"][row, i]} for i in bodies},
+                    {f"b{i}": {"longitude": columns["longitude"][other, i]} for i in bodies})
+                harmony = sum(ASPECT_HARMONY[a["aspect"]] for a in found["aspects"])
+                scores.append((sum(guna.values()) + 0.25 * harmony, other))
+            best = sorted(scores, key=lambda score: -score[0])[:5]
+            assert np.allclose(result["score"][row], [score for score, _ in best])
+            ranked = engine.ranked(row, k=5)
+            assert ranked[0]["name"] == columns.name(ranked[0]["row"])
+            assert ranked[0]["score"] == best[0][0]
+        print(f"\nBest match of {columns.name(0)}: {engine.ranked(0, 1)}")
+
+        pooled = CompatibilityEngine(path).top_matches(k=5, workers=2, block_size=16)
+        assert np.array_equal(pooled["score"], result["score"])
+
+        # Workers use the caller's aspects and orbs
+        custom = AspectEngine({"Conjunction": 0, "Square": 90}, {"Conjunction": 2, "Square": 12})
+        serial = CompatibilityEngine(path, engine=custom).top_matches(k=5, block_size=16)
+        pooled = CompatibilityEngine(path, engine=custom).top_matches(k=5, workers=2, block_size=16)
+        assert np.array_equal(pooled["score"], serial["score"])
+        assert not np.array_equal(serial["score"], result["score"])
+
+if __name__ == "__main__":
+    test_koota_table()
+    test_top_matches()
@@ -0,0 +1,50 @@
+import tempfile
+import numpy as np
+from utils.astro_calc import AstroCalc
+from utils.ephemeris_cache import EphemerisCache
+
+def test_ephemeris_cache():
+    calc = AstroCalc()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = EphemerisCache(cache_dir, 2000, 2004)
+        julian_days = np.linspace(cache.start_jd, cache.end_jd - 0.01, 500)
+
+        for body in ["Sun", "Moon", "Mercury", "Saturn", "Rahu", "Ketu"]:
+            expected, expected_speed = calc.body_positions(body, julian_days, "Sidereal", "Lahiri")
+            calc.use_ephemeris_cache(cache)
+            longitude, speed = calc.body_positions(body, julian_days, "Sidereal", "Lahiri")
+            calc.use_ephemeris_cache(None)
+            error = np.max(np.abs((longitude - expected + 180) % 360 - 180)) * 3600
+            print(f"\n{body}: max error {error:.4f}\"")
+            assert error < 3, body
+            assert np.max(np.abs(speed - expected_speed)) < 0.001, body
+
+        # Rahu and Ketu are opposite; the cache reopens from disk
+        cache = EphemerisCache(cache_dir, 2000, 2004)
+        rahu, _ = cache.longitudes("Rahu", julian_days, "Tropical")
+        ketu, _ = cache.longitudes("Ketu", julian_days, "Tropical")
+        assert np.allclose((ketu - rahu) % 360, 180)
+        bounds = cache.error_bounds()
+        assert bounds["Moon"] < 0.01 and bounds["ayanamsa:Lahiri"] < 0.01
+        # The bound covers every segment: it is the largest error halfway
+        # between the nodes of all of them, not of a sample
+        segment, degree, position = cache.series("Saturn")
+        coefficients = cache.table("Saturn")
+        index = np.repeat(np.arange(len(coefficients)), degree)
+        t = np.tile(np.cos(np.pi * np.arange(1, degree + 1) / (degree + 1)), len(coefficients))
+        actual = np.array([position(cache.start_jd + (i + (x + 1) / 2) * segment) for i, x in zip(index, t)])
+        errors = np.abs((cache.clenshaw(coefficients, index, t) - actual + 180) % 360 - 180) * 3600
+        assert np.isclose(errors.max(), bounds["Saturn"])
+
+        # Outside the span AstroCalc falls back to Swiss Ephemeris
+        calc.use_ephemeris_cache(cache)
+        longitude, _ = calc.body_positions("Sun", [cache.end_jd + 100])
+        assert 0 <= longitude[0] < 360
+        try:
+            cache.evaluate("Sun", [cache.end_jd + 100])
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+if __name__ == "__main__":
+    test_ephemeris_cache()
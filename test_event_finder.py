@@ -0,0 +1,51 @@
+from datetime import datetime, timezone
+import numpy as np
+from utils.event_finder import EventFinder
+from utils.kp import KP_SUBS, kp_sub
+
+def test_kp_subs():
+    assert len(KP_SUBS) == 249 and KP_SUBS[-1]["end"] == 360
+    assert kp_sub(0.5)["sub_lord"] == "Ketu" and kp_sub(0.8)["sub_lord"] == "Venus"
+    # Sub 10 opens Bharani; sign boundaries split subs (e.g. at 30° inside Krittika)
+    assert KP_SUBS[9]["nakshatra"] == "Bharani" and KP_SUBS[9]["sub_lord"] == "Venus"
+    assert kp_sub(29.99)["sub_lord"] == kp_sub(30.01)["sub_lord"]
+    assert kp_sub(29.99)["number"] + 1 == kp_sub(30.01)["number"]
+
+def test_events():
+    finder = EventFinder()
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    events = finder.events(start, datetime(2024, 1, 8, tzinfo=timezone.utc), bodies=["Moon", "Sun"])
+    print(f"\n{len(events)} events in a week")
+    times = [event["julian_day"] for event in events]
+    assert times == sorted(times)
+
+    for event in events:
+        longitudes, _ = finder.positions(event["body"], [event["julian_day"] - 1e-4, event["julian_day"] + 1e-4])
+        offsets = (longitudes - event["longitude"] + 180) % 360 - 180
+        assert offsets[0] < 0 < offsets[1], event
+        if event["kind"] == "sub":
+            assert kp_sub(longitudes[1])["sub_lord"] == event["to"]
+            assert kp_sub(longitudes[0])["sub_lord"] == event["from"]
+        if event["kind"] == "sign":
+            assert finder.calc.signs[int(longitudes[1] / 30)] == event["to"]
+
+    moon_signs = [event for event in events if event["body"] == "Moon" and event["kind"] == "sign"]
+    assert 3 <= len(moon_signs) <= 4
+    assert list(finder.stream(start, datetime(2024, 1, 8, tzinfo=timezone.utc), ["Moon", "Sun"],
+                              window_days=2)) == events
+
+def test_retrograde_ingress():
+    # Mercury turns retrograde in April 2024 and backs out of sidereal Aries
+    finder = EventFinder()
+    events = finder.events(datetime(2024, 3, 1, tzinfo=timezone.utc), datetime(2024, 6, 1, tzinfo=timezone.utc),
+                           bodies=["Mercury"], kinds=["sign"])
+    print([(event["time"].date().isoformat(), event["to"], event["retrograde"]) for event in events])
+    assert [(event["from"], event["to"], event["retrograde"]) for event in events] == [
+        ("Aquarius", "Pisces", False), ("Pisces", "Aries", False), ("Aries", "Pisces", True),
+        ("Pisces", "Aries", False), ("Aries", "Taurus", False)]
+    assert np.all(np.diff([event["julian_day"] for event in events]) > 0)
+
+if __name__ == "__main__":
+    test_kp_subs()
+    test_events()
+    test_retrograde_ingress()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+from utils.gazetteer import Gazetteer
+
+# A few rows in GeoNames dump format (19 tab separated columns)
+SAMPLE_DUMP = [
+    ["1275817", "Bhubaneswar", "Bhubaneswar", "Bhubaneshwar,Bhubaneswar,भुवनेश्वर", "20.27241", "85.83385",
+     "P", "PPLA", "IN", "", "21", "", "", "", "837737", "", "45", "Asia/Kolkata", "2020-06-10"],
+    ["1259184", "Puri", "Puri", "Jagannath Puri,Puri", "19.8", "85.81667",
+     "P", "PPL", "IN", "", "21", "", "", "", "201026", "", "5", "Asia/Kolkata", "2019-09-05"],
+    ["4999999", "Puri", "Puri", "", "10.0", "-70.0",
+     "P", "PPL", "VE", "", "00", "", "", "", "1200", "", "5", "America/Caracas", "2019-09-05"],
+]
+
+SAMPLE_COUNTRIES = [
+    ["IN", "IND", "356", "IN", "India"],
+    ["VE", "VEN", "862", "VE", "Venezuela"],
+    ["JP", "JPN", "392", "JA", "Japan"],
+]
+
+def test_gazetteer_lookup():
+    with tempfile.TemporaryDirectory() as tmp:
+        dump_path = os.path.join(tmp, "cities.txt")
+        countries_path = os.path.join(tmp, "countryInfo.txt")
+        with open(dump_path, "w", encoding="utf-8") as f:
+            f.writelines("\t".join(row) + "\n" for row in SAMPLE_DUMP)
+        with open(countries_path, "w", encoding="utf-8") as f:
+            f.write("#ISO\tISO3\tISO-Numeric\tfips\tCountry\n")
+            f.writelines("\t".join(row) + "\n" for row in SAMPLE_COUNTRIES)
+
+        gazetteer = Gazetteer(os.path.join(tmp, "gazetteer.sqlite"))
+        assert gazetteer.load_geonames(dump_path, countries_path) == 3
+
+        start = time.perf_counter()
+        place = gazetteer.lookup("bhubaneswar, india")
+        elapsed = time.perf_counter() - start
+        print(f"\nbhubaneswar, india -> {place['latitude']}, {place['longitude']} in {elapsed * 1000:.3f} ms")
+        assert place["name"] == "Bhubaneswar"
+
+        # Alternate names, ISO codes and population ranking
+        assert gazetteer.lookup("Bhubaneshwar, IN")["geonameid"] == 1275817
+        assert gazetteer.lookup("puri")["country_code"] == "IN"
+        assert gazetteer.lookup("Puri, Venezuela")["country_code"] == "VE"
+        assert gazetteer.lookup("atlantis") is None
+        # A recognized country without the place is no match, not a worldwide one
+        assert gazetteer.lookup("Puri, Japan") is None
+        assert gazetteer.lookup("Puri, TX") is None
+        assert gazetteer.lookup("Puri, Japan", limit=5) == []
+        # An unrecognized country part is ignored
+        assert gazetteer.lookup("Puri, Atlantis")["country_code"] == "IN"
+        gazetteer.close()
+
+if __name__ == "__main__":
+    test_gazetteer_lookup()
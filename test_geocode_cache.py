@@ -0,0 +1,38 @@
+import os
+import tempfile
+from utils.geocode_cache import GeocodeCache, CachedGeocoder
+
+KNOWN = {"bhubaneswar, india": {"latitude": 20.27, "longitude": 85.83, "name": "Bhubaneswar"}}
+
+def test_geocode_cache():
+    calls = []
+
+    def fake_provider(query):
+        calls.append(query)
+        return KNOWN.get(query.lower())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = GeocodeCache(os.path.join(tmp, "geocode.sqlite"))
+        geocoder = CachedGeocoder(fake_provider, cache=cache, min_interval=0)
+
+        # Duplicates (after normalization) go to the network only once
+        cities = ["Bhubaneswar, India", "bhubaneswar ,india ", "Atlantis", "ATLANTIS", ""]
+        results = geocoder.resolve_many(cities)
+        print(f"\n{len(cities)} cities -> {len(calls)} provider calls")
+        assert len(calls) == 2
+        assert results["bhubaneswar ,india "]["latitude"] == 20.27
+        assert results["ATLANTIS"] is None and results[""] is None
+
+        # Found and not-found results are both served from the cache now
+        assert geocoder.resolve("BHUBANESWAR, India")["longitude"] == 85.83
+        assert geocoder.resolve("atlantis") is None
+        assert len(calls) == 2
+
+        # ... and survive a restart
+        cache.conn.close()
+        geocoder = CachedGeocoder(fake_provider, cache=GeocodeCache(cache.db_path), min_interval=0)
+        assert geocoder.resolve("Bhubaneswar, India")["name"] == "Bhubaneswar"
+        assert len(calls) == 2
+
+if __name__ == "__main__":
+    test_geocode_cache()
@@ -0,0 +1,52 @@
+from datetime import datetime
+import swisseph as swe
+from utils.astro_calc import AstroCalc
+from utils.house_strength import HouseStrengthCalculator
+from utils.kp import KP_SUBS, horary_sub, kp_sub
+from test_house_sweep import cusp_house
+
+def test_horary_chart():
+    calc = AstroCalc()
+    question = datetime(2024, 4, 15, 12, 0)
+    natal = calc.calculate_chart(question, 51.5, -0.13, calc_type="Geocentric", ayanamsa="Krishnamurti")
+    for number in (1, 2, 57, 123, 249):
+        chart = calc.calculate_horary_chart(number, question, 51.5, -0.13, calc_type="Geocentric")
+        first = chart["houses"]["House_1"]
+        assert kp_sub(first["longitude"])["number"] == number
+        assert first["sub_lord"] == horary_sub(number)["sub_lord"]
+        assert chart["points"]["Ascendant"]["longitude"] == horary_sub(number)["start"]
+        # Planets are those of the moment of the question
+        assert chart["points"]["Moon"]["longitude"] == natal["points"]["Moon"]["longitude"]
+        assert chart["meta"]["horary_number"] == number
+        assert len(HouseStrengthCalculator(chart).calculate_all()) == 9
+        # Occupancy follows the horary cusps
+        cusps = [chart["houses"][f"House_{house}"]["longitude"] for house in range(1, 13)]
+        for name, point in chart["points"].items():
+            if name != "Ascendant":
+                assert point["house"] == cusp_house(point["longitude"], cusps), (number, name)
+
+    # The cusps are the location's houses when that degree rises
+    chart = calc.calculate_horary_chart(123, question, 51.5, -0.13, calc_type="Geocentric")
+    obliquity = swe.calc(2460415.77, swe.ECL_NUT, 0)[0][0]
+    armc = calc.armc_for_ascendant(horary_sub(123)["start"] + chart["meta"]["ayanamsa_value"], 51.5, obliquity)
+    ascendant = swe.houses_armc(armc, 51.5, obliquity, b'P')[1][0] - chart["meta"]["ayanamsa_value"]
+    assert abs(ascendant - horary_sub(123)["start"]) < 1e-7
+    print(f"\nHorary 123: cusp 1 {chart['houses']['House_1']['longitude']:.4f}, "
+          f"cusp 10 {chart['houses']['House_10']['longitude']:.4f}")
+
+    try:
+        calc.calculate_horary_chart(250, question, 51.5, -0.13)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+def test_chart_sub_lords_follow_kp():
+    calc = AstroCalc()
+    for sub in KP_SUBS:
+        data = calc.get_nakshatra_data(sub["start"])
+        assert (data["nakshatra"], data["star_lord"], data["sub_lord"]) == \
+            (sub["nakshatra"], sub["star_lord"], sub["sub_lord"]), sub
+
+if __name__ == "__main__":
+    test_horary_chart()
+    test_chart_sub_lords_follow_kp()
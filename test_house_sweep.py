@@ -0,0 +1,45 @@
+from utils.astro_calc import AstroCalc
+from datetime import datetime
+
+def cusp_house(longitude, cusps):
+    """House of a longitude read straight off the chart's cusps"""
+    for house in range(12):
+        start, end = cusps[house], cusps[(house + 1) % 12]
+        if (longitude - start) % 360 < (end - start) % 360:
+            return house + 1
+
+def test_house_sweep():
+    calc = AstroCalc()
+    birth_dt = datetime(1969, 12, 20, 22, 55, 0)
+    lat, lon = 20.260277777777777, 85.83944444444444
+
+    # One sweep covers every house system
+    sweep = calc.calculate_house_sweep(birth_dt, lat, lon)
+    systems = sweep["systems"]
+    print(f"\nSweep: {len(systems)} systems x {len(sweep['bodies'])} bodies")
+    assert sweep["cusps"].shape == (len(calc.house_system_map), 12)
+    assert sweep["placements"].shape == (len(systems), len(sweep["bodies"]))
+
+    # Every system must match a full calculate_chart call
+    for house_system in systems:
+        chart = calc.calculate_chart(birth_dt, lat, lon, house_system=house_system)
+        swept = calc.chart_from_sweep(sweep, house_system)
+        print(f"{house_system:28}: House 1 at {swept['houses']['House_1']['longitude']:.2f}°")
+        assert swept == chart
+
+        # Planets sit in the houses the chart's own cusps show
+        cusps = [chart["houses"][f"House_{house}"]["longitude"] for house in range(1, 13)]
+        for name, point in chart["points"].items():
+            if name != "Ascendant":
+                assert point["house"] == cusp_house(point["longitude"], cusps), (house_system, name)
+
+    # Empty or unknown system lists are rejected before any calculation
+    for house_systems in ([], ["Placidus", "Nowhere"]):
+        try:
+            calc.calculate_house_sweep(birth_dt, lat, lon, house_systems=house_systems)
+            assert False, "expected ValueError"
+        except ValueError as e:
+            print(f"{house_systems}: {e}")
+
+if __name__ == "__main__":
+    test_house_sweep()
@@ -0,0 +1,69 @@
+import os
+import tempfile
+import time
+from utils.gazetteer import Gazetteer
+from utils.geocode_cache import GeocodeCache
+from utils.place_index import PlaceIndex
+from test_gazetteer import SAMPLE_DUMP, SAMPLE_COUNTRIES
+
+def test_place_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        dump_path = os.path.join(tmp, "cities.txt")
+        with open(dump_path, "w", encoding="utf-8") as f:
+            f.writelines("\t".join(row) + "\n" for row in SAMPLE_DUMP)
+        countries_path = os.path.join(tmp, "countryInfo.txt")
+        with open(countries_path, "w", encoding="utf-8") as f:
+            f.writelines("\t".join(row) + "\n" for row in SAMPLE_COUNTRIES)
+        gazetteer_path = os.path.join(tmp, "gazetteer.sqlite")
+        gazetteer = Gazetteer(gazetteer_path)
+        gazetteer.load_geonames(dump_path, countries_path)
+        gazetteer.close()
+
+        cache_path = os.path.join(tmp, "geocode.sqlite")
+        cache = GeocodeCache(cache_path)
+        cache.put("Bhadrak, Odisha", {"latitude": 21.05, "longitude": 86.5, "name": "Bhadrak"})
+        cache.put("Bhagalpur", None)  # Not found results are never suggested
+        cache.conn.close()
+
+        index = PlaceIndex(os.path.join(tmp, "index"), gazetteer_path, cache_path)
+        start = time.perf_counter()
+        suggestions = index.suggest("bh")
+        elapsed = time.perf_counter() - start
+        print(f"\nbh -> {suggestions} in {elapsed * 1000:.3f} ms (including build)")
+        assert suggestions == ["Bhadrak, Odisha", "Bhubaneswar, IN"]
+
+        # Alternate names, accents and population order; one entry per place
+        assert index.suggest("Bhubaneshw") == ["Bhubaneswar, IN"]
+        assert index.suggest("pur") == ["Puri, IN", "Puri, VE"]
+        assert index.suggest("puri, v") == ["Puri, VE"]
+        # The country part matches country names as well as codes
+        assert index.suggest("puri, ven") == ["Puri, VE"]
+        assert index.suggest("bhubaneswar, ind") == ["Bhubaneswar, IN"]
+        assert index.suggest("bhubaneswar, japan") == []
+        assert index.suggest("jagannath") == ["Puri, IN"]
+        assert index.suggest("xyz") == []
+
+        # The saved index is reused until a source changes
+        assert not index.is_stale()
+        assert PlaceIndex(index.index_path, gazetteer_path, cache_path).suggest("bhu") == ["Bhubaneswar, IN"]
+
+        # Geocode cache writes only rebuild the index when a place is added
+        cache = GeocodeCache(cache_path)
+        cache.put("Atlantis", None)
+        cache.get("Bhadrak, Odisha")
+        assert not index.is_stale()
+        cache.put("Bhanjanagar", {"latitude": 19.93, "longitude": 84.58, "name": "Bhanjanagar"})
+        cache.conn.close()
+        assert index.is_stale()
+        # Queries only look for changes every STALE_CHECK_SECONDS
+        assert index.suggest("bhan") == []
+        index.checked_at -= index.STALE_CHECK_SECONDS
+        assert index.suggest("bhan") == ["Bhanjanagar"]
+        assert not index.is_stale()
+
+        # Cancelled queries return nothing
+        assert index.suggest("pur", cancelled=lambda: True) == []
+        index.keys = index.ranks = index.ids = None  # Release the memory maps
+
+if __name__ == "__main__":
+    test_place_index()
@@ -0,0 +1,60 @@
+import os
+import json
+import tempfile
+import time
+import numpy as np
+from utils.profile_store import ProfileStore
+from utils.profile_import import ProfileImporter, parse_coordinates
+
+def test_parse_coordinates():
+    values = ['20° 15\' 37" N', "20 15 37 S", "19.8", "-33.5", "91° 0' 0\" N", "20° 61' 0\" N",
+              "85° 50' 22\" E", "abc", "", None]
+    parsed = parse_coordinates(values, is_latitude=True)
+    expected = [20.260277777777777, -20.260277777777777, 19.8, -33.5] + [np.nan] * 6
+    print(f"\n{parsed}")
+    assert np.allclose(parsed, expected, equal_nan=True)
+    assert np.isclose(parse_coordinates(["85° 50' 22\" W"], is_latitude=False)[0], -85.83944444444444)
+
+def test_profile_import():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ProfileStore(os.path.join(tmp, "profiles.db"), None)
+        store.save({"name": "existing", "datetime": "01/01/1950 06:00:00", "city": "puri, india",
+                    "latitude": "19° 48' 0\" N", "longitude": "85° 51' 0\" E"})
+
+        csv_path = os.path.join(tmp, "clients.csv")
+        with open(csv_path, "w", encoding="utf-8") as f:
+            f.write("Name,Date & Time,City,Latitude,Longitude\n")
+            f.write('mihir,20/12/1969 22:55:00,"bhubaneswar, india","20° 15\' 37"" N","85° 50\' 22"" E"\n')
+            f.write("existing,02/02/1950 06:00,puri,19.8,85.85\n")
+            f.write("bad lat,02/02/1950 06:00,puri,95.0,85.85\n")
+            f.write("bad date,31/02/1950 06:00,puri,19.8,85.85\n")
+            for i in range(20000):
+                f.write(f"client{i % 15000},01/01/1980 12:00,delhi,28.6,77.2\n")
+
+        stats = []
+        result = ProfileImporter(store, batch_size=1000, on_duplicate="skip").import_file(
+            csv_path, progress=stats.append)
+        print(f"\n{result['imported']} imported, {result['skipped']} skipped, {result['invalid']} invalid")
+        assert result["read"] == 20004 and result["invalid"] == 2
+        assert [line for line, reason in result["errors"]] == [4, 5]
+        assert result["skipped"] >= 1 and store.get("existing")["datetime"] == "01/01/1950 06:00:00"
+        assert store.get("mihir")["latitude_decimal"] == 20.260277777777777
+        assert store.count() == 15002
+        assert stats[-1]["bytes_read"] == stats[-1]["total_bytes"]
+
+        # JSONL, replacing existing profiles
+        jsonl_path = os.path.join(tmp, "clients.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write(json.dumps({"name": "existing", "datetime": "02/02/1950 06:00", "city": "puri",
+                                "latitude": 19.8, "longitude": 85.85}) + "\n")
+            f.write("{not json\n")
+        start = time.perf_counter()
+        result = ProfileImporter(store).import_file(jsonl_path)
+        print(f"JSONL import in {(time.perf_counter() - start) * 1000:.1f} ms")
+        assert result["imported"] == 1 and result["errors"][0][0] == 2
+        assert store.get("existing")["latitude"] == "19° 48' 0\" N"
+        store.close()
+
+if __name__ == "__main__":
+    test_parse_coordinates()
+    test_profile_import()
@@ -0,0 +1,88 @@
+import os
+import json
+import tempfile
+import time
+from utils.profile_store import ProfileStore
+
+def test_profile_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        # profiles.json as written by the old save_profile, with duplicates
+        json_path = os.path.join(tmp, "profiles.json")
+        with open(json_path, "w") as f:
+            f.write(json.dumps({"name": "mihir", "datetime": "20/12/1969 22:55", "city": "bhubaneswar, india",
+                                "latitude": 20.269622, "longitude": 85.823183}) + "\n")
+            f.write(json.dumps({"name": "manju", "datetime": "15/05/1970 09:51", "city": "taranagar, india",
+                                "latitude": 28.66948, "longitude": 75.035236}) + "\n")
+            f.write(json.dumps({"name": "mihir", "datetime": "20/12/1969 22:55:00", "city": "bhubaneswar, india",
+                                "latitude": "20° 15' 37\" N", "longitude": "85° 50' 22\" E",
+                                "latitude_decimal": 20.260277777777777, "longitude_decimal": 85.83944444444444}) + "\n")
+
+        store = ProfileStore(os.path.join(tmp, "profiles.db"), json_path)
+        assert store.count() == 2
+
+        # The last duplicate wins
+        mihir = store.get("mihir")
+        assert mihir["latitude"] == "20° 15' 37\" N"
+        assert mihir["latitude_decimal"] == 20.260277777777777
+        assert store.get("manju")["latitude_decimal"] == 28.66948
+
+        # Upsert by name
+        mihir["city"] = "puri, india"
+        store.save(mihir)
+        assert store.count() == 2 and store.get("mihir")["city"] == "puri, india"
+
+        # Reopening doesn't import profiles.json again
+        store.close()
+        store = ProfileStore(os.path.join(tmp, "profiles.db"), json_path)
+        assert store.get("mihir")["city"] == "puri, india"
+
+        # Names are stored stripped, and exists() matches what save() overwrites
+        assert store.exists(" mihir ") and not store.exists("mihi")
+
+        # Lookups stay indexed with many profiles
+        store.save_many({"name": f"client{i}", "datetime": "01/01/1980 12:00:00", "city": "puri, india",
+                         "latitude": 19.8, "longitude": 85.85} for i in range(100000))
+        start = time.perf_counter()
+        store.save({"name": "client50000", "datetime": "02/01/1980 12:00:00", "city": "puri, india",
+                    "latitude": 19.8, "longitude": 85.85})
+        profile = store.get("client50000")
+        elapsed = time.perf_counter() - start
+        print(f"\nsave + open with {store.count()} profiles: {elapsed * 1000:.3f} ms")
+        assert profile["datetime"] == "02/01/1980 12:00:00"
+        assert store.get("nobody") is None
+
+        # Pages: prefix and substring search, birth date order, keyset paging
+        page = store.search_page("clie", sort="birth", limit=3)
+        assert [p["name"] for c, p in page][-1] != "client50000"
+        assert store.search_page("client5000", sort="birth", descending=True)[0][1]["name"] == "client50000"
+        assert [p["name"] for c, p in store.search_page("aranag")] == ["manju"]
+        assert [p["name"] for c, p in store.search_page("HIR")] == ["mihir"]
+        assert [p["name"] for c, p in store.search_page("ma")] == ["manju"]
+        first = store.search_page(sort="name", limit=2)
+        second = store.search_page(sort="name", after=first[-1][0], limit=2)
+        assert [p["name"] for c, p in first + second] == ["client0", "client1", "client10", "client100"]
+        store.close()
+
+def test_failed_json_import_is_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "profiles.json")
+        db_path = os.path.join(tmp, "profiles.db")
+        with open(json_path, "w") as f:
+            f.write("[1, 2]\n")
+        try:
+            ProfileStore(db_path, json_path)
+            assert False, "expected the import to fail"
+        except AttributeError:
+            pass
+
+        with open(json_path, "w") as f:
+            f.write(json.dumps({"name": "mihir", "datetime": "20/12/1969 22:55", "city": "puri, india",
+                                "latitude": 19.8, "longitude": 85.85}) + "\n")
+        store = ProfileStore(db_path, json_path)
+        assert store.count() == 1 and store.get("mihir")["city"] == "puri, india"
+        assert [p["name"] for c, p in store.search_page("uri")] == ["mihir"]
+        store.close()
+
+if __name__ == "__main__":
+    test_profile_store()
+    test_failed_json_import_is_retried()
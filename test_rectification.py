@@ -0,0 +1,107 @@
+import contextlib
+import os
+from datetime import datetime
+from datetime import timedelta
+from utils.astro_calc import DashaCalculator
+from utils.house_strength import SIGN_LORDS
+from utils.kp import house_bits, occupied_houses, significators
+from test_house_sweep import cusp_house
+from utils.rectification import Rectifier, LordCriteria, DashaEventScorer, EVENT_HOUSES
+
+def test_segments_have_constant_lords():
+    rectifier = Rectifier(28.61, 77.21)
+    segments = rectifier.segments(datetime(1990, 5, 1, 10, 0), datetime(1990, 5, 1, 11, 0))
+    assert segments[0]["start_time"] == datetime(1990, 5, 1, 10, 0)
+    assert segments[-1]["end_time"] == datetime(1990, 5, 1, 11, 0)
+    assert abs(sum(segment["seconds"] for segment in segments) - 3600) < 1e-3
+    print(f"\n{len(segments)} segments in one hour")
+
+    def lords(chart):
+        return [(chart["houses"][house]["sign"], chart["houses"][house]["sub_lord"])
+                for house in chart["houses"]] + [chart["points"]["Moon"]["sub_lord"]]
+
+    # Lords agree across a long segment and differ across each change
+    longest = max(segments, key=lambda segment: segment["seconds"])
+    early = rectifier.chart_at(longest["start"] + 2 / 86400)
+    late = rectifier.chart_at(longest["end"] - 2 / 86400)
+    assert lords(early) == lords(late)
+    before = rectifier.chart_at(longest["start"] - 2 / 86400)
+    assert lords(before) != lords(early), longest["changes"]
+
+def test_rank():
+    rectifier = Rectifier(28.61, 77.21)
+    scorers = [LordCriteria([
+        {"point": "Ascendant", "lord": "sign_lord", "in": ["Mercury"]},
+        {"point": "House_1", "lord": "sub_lord", "in": ["Jupiter", "Venus"]},
+        {"point": "Moon", "lord": "star_lord", "in": ["Saturn"], "weight": 2}
+    ])]
+    start, end = datetime(1990, 5, 1, 10, 0), datetime(1990, 5, 1, 12, 0)
+    candidates = rectifier.rank(start, end, scorers)
+    scores = [candidate["score"] for candidate in candidates]
+    assert scores == sorted(scores, reverse=True)
+    assert abs(sum(candidate["seconds"] for candidate in candidates) - 7200) < 1e-3
+
+    best = candidates[0]
+    chart = rectifier.chart_at((best["start"] + best["end"]) / 2)
+    assert chart["houses"]["House_1"]["sign"] == "Gemini"
+    assert chart["houses"]["House_1"]["sub_lord"] in ("Jupiter", "Venus")
+    assert best["score"] == 4.0
+    print(f"Best: {best['start_time']:%H:%M:%S} - {best['end_time']:%H:%M:%S} score {best['score']}")
+
+    # The process pool gives the same ranking
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        pooled = rectifier.rank(start, end, scorers, workers=2)
+    assert [(c["start"], c["score"]) for c in pooled] == [(c["start"], c["score"]) for c in candidates]
+
+def test_dasha_point_query_matches_table():
+    dashas = DashaCalculator()
+    birth = datetime(1990, 5, 1, 11, 20)
+    for moon in (0.0, 98.8, 213.4, 359.9):
+        table = dashas.calculate_dashas(birth, moon, levels=3)
+        for dasha in table:
+            for bhukti in dasha["sub_dashas"]:
+                for antara in bhukti["sub_dashas"][::4]:
+                    middle = antara["start_date"] + (antara["end_date"] - antara["start_date"]) / 2
+                    if middle >= birth:
+                        assert dashas.dasha_lords(birth, moon, middle, 3) == antara["lord"].split("-")
+
+def test_dasha_event_scorer():
+    rectifier = Rectifier(28.61, 77.21)
+    birth = datetime(1990, 5, 1, 11, 20)
+    chart = rectifier.chart_at(rectifier.julian_day(birth))
+    bits = significators(chart)
+    # Occupied houses, read straight off the cusps, are always among a
+    # planet's significations, and agree with the chart's house field
+    cusps = [chart["houses"][f"House_{house}"]["longitude"] for house in range(1, 13)]
+    occupied = occupied_houses(chart)
+    for planet in bits:
+        house = cusp_house(chart["points"][planet]["longitude"], cusps)
+        assert occupied[planet] == chart["points"][planet]["house"] == house, planet
+        assert bits[planet] & house_bits([house])
+    lagna_lord = SIGN_LORDS[chart["houses"]["House_1"]["sign"]]
+    assert bits[lagna_lord] & 1
+
+    events = [{"date": birth + timedelta(days=365 * years), "kind": kind}
+              for years, kind in [(26, "marriage"), (30, "child"), (34, "job")]]
+    events.append({"date": birth + timedelta(days=365 * 22), "houses": [4, 9], "weight": 2})
+    scorer = DashaEventScorer(events)
+    expected = 0
+    for event in events:
+        houses = event.get("houses") or EVENT_HOUSES[event["kind"]]
+        lords = DashaCalculator().dasha_lords(birth, chart["points"]["Moon"]["longitude"], event["date"])
+        shares = [sum(bits[lord] >> (house - 1) & 1 for house in houses) / len(houses) for lord in lords]
+        expected += event.get("weight", 1) * sum(shares) / len(shares)
+    assert abs(scorer.score(chart) - expected) < 1e-9
+
+    start, end = datetime(1990, 5, 1, 10, 0), datetime(1990, 5, 1, 12, 0)
+    candidates = rectifier.rank(start, end, [scorer, LordCriteria([])])
+    assert candidates[0]["score"] >= expected
+    assert all(candidate["scores"][1] == 0 for candidate in candidates)
+    print(f"\nTrue time scores {expected:.3f}; best {candidates[0]['start_time']:%H:%M:%S} - "
+          f"{candidates[0]['end_time']:%H:%M:%S} scores {candidates[0]['score']:.3f}")
+
+if __name__ == "__main__":
+    test_segments_have_constant_lords()
+    test_rank()
+    test_dasha_point_query_matches_table()
+    test_dasha_event_scorer()
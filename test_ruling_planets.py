@@ -0,0 +1,32 @@
+from datetime import datetime, timezone
+from utils.ruling_planets import RulingPlanets
+
+def lords(result):
+    return [result[part][lord] for part in ("ascendant", "moon") for lord in ("sign_lord", "star_lord", "sub_lord")] \
+        + [result["day_lord"]]
+
+def test_ruling_planets():
+    ruling = RulingPlanets(20.26, 85.84)
+    # Monday 15 April 2024, noon in Bhubaneswar
+    result = ruling.calculate(datetime(2024, 4, 15, 6, 30, tzinfo=timezone.utc))
+    print(f"\n{result['ruling_planets']} until {result['next_change']} ({result['next_change_part']})")
+    assert result["day_lord"] == "Moon"
+    assert result["ruling_planets"][0] == result["ascendant"]["sign_lord"]
+    assert len(set(result["ruling_planets"])) == len(result["ruling_planets"])
+
+    # The lords hold until next_change and change right after it
+    julian_day = result["julian_day"]
+    for _ in range(10):
+        current = ruling.calculate(julian_day)
+        before = ruling.calculate(current["next_change"] - 1e-5)
+        after = ruling.calculate(current["next_change"] + 1e-5)
+        assert lords(before) == lords(current)
+        assert lords(after) != lords(current), current["next_change_part"]
+        julian_day = after["julian_day"]
+
+    # Before sunrise it is still the previous weekday
+    assert ruling.calculate(datetime(2024, 4, 15, 23, 0, tzinfo=timezone.utc))["day_lord"] == "Moon"
+    assert ruling.calculate(datetime(2024, 4, 16, 1, 0, tzinfo=timezone.utc))["day_lord"] == "Mars"
+
+if __name__ == "__main__":
+    test_ruling_planets()
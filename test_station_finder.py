@@ -0,0 +1,37 @@
+from datetime import datetime, timezone
+import numpy as np
+from utils.astro_calc import AstroCalc
+from utils.station_finder import StationCatalog
+
+def test_stations():
+    catalog = StationCatalog(start_year=2020, end_year=2030)
+    stations = catalog.stations("Mercury", datetime(2024, 1, 5), datetime(2025, 1, 1))
+    print("\n" + "\n".join(f"{station['time']:%Y-%m-%d %H:%M} {station['kind']}" for station in stations))
+    assert [station["kind"] for station in stations] == ["retrograde", "direct"] * 3
+    assert [station["time"].date().isoformat()[:7] for station in stations] == [
+        "2024-04", "2024-04", "2024-08", "2024-08", "2024-11", "2024-12"]
+    for station in stations:
+        speeds = catalog.finder.positions("Mercury", [station["julian_day"] - 0.01, station["julian_day"] + 0.01])[1]
+        assert speeds[0] * speeds[1] < 0
+
+    # The interval index agrees with the speed sign
+    days = np.random.default_rng(7).uniform(catalog.start_jd, catalog.end_jd, 300)
+    for body in ["Mercury", "Mars", "Saturn"]:
+        speeds = catalog.finder.positions(body, days)[1]
+        assert [catalog.is_retrograde(body, day) for day in days] == list(speeds < 0), body
+    intervals = catalog.retrograde_intervals("Mercury", datetime(2024, 1, 1), datetime(2025, 1, 1))
+    # Including the one that ended on 2 January
+    assert len(intervals) == 4 and all(start < end for start, end in intervals)
+    # Outside the span the speed is calculated directly
+    assert catalog.is_retrograde("Mercury", datetime(2035, 1, 1)) in (True, False)
+
+def test_natal_retrograde():
+    chart = AstroCalc().calculate_chart(datetime(2024, 4, 15, 12, 0), 20.26, 85.84, calc_type="Geocentric")
+    assert chart["points"]["Mercury"]["is_retrograde"]
+    assert not chart["points"]["Sun"]["is_retrograde"]
+    catalog = StationCatalog(start_year=2024, end_year=2025)
+    assert catalog.is_retrograde("Mercury", datetime(2024, 4, 15, 6, 30, tzinfo=timezone.utc))
+
+if __name__ == "__main__":
+    test_stations()
+    test_natal_retrograde()
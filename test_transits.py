@@ -0,0 +1,32 @@
+from datetime import datetime, timedelta
+from utils.astro_calc import AstroCalc
+
+def test_transits():
+    calc = AstroCalc()
+    birth_dt = datetime(1969, 12, 20, 22, 55, 0)
+    natal = calc.calculate_chart(birth_dt, 20.26, 85.84)
+
+    # Transits at the birth moment (IST, so UTC - 5:30) are the natal positions,
+    # topocentric like the natal chart and in the same natal houses
+    transits = calc.calculate_transits(natal, birth_dt - timedelta(hours=5, minutes=30))
+    assert set(transits) == set(natal["points"])
+    for body, point in transits.items():
+        assert abs(point["longitude"] - natal["points"][body]["longitude"]) < 1e-9, body
+        assert point["house"] == natal["points"][body]["house"], body
+
+    # Geocentric speeds (topocentric ones swing with the observer's rotation)
+    geocentric = calc.calculate_chart(birth_dt, 20.26, 85.84, calc_type="Geocentric")
+    speeds = calc.calculate_transits(geocentric, birth_dt - timedelta(hours=5, minutes=30))
+    assert speeds["Moon"]["speed"] > 11 and not speeds["Moon"]["is_retrograde"]
+    assert speeds["Rahu"]["speed"] < 0 and "is_retrograde" not in speeds["Rahu"]
+    for body, point in speeds.items():
+        assert point["house"] == geocentric["points"][body]["house"], body
+
+    # Fast bodies only, a week later
+    week = calc.calculate_transits(natal, datetime(1969, 12, 27, 17, 25), bodies=["Moon", "Ascendant"])
+    print(f"\nMoon moved {(week['Moon']['longitude'] - transits['Moon']['longitude']) % 360:.2f}° in a week")
+    assert list(week) == ["Moon", "Ascendant"]
+    assert 80 < (week["Moon"]["longitude"] - transits["Moon"]["longitude"]) % 360 < 100
+
+if __name__ == "__main__":
+    test_transits()
@@ -0,0 +1,49 @@
+import numpy as np
+from datetime import datetime
+from utils.astro_calc import AstroCalc
+from utils.vargas import VARGA_NUMBERS, SIGNS, varga_signs, varga_matrix, chart_vargas
+
+def sign_of(name):
+    return SIGNS.index(name)
+
+def test_varga_rules():
+    longitudes = np.random.default_rng(3).random(5000) * 360
+    # Navamsa and D12 reduce to simple formulas
+    assert np.array_equal(varga_signs(longitudes, 9), (longitudes // (10 / 3)).astype(int) % 12)
+    assert np.array_equal(varga_signs(longitudes, 1), (longitudes // 30).astype(int))
+    assert np.array_equal(varga_signs(longitudes, 12), ((longitudes // 30) + (longitudes % 30) // 2.5) % 12)
+
+    # Hora: odd signs Sun then Moon, even signs Moon then Sun
+    assert list(varga_signs([10, 20, 40, 50], 2)) == [sign_of("Leo"), sign_of("Cancer"),
+                                                      sign_of("Cancer"), sign_of("Leo")]
+    # Drekkana: the sign, the 5th and the 9th
+    assert list(varga_signs([35, 45, 55], 3)) == [sign_of("Taurus"), sign_of("Virgo"), sign_of("Capricorn")]
+    # Dasamsa of an even sign starts from the 9th
+    assert varga_signs(30.5, 10) == sign_of("Capricorn")
+    # Trimsamsa: odd signs Mars, Saturn, Jupiter, Mercury, Venus at 5, 10, 18, 25
+    assert list(varga_signs([2, 7, 15, 20, 27], 30)) == [sign_of(s) for s in
+                                                         ["Aries", "Aquarius", "Sagittarius", "Gemini", "Libra"]]
+    assert list(varga_signs([32, 37, 45, 52, 57], 30)) == [sign_of(s) for s in
+                                                           ["Taurus", "Virgo", "Pisces", "Capricorn", "Scorpio"]]
+    # Shashtiamsa: the last part of a sign is the 60th, ending one sign back
+    assert varga_signs(29.99, 60) == sign_of("Pisces")
+    for number in VARGA_NUMBERS:
+        signs = varga_signs(longitudes, number)
+        assert signs.min() >= 0 and signs.max() <= 11
+
+def test_chart_and_batch():
+    chart = AstroCalc().calculate_chart(datetime(1990, 5, 1, 11, 20), 28.61, 77.21, calc_type="Geocentric")
+    vargas = chart_vargas(chart)
+    assert vargas["signs"].shape == (len(VARGA_NUMBERS), len(chart["points"]))
+    assert chart_vargas(chart) is vargas
+    rasi = vargas["signs"][VARGA_NUMBERS.index(1)]
+    assert [SIGNS[sign] for sign in rasi] == [point["sign"] for point in chart["points"].values()]
+
+    batch = np.random.default_rng(5).random((1000, 13)) * 360
+    matrix = varga_matrix(batch)
+    assert matrix.shape == (1000, len(VARGA_NUMBERS), 13)
+    assert np.array_equal(matrix[:, VARGA_NUMBERS.index(9), 6], varga_signs(batch[:, 6], 9))
+
+if __name__ == "__main__":
+    test_varga_rules()
+    test_chart_and_batch()
@@ -2,14 +2,16 @@ from PyQt6.QtWidgets import (
     QWidget, QLabel, QLineEdit, QGridLayout, 
     QPushButton, QMessageBox
 )
-import requests
-from data.constants import POSITIONSTACK_API_KEY
+from utils.gazetteer import Gazetteer
+from utils.geocode_cache import CachedGeocoder, positionstack_provider
 
 class ChartInputTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
         self.fields = {}
+        self.gazetteer = Gazetteer()
+        self.geocoder = CachedGeocoder(positionstack_provider, gazetteer=self.gazetteer)
         self.init_ui()
 
     def init_ui(self):
@@ -42,16 +44,11 @@ class ChartInputTab(QWidget):
             return
 
         try:
-            response = requests.get(
-                "http://api.positionstack.com/v1/forward",
-                params={"access_key": POSITIONSTACK_API_KEY, "query": city_name}
-            )
-            data = response.json()
-            if "data" in data and len(data["data"]) > 0:
-                latitude = data["data"][0]["latitude"]
-                longitude = data["data"][0]["longitude"]
-                self.fields["latitude"].setText(str(latitude))
-                self.fields["longitude"].setText(str(longitude))
+            # Offline gazetteer first, then cached results, then PositionStack
+            place = self.geocoder.resolve(city_name)
+            if place:
+                self.fields["latitude"].setText(str(place["latitude"]))
+                self.fields["longitude"].setText(str(place["longitude"]))
             else:
                 raise ValueError("No data found for the city.")
         except Exception as e:
@@ -21,12 +21,19 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,  # Add this import
     QTextEdit,  # Add this import
     QMessageBox,  # Add this import
+    QInputDialog,
     QToolTip  # Add this import
 )
 from kerykeion import AstrologicalSubject, Report, KerykeionChartSVG
 import math
 import os
 from datetime import datetime
+from collections import OrderedDict
+from utils.astro_calc import AstroCalc
+from utils.aspects import AspectEngine, MAJOR_ASPECTS
+from utils.house_strength import HouseStrengthCalculator
+from .speculative_precompute import SpeculativePrecompute
+from .ruling_planets_panel import RulingPlanetsPanel
 
 class NorthernChartWidget(QtWidgets.QWidget):
     # Dictionary for zodiac symbols
@@ -42,13 +49,13 @@ class NorthernChartWidget(QtWidgets.QWidget):
         'Jupiter': '♃', 'Saturn': '♄', 'Rahu': '☊', 'Ketu': '☋'
     }
     
-    # Add aspect configurations
-    MAJOR_ASPECTS = {
-        'Conjunction': 0,
-        'Opposition': 180,
-        'Trine': 120,
-        'Square': 90,
-        'Sextile': 60
+    # Aspects drawn as lines, and their colors
+    MAJOR_ASPECTS = MAJOR_ASPECTS
+    ASPECT_COLORS = {
+        'Opposition': QtGui.QColor(200, 40, 40, 160),
+        'Square': QtGui.QColor(200, 40, 40, 160),
+        'Trine': QtGui.QColor(40, 90, 200, 160),
+        'Sextile': QtGui.QColor(40, 150, 200, 160)
     }
     
     # Add Nakshatra dictionary with their degrees
@@ -79,9 +86,13 @@ class NorthernChartWidget(QtWidgets.QWidget):
         self.chart_data = None
         self.transit_data = None  # Add transit data storage
         self.show_transits = False  # Toggle for transit display
+        self.aspect_engine = AspectEngine(self.MAJOR_ASPECTS)
+        self.aspect_result = None  # Aspects of the shown points, drawn from cache
         self.points = None  # Initialize points
         self.houses = None  # Initialize houses
         self.house_cusps = None 
+        self.chart_cache = OrderedDict()  # Sweep key -> sweep with all house systems
+        self.precompute = SpeculativePrecompute(self.precompute_variant, self)
         self.setMinimumSize(500, 500)
         
         # Initialize planet display with default style
@@ -121,6 +132,10 @@ class NorthernChartWidget(QtWidgets.QWidget):
         self.transit_action = QAction("Show Transits", self)
         self.transit_action.setCheckable(True)
         self.transit_action.triggered.connect(self.toggle_transits)
+
+        self.aspect_action = QAction("Show Aspects", self)
+        self.aspect_action.setCheckable(True)
+        self.aspect_action.triggered.connect(self.toggle_aspects)
         
         # Planet Style submenu
         self.style_menu = QMenu("Planet Style", self)
@@ -160,6 +175,19 @@ class NorthernChartWidget(QtWidgets.QWidget):
         self.yogeswarananda_menu.addAction(self.yogeswarananda_action)
         self.horary_menu.addMenu(self.yogeswarananda_menu)
         self.horary_menu.addSeparator()
+
+        # KP horary chart from a number, for the displayed moment and place
+        self.kp_horary_action = QAction("KP Horary Number (1-249)...", self.horary_group)
+        self.kp_horary_action.setCheckable(True)
+        self.kp_horary_action.setData('KP Horary')
+        self.horary_menu.addAction(self.kp_horary_action)
+        self.horary_number = 1
+
+        # KP ruling planets for the chart location, kept live
+        self.ruling_planets_action = QAction("Show Ruling Planets", self)
+        self.ruling_planets_action.setCheckable(True)
+        self.ruling_planets_action.triggered.connect(self.toggle_ruling_planets)
+        self.horary_menu.addAction(self.ruling_planets_action)
         
         # Add separator after Yogeswarananda menu
         self.horary_menu.addSeparator()
@@ -257,6 +285,7 @@ class NorthernChartWidget(QtWidgets.QWidget):
         # Add calculation settings menu and transit action
         self.settings_menu.addMenu(self.calc_settings_menu)
         self.settings_menu.addAction(self.transit_action)
+        self.settings_menu.addAction(self.aspect_action)
         
         # Connect action groups to handlers
         self.style_group.triggered.connect(self.handle_style_change)
@@ -287,6 +316,13 @@ class NorthernChartWidget(QtWidgets.QWidget):
         self.transit_data = None
         self.show_transits = False
 
+        # Live transits: the Moon and ascendant every tick, slow bodies less often
+        self.transit_timer = QTimer(self)
+        self.transit_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.transit_timer.setInterval(self.TRANSIT_TICK_MS)
+        self.transit_timer.timeout.connect(self.refresh_transits)
+        self.transit_ticks = 0
+
         # Create container widget for Yogeswarananda display
         self.yogeswarananda_container = QWidget(self)
         self.yogeswarananda_container.setFixedWidth(350)  # Narrower width
@@ -336,6 +372,11 @@ class NorthernChartWidget(QtWidgets.QWidget):
         self.yogeswarananda_container.move(10, self.height() - 610)
         self.yogeswarananda_container.hide()  # Hidden by default
 
+        # Ruling planets panel, top left, shown from the Horary menu
+        self.ruling_planets_panel = RulingPlanetsPanel(self)
+        self.ruling_planets_panel.move(10, 10)
+        self.ruling_planets_panel.hide()
+
         # Create custom tooltip
         self.custom_tooltip = CustomTooltip(self)
 
@@ -426,6 +467,9 @@ Significance: Represents power and transformation through hardship.''',
         zodiac_system = action.data()
         # Enable/disable ayanamsa menu based on zodiac system
         self.ayanamsa_menu.setEnabled(zodiac_system == "Sidereal")
+        # Show a precomputed variant if there is one
+        if self.show_cached_variant(zodiac_system=zodiac_system):
+            return
         # Recalculate chart with new settings
         if self.input_page:
             self.input_page.zodiac_system.setCurrentText(zodiac_system)
@@ -436,6 +480,9 @@ Significance: Represents power and transformation through hardship.''',
     def handle_calc_type_change(self, action):
         """Handle calculation type change"""
         calc_type = action.data()
+        # Show a precomputed variant if there is one
+        if self.show_cached_variant(calculation_type=calc_type):
+            return
         # Recalculate chart with new settings
         if self.input_page:
             self.input_page.calc_type.setCurrentText(calc_type)
@@ -446,6 +493,9 @@ Significance: Represents power and transformation through hardship.''',
     def handle_ayanamsa_change(self, action):
         """Handle ayanamsa change"""
         ayanamsa = action.data()
+        # Show a precomputed variant if there is one
+        if self.show_cached_variant(ayanamsa=ayanamsa):
+            return
         # Recalculate chart with new settings
         if self.input_page:
             self.input_page.ayanamsa.setCurrentText(ayanamsa)
@@ -456,6 +506,9 @@ Significance: Represents power and transformation through hardship.''',
     def handle_house_change(self, action):
         """Handle house system change"""
         house_system = action.data()
+        # Switch from the house sweep when possible, planets don't depend on houses
+        if self.show_cached_variant(compute=True, house_system=house_system):
+            return
         # Recalculate chart with new settings
         if self.input_page:
             self.input_page.house_system.setCurrentText(house_system)
@@ -466,6 +519,9 @@ Significance: Represents power and transformation through hardship.''',
     def handle_node_change(self, action):
         """Handle node type change"""
         node_type = action.data()
+        # Show a precomputed variant if there is one
+        if self.show_cached_variant(node_type=node_type):
+            return
         # Recalculate chart with new settings
         if self.input_page:
             self.input_page.node_type.setCurrentText(node_type)
@@ -473,6 +529,132 @@ Significance: Represents power and transformation through hardship.''',
         else:
             self.recalculate_chart()
 
+    def get_astro_calc(self):
+        """Return the calculator shared with the input page"""
+        if self.input_page:
+            return self.input_page.astro_calc
+        if not hasattr(self, 'astro_calc'):
+            self.astro_calc = AstroCalc()
+        return self.astro_calc
+
+    # Chart settings a sweep depends on; the house system is picked from the sweep
+    SWEEP_KEY_FIELDS = ('datetime', 'latitude', 'longitude', 'calculation_type',
+                        'zodiac_system', 'ayanamsa', 'node_type')
+
+    # Input page combo boxes for each chart setting
+    SETTING_INPUTS = {
+        'calculation_type': 'calc_type',
+        'zodiac_system': 'zodiac_system',
+        'ayanamsa': 'ayanamsa',
+        'house_system': 'house_system',
+        'node_type': 'node_type'
+    }
+
+    CHART_CACHE_SIZE = 64
+
+    # Transit refresh cadence: fast bodies every tick, the rest every SLOW_TICKS
+    TRANSIT_TICK_MS = 2000
+    TRANSIT_SLOW_TICKS = 30
+    FAST_TRANSITS = ["Moon", "Ascendant"]
+
+    def current_settings(self):
+        """Get the settings of the displayed chart, or None without chart meta data"""
+        if not isinstance(self.chart_data, dict) or 'meta' not in self.chart_data:
+            return None
+        settings = dict(self.chart_data['meta'])
+        settings.setdefault('node_type', "True Node (Rahu/Ketu)")
+        return settings
+
+    def get_sweep(self, settings, compute=True):
+        """Get the house sweep for the given settings from the chart cache"""
+        key = tuple(settings[field] for field in self.SWEEP_KEY_FIELDS)
+        sweep = self.chart_cache.get(key)
+        if sweep is not None:
+            self.chart_cache.move_to_end(key)
+            return sweep
+        if not compute:
+            return None
+        
+        sweep = self.get_astro_calc().calculate_house_sweep(
+            dt=datetime.strptime(settings['datetime'], '%Y-%m-%d %H:%M:%S'),
+            lat=settings['latitude'],
+            lon=settings['longitude'],
+            calc_type=settings['calculation_type'],
+            zodiac=settings['zodiac_system'],
+            ayanamsa=settings['ayanamsa'],
+            node_type=settings['node_type']
+        )
+        self.chart_cache[key] = sweep
+        while len(self.chart_cache) > self.CHART_CACHE_SIZE:
+            self.chart_cache.popitem(last=False)
+        return sweep
+
+    def show_cached_variant(self, compute=False, **changes):
+        """Show the displayed chart with changed settings without recalculating.
+
+        Returns False when the variant isn't cached (and compute is False), so
+        the caller can fall back to a full recalculation.
+        """
+        settings = self.current_settings()
+        if settings is None:
+            return False
+        settings.update(changes)
+        
+        try:
+            sweep = self.get_sweep(settings, compute=compute)
+        except Exception as e:
+            print(f"Error calculating house sweep: {e}")
+            return False
+        if sweep is None:
+            return False
+        
+        chart_data = self.get_astro_calc().chart_from_sweep(sweep, settings['house_system'])
+        if self.input_page:
+            for setting, value in changes.items():
+                getattr(self.input_page, self.SETTING_INPUTS[setting]).setCurrentText(value)
+            self.input_page.show_chart(chart_data)
+        else:
+            self.update_data(chart_data)
+        return True
+
+    def menu_neighbors(self, group, current):
+        """Get a menu's other options ordered by distance from the current one"""
+        options = [action.data() for action in group.actions()]
+        if current not in options:
+            return options
+        index = options.index(current)
+        return sorted((option for option in options if option != current),
+                      key=lambda option: abs(options.index(option) - index))
+
+    def start_speculative_precompute(self):
+        """Queue the chart variants the user is most likely to pick next"""
+        settings = self.current_settings()
+        if settings is None:
+            self.precompute.cancel()
+            return
+        
+        # The displayed settings first (covers every house system), then
+        # variants one menu step away, then two steps, and so on
+        neighbors = [
+            (setting, self.menu_neighbors(group, settings[setting]))
+            for setting, group in [
+                ('zodiac_system', self.zodiac_group),
+                ('calculation_type', self.calc_type_group),
+                ('node_type', self.node_group),
+                ('ayanamsa', self.ayanamsa_group)
+            ]
+        ]
+        jobs = [settings]
+        for distance in range(max(len(options) for _, options in neighbors)):
+            for setting, options in neighbors:
+                if distance < len(options):
+                    jobs.append(dict(settings, **{setting: options[distance]}))
+        self.precompute.start(jobs)
+
+    def precompute_variant(self, settings):
+        """Compute one speculative variant into the chart cache"""
+        self.get_sweep(settings)
+
     def recalculate_chart(self):
         """Recalculate chart with current settings"""
         if not hasattr(self, 'birth_data'):
@@ -610,6 +792,8 @@ Significance: Represents power and transformation through hardship.''',
             self.apply_simplified_rules()
         elif option == 'Advanced Analysis':
             self.apply_advanced_analysis()
+        elif option == 'KP Horary':
+            self.show_kp_horary()
         
         self.update()  # Redraw the chart
 
@@ -707,6 +891,9 @@ Significance: Represents power and transformation through hardship.''',
                 else:
                     self.yogeswarananda_container.hide()
                 
+                # Precompute likely menu choices; restarting cancels stale work
+                self.start_speculative_precompute()
+                
                 self.update()  # Trigger repaint
             else:
                 print(f"Error: Invalid chart data format")
@@ -854,7 +1041,7 @@ Significance: Represents power and transformation through hardship.''',
                     group = [p for p in group if p != 'Ascendant']
                     if not group:
                         continue
-                self.draw_planet_group(painter, cx, cy, base_radius, group, scale, is_transit)
+                self.draw_planet_group(painter, cx, cy, base_radius, group, scale, is_transit, points)
 
     def draw_single_planet(self, painter, cx, cy, radius, planet_name, planet_data, scale, is_transit=False):
         """Draw a single planet with transit modifications if needed"""
@@ -881,12 +1068,13 @@ Significance: Represents power and transformation through hardship.''',
             self.planet_display.draw_planet(painter, planet_name, int(x), int(y), 
                                          int(scale['planet_size']))
 
-    def draw_planet_group(self, painter, cx, cy, radius, group, scale, is_transit=False):
+    def draw_planet_group(self, painter, cx, cy, radius, group, scale, is_transit=False, points=None):
         """Draw a group of planets with adjusted spacing"""
+        points = points if points is not None else self.points
         if len(group) == 1:
             planet_name = group[0]
             self.draw_single_planet(painter, cx, cy, radius, planet_name, 
-                                  self.points[planet_name], scale, is_transit)
+                                  points[planet_name], scale, is_transit)
         else:
             # Adjust radius step based on display style
             if self.planet_display.style == 'text':
@@ -894,15 +1082,27 @@ Significance: Represents power and transformation through hardship.''',
             else:
                 radius_step = scale['planet_size'] * 0.8  # Larger step for symbol mode
             
+            if is_transit:
+                # Same look as single transit planets
+                display = EnhancedPlanetDisplay(style='text' if self.planet_display.style == 'text' else 'basic')
+                size = int(scale['planet_size'] * 0.8)
+                painter.save()
+                painter.setPen(QPen(QtGui.QColor(100, 100, 100)))
+            else:
+                display = self.planet_display
+                size = scale['planet_size']
+
             for i, planet_name in enumerate(group):
                 adjusted_radius = radius - (i * radius_step)
-                longitude = self.points[planet_name]['longitude']
+                longitude = points[planet_name]['longitude']
                 angle_rad = math.radians(90 + longitude)
                 x = cx + adjusted_radius * math.cos(angle_rad)
                 y = cy - adjusted_radius * math.sin(angle_rad)
                 
-                self.planet_display.draw_planet(painter, planet_name, int(x), int(y), 
-                                         scale['planet_size'])
+                display.draw_planet(painter, planet_name, int(x), int(y), size)
+
+            if is_transit:
+                painter.restore()
 
     def draw_nakshatras(self, painter, cx, cy, radius):
         """Draw nakshatra names with larger font"""
@@ -1161,6 +1361,9 @@ Significance: Represents power and transformation through hardship.''',
         self.draw_house_lines(painter, cx, cy, middle_radius)
         self.draw_house_cusps(painter, cx, cy, middle_radius)
         
+        if self.aspect_action.isChecked():
+            self.draw_aspect_lines(painter, cx, cy, center_radius)
+
         # Draw planets LAST so they appear on top
         if hasattr(self, 'points') and self.points:
             self.draw_planets(painter, cx, cy, inner_radius)
@@ -1505,6 +1708,18 @@ Significance: Represents power and transformation through hardship.''',
                 else:
                     self.yogeswarananda_container.hide()
                 
+                # Transits are placed in the natal houses of this chart
+                if self.show_transits:
+                    self.calculate_current_transits()
+
+                if self.ruling_planets_action.isChecked():
+                    self.update_ruling_planets_location()
+
+                self.update_aspects()
+
+                # Precompute likely menu choices; restarting cancels stale work
+                self.start_speculative_precompute()
+                
                 self.update()  # Trigger repaint
             else:
                 print(f"Error: Invalid chart data format")
@@ -1585,49 +1800,110 @@ Significance: Represents power and transformation through hardship.''',
 
     def toggle_transits(self):
         """Toggle transit display and update the chart"""
-        print("\nDEBUG - toggle_transits called")
         self.show_transits = self.transit_action.isChecked()
-        print(f"Show transits set to: {self.show_transits}")
-        
-        # If toggling on and no transit data exists, calculate current positions
-        if self.show_transits and not self.transit_data:
-            print("No transit data available - need to calculate current positions")
-            # You'll need to implement this part to get current planetary positions
+        if self.show_transits:
             self.calculate_current_transits()
+            self.transit_ticks = 0
+            self.transit_timer.start()
         else:
-            print(f"Transit data exists: {self.transit_data is not None}")
-        
+            self.transit_timer.stop()
+        self.update_aspects()
         self.update()  # Force redraw
-        print("Chart update requested")
 
-    def calculate_current_transits(self):
-        """Calculate current planetary positions for transits"""
+    def calculate_current_transits(self, bodies=None):
+        """Calculate current planetary positions in the natal houses.
+
+        With ``bodies`` only those are recalculated and merged into the
+        existing transit data. Returns True when a body moved far enough to
+        show on screen.
+        """
+        if not isinstance(self.chart_data, dict) or 'meta' not in self.chart_data:
+            return False
         try:
-            from datetime import datetime
-            current_time = datetime.now()
-            
-            # Create transit data structure without Ascendant
-            self.transit_data = {
-                'Sun': {'longitude': 0, 'sign': 'Aries', 'degree': 0},
-                'Moon': {'longitude': 30, 'sign': 'Taurus', 'degree': 0},
-                'Mercury': {'longitude': 60, 'sign': 'Gemini', 'degree': 0},
-                'Venus': {'longitude': 90, 'sign': 'Cancer', 'degree': 0},
-                'Mars': {'longitude': 120, 'sign': 'Leo', 'degree': 0},
-                'Jupiter': {'longitude': 150, 'sign': 'Virgo', 'degree': 0},
-                'Saturn': {'longitude': 180, 'sign': 'Libra', 'degree': 0},
-                # Note: Some astrologers include Rahu/Ketu in transits, others don't
-                'Rahu': {'longitude': 210, 'sign': 'Scorpio', 'degree': 0},
-                'Ketu': {'longitude': 30, 'sign': 'Taurus', 'degree': 0}
-            }
-            
-            # Add is_retrograde flag for all planets
-            for planet_data in self.transit_data.values():
-                planet_data['is_retrograde'] = False
-            
-            print(f"Calculated transit data: {self.transit_data}")
+            transits = self.get_astro_calc().calculate_transits(self.chart_data, bodies=bodies)
         except Exception as e:
             print(f"Error calculating transits: {str(e)}")
             traceback.print_exc()
+            return False
+
+        if bodies is None or not self.transit_data:
+            self.transit_data = transits
+            return True
+        # Degrees that move a planet by about half a pixel on the planet ring
+        radius = max(min(self.width(), self.height()) // 2 - 40, 1) * 0.7
+        threshold = math.degrees(0.5 / radius)
+        moved = False
+        for body, point in transits.items():
+            old = self.transit_data.get(body)
+            diff = abs(point['longitude'] - old['longitude']) if old else 360
+            if min(diff, 360 - diff) >= threshold or (old and old['house'] != point['house']):
+                moved = True
+            self.transit_data[body] = point
+        return moved
+
+    def refresh_transits(self):
+        """Timer tick: the Moon and ascendant now, everything every TRANSIT_SLOW_TICKS"""
+        if not self.show_transits or not self.isVisible():
+            return
+        self.transit_ticks += 1
+        bodies = None if self.transit_ticks % self.TRANSIT_SLOW_TICKS == 0 else self.FAST_TRANSITS
+        if self.calculate_current_transits(bodies):
+            self.update_aspects()
+            self.update()
+
+    def toggle_aspects(self):
+        self.update_aspects()
+        self.update()
+
+    def update_aspects(self):
+        """Recompute the cached aspects: transits to the chart when transits
+        are shown, else within the chart"""
+        self.aspect_result = None
+        if not self.aspect_action.isChecked() or not self.points:
+            return
+        try:
+            if self.show_transits and self.transit_data:
+                transits = {name: point for name, point in self.transit_data.items() if name != 'Ascendant'}
+                self.aspect_result = self.aspect_engine.compute(transits, self.points)
+            else:
+                self.aspect_result = self.aspect_engine.compute(self.points)
+        except Exception as e:
+            print(f"Error calculating aspects: {str(e)}")
+
+    def draw_aspect_lines(self, painter, cx, cy, radius):
+        """Chords across the inner circle between aspecting points"""
+        if not self.aspect_result:
+            return
+        first = self.transit_data if self.show_transits and self.transit_data else self.points
+        painter.save()
+        for found in self.aspect_result['aspects']:
+            color = self.ASPECT_COLORS.get(found['aspect'])
+            if color is None:
+                continue
+            # Closer aspects are drawn bolder
+            painter.setPen(QPen(color, 2 if found['orb'] < 2 else 1))
+            ends = []
+            for longitude in (first[found['from']]['longitude'], self.points[found['to']]['longitude']):
+                angle = math.radians(90 + longitude)
+                ends.append(QtCore.QPointF(cx + radius * math.cos(angle), cy - radius * math.sin(angle)))
+            painter.drawLine(ends[0], ends[1])
+        painter.restore()
+
+    def toggle_ruling_planets(self):
+        """Show or hide the live ruling planets for the chart location"""
+        if self.ruling_planets_action.isChecked():
+            self.update_ruling_planets_location()
+            self.ruling_planets_panel.start()
+        else:
+            self.ruling_planets_panel.stop()
+
+    def update_ruling_planets_location(self):
+        settings = self.current_settings()
+        if settings is None:
+            return
+        self.ruling_planets_panel.set_location(settings['latitude'], settings['longitude'],
+                                               settings['zodiac_system'], settings['ayanamsa'],
+                                               calc=self.get_astro_calc())
 
     def update_transit_data(self, transit_data):
         """Update transit planetary positions"""
@@ -1685,6 +1961,38 @@ Significance: Represents power and transformation through hardship.''',
         # Add your dignity display logic here
         self.update()
 
+    def show_kp_horary(self):
+        """Ask for a KP horary number and show its chart, with house strengths"""
+        settings = self.current_settings()
+        if settings is None:
+            QMessageBox.information(self, "KP Horary", "Calculate a chart for the moment and place of the question first.")
+            return
+        number, ok = QInputDialog.getInt(self, "KP Horary", "Horary number (1-249):", self.horary_number, 1, 249)
+        if not ok:
+            return
+        try:
+            chart_data = self.get_astro_calc().calculate_horary_chart(
+                number,
+                dt=datetime.strptime(settings['datetime'], '%Y-%m-%d %H:%M:%S'),
+                lat=settings['latitude'],
+                lon=settings['longitude'],
+                calc_type=settings['calculation_type'],
+                zodiac=settings['zodiac_system'],
+                ayanamsa=settings['ayanamsa'],
+                house_system=settings['house_system'],
+                node_type=settings['node_type']
+            )
+        except Exception as e:
+            print(f"Error calculating horary chart: {e}")
+            QMessageBox.warning(self, "Error", f"Could not calculate the horary chart: {e}")
+            return
+        self.horary_number = number
+        if self.input_page:
+            self.input_page.show_chart(chart_data)
+        else:
+            self.update_data(chart_data)
+        self.show_yogeswarananda()
+
     def apply_traditional_rules(self):
         """Apply traditional horary rules"""
         print("Applying traditional horary rules")
@@ -1743,195 +2051,19 @@ Significance: Represents power and transformation through hardship.''',
             print(f"Error: {str(e)}")
             QMessageBox.warning(self, "Error", f"An error occurred: {str(e)}")
 
-    def get_house_lord(self, sign):
-        """Get the lord of a sign"""
-        sign_lords = {
-            'Aries': 'Mars',
-            'Taurus': 'Venus',
-            'Gemini': 'Mercury',
-            'Cancer': 'Moon',
-            'Leo': 'Sun',
-            'Virgo': 'Mercury',
-            'Libra': 'Venus',
-            'Scorpio': 'Mars',
-            'Sagittarius': 'Jupiter',
-            'Capricorn': 'Saturn',
-            'Aquarius': 'Saturn',
-            'Pisces': 'Jupiter'
-        }
-        return sign_lords.get(sign)
-
-    def get_houses_owned_by(self, planet):
-        """Get list of houses owned by a planet"""
-        owned_houses = []
-        for house_num in range(1, 13):
-            house_key = f"House_{house_num}"
-            house_sign = self.chart_data['houses'][house_key]['sign']
-            if self.get_house_lord(house_sign) == planet:
-                owned_houses.append(house_num)
-        return owned_houses
-
-    def add_points(self, house_num, points, reason=""):
-        """Add points to a house and track the reason"""
-        self.house_points[house_num] += points
-        return f"House {house_num}: +{points} points ({reason})\n"
-
-    def handle_rahu_ketu(self, planet, house_num, points, point_type):
-        """Special handling for Rahu/Ketu points"""
-        details = ""
-        if planet in ['Rahu', 'Ketu']:
-            house_sign = self.chart_data['houses'][f"House_{house_num}"]['sign']
-            house_lord = self.get_house_lord(house_sign)
-            
-            # Give points to houses owned by the house lord
-            for owned_house in self.get_houses_owned_by(house_lord):
-                details += self.add_points(owned_house, points, 
-                    f"{point_type} points via {planet}'s house lord {house_lord}")
-            
-            # Extra point for house lord's placement
-            lord_house = None
-            for h in range(1, 13):
-                if self.chart_data['points'][house_lord]['house'] == h:
-                    lord_house = h
-                    break
-            if lord_house:
-                details += self.add_points(lord_house, 1, 
-                    f"Extra point for {house_lord}'s placement (as {planet}'s house lord)")
-        
-        return details
-
-    def calculate_house_strengths(self, x, y, z):
-        """Calculate house strengths for given X, Y, Z planets"""
-        output = "Point Distribution Details:\n"
-        output += "-------------------------\n"
-        
-        # Handle X (Main Planet)
-        x_data = self.chart_data['points'][x]
-        if x in ['Rahu', 'Ketu']:
-            output += self.handle_rahu_ketu(x, x_data['house'], 1, "Power 1: Main Planet")
-        else:
-            # Power 1: Houses owned by X
-            for house in self.get_houses_owned_by(x):
-                output += self.add_points(house, 1, f"Power 1: House owned by {x}")
-        # Power 2: House where X is placed
-        output += self.add_points(x_data['house'], 2, f"Power 2: House where {x} is placed")
-        
-        # Handle Y (Star Lord) - only if different from X
-        if y != x:
-            y_data = self.chart_data['points'][y]
-            if y in ['Rahu', 'Ketu']:
-                output += self.handle_rahu_ketu(y, y_data['house'], 3, "Power 3: Star Lord")
-            else:
-                # Power 3: Houses owned by Y
-                for house in self.get_houses_owned_by(y):
-                    output += self.add_points(house, 3, f"Power 3: House owned by {y}")
-            # Power 4: House where Y is placed
-            output += self.add_points(y_data['house'], 4, f"Power 4: House where {y} is placed")
-        
-        # Handle Z (Sub Lord)
-        z_data = self.chart_data['points'][z]
-        if z in ['Rahu', 'Ketu']:
-            output += self.handle_rahu_ketu(z, z_data['house'], 5, "Power 5: Sub Lord")
-        else:
-            # Power 5: Houses owned by Z
-            for house in self.get_houses_owned_by(z):
-                output += self.add_points(house, 5, f"Power 5: House owned by {z}")
-        # Power 6: House where Z is placed
-        output += self.add_points(z_data['house'], 6, f"Power 6: House where {z} is placed")
-        
-        # Handle cuspal points
-        for house_num in range(1, 13):
-            house_data = self.chart_data['houses'][f"House_{house_num}"]
-            
-            # Powers 7 & 10: X as cuspal lord
-            if house_data['star_lord'] == x:
-                output += self.add_points(house_num, 7, f"Power 7: House where {x} is star lord of cusp")
-            if house_data['sub_lord'] == x:
-                output += self.add_points(house_num, 10, f"Power 10: House where {x} is sub lord of cusp")
-            
-            # Powers 8 & 11: Y as cuspal lord (only if different from X)
-            if y != x:
-                if house_data['star_lord'] == y:
-                    output += self.add_points(house_num, 8, f"Power 8: House where {y} is star lord of cusp")
-                if house_data['sub_lord'] == y:
-                    output += self.add_points(house_num, 11, f"Power 11: House where {y} is sub lord of cusp")
-            
-            # Powers 9 & 12: Z as cuspal lord
-            if house_data['star_lord'] == z:
-                output += self.add_points(house_num, 9, f"Power 9: House where {z} is star lord of cusp")
-            if house_data['sub_lord'] == z:
-                output += self.add_points(house_num, 12, f"Power 12: House where {z} is sub lord of cusp")
-        
-        return output
-
-    def calculate_single_planet(self, planet, role):
-        """Helper method to calculate for a single planet"""
-        x_data = self.chart_data['points'][planet]
-        y = x_data['star_lord']
-        z = x_data['sub_lord']
-        
-        details = f"Planets Involved:\n"
-        details += f"{role} (X): {planet}\n"
-        details += f"Star Lord (Y): {y}\n"
-        details += f"Sub Lord (Z): {z}\n\n"
-        
-        details += self.calculate_house_strengths(planet, y, z)
-        details += "\nResults:\n"
-        for house, points in self.house_points.items():
-            details += f"House {house}: {points} points\n"
-        
-        return details
-
     def calculate_yogeswarananda(self):
         try:
             output = "<pre>"  # Use pre-formatted text
             output += "Yogeswarananda Summary\n"
             output += "====================\n\n"
             
-            # Dictionary to store all results
-            all_results = {}
-            
-            # 1. Moon calculation
-            moon_data = self.chart_data['points']['Moon']
-            moon_star_lord = moon_data['star_lord']
-            moon_sub_lord = moon_data['sub_lord']
-            
-            self.house_points = {i: 0 for i in range(1, 13)}
-            self.calculate_single_planet('Moon', "X")
-            all_results['Moon'] = {
-                'combination': f"Moon-{moon_star_lord}-{moon_sub_lord}",
-                'points': self.house_points.copy()
-            }
-
-            # 2. Moon's star lord
-            star_lord_data = self.chart_data['points'][moon_star_lord]
-            star_lord_star = star_lord_data['star_lord']
-            star_lord_sub = star_lord_data['sub_lord']
-            
-            self.house_points = {i: 0 for i in range(1, 13)}
-            self.calculate_single_planet(moon_star_lord, "X")
-            all_results[moon_star_lord] = {
-                'combination': f"{moon_star_lord}-{star_lord_star}-{star_lord_sub}",
-                'points': self.house_points.copy()
-            }
-
-            # Calculate remaining planets
-            remaining_planets = [p for p in ['Sun', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu'] 
-                               if p != moon_star_lord]
-
-            for planet in remaining_planets:
-                planet_data = self.chart_data['points'][planet]
-                self.house_points = {i: 0 for i in range(1, 13)}
-                self.calculate_single_planet(planet, "X")
-                all_results[planet] = {
-                    'combination': f"{planet}-{planet_data['star_lord']}-{planet_data['sub_lord']}",
-                    'points': self.house_points.copy()
-                }
+            # Nodes earn one extra point for their sign lord's placement here
+            results = HouseStrengthCalculator(self.chart_data, lord_placement_points=1).calculate_all()
 
             # Format output with explicit line breaks
             count = 1
-            for planet, result in all_results.items():
-                output += f"{count}. {result['combination']}\n"
+            for planet, result in results.items():
+                output += f"{count}. {planet}-{result['star_lord']}-{result['sub_lord']}\n"
                 self.house_points = result['points']
                 output += "   " + self.format_house_points() + "\n\n"
                 count += 1
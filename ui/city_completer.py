@@ -0,0 +1,79 @@
+import threading
+from PyQt6.QtCore import QObject, Qt, QStringListModel, pyqtSignal
+from PyQt6.QtWidgets import QCompleter
+from utils.place_index import PlaceIndex
+
+class CityCompleter(QObject):
+    """Type-ahead city suggestions for a QLineEdit.
+
+    Every keystroke bumps a generation counter and hands the text to one
+    background thread. The thread only ever works on the latest text, checks
+    the counter while it searches, and results from an older keystroke are
+    dropped, so typing fast never queues up work or flashes stale lists.
+    """
+
+    suggestions_ready = pyqtSignal(int, list)
+
+    def __init__(self, line_edit, index=None, limit=8):
+        super().__init__(line_edit)
+        self.line_edit = line_edit
+        self.index = index if index is not None else PlaceIndex()
+        self.limit = limit
+        self.generation = 0
+        self.pending = None
+        self.condition = threading.Condition()
+        self.worker = None
+
+        self.model = QStringListModel(self)
+        self.completer = QCompleter(self.model, self)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        # The index already filtered and ranked the list
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        line_edit.setCompleter(self.completer)
+
+        line_edit.textEdited.connect(self.request)
+        self.suggestions_ready.connect(self.show_suggestions)
+
+    def request(self, text):
+        """Ask for suggestions for text, superseding any earlier request"""
+        with self.condition:
+            self.generation += 1
+            self.pending = (self.generation, text)
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run_worker, daemon=True)
+                self.worker.start()
+            self.condition.notify()
+
+    def is_current(self, generation):
+        return generation == self.generation
+
+    def run_worker(self):
+        """Serve the latest pending request; loads the index on first use"""
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                generation, text = self.pending
+                self.pending = None
+
+            if len(text.strip()) < 2:
+                suggestions = []
+            else:
+                try:
+                    suggestions = self.index.suggest(
+                        text, self.limit, cancelled=lambda: not self.is_current(generation))
+                except Exception as e:
+                    print(f"Error loading city suggestions: {e}")
+                    suggestions = []
+            if self.is_current(generation):
+                self.suggestions_ready.emit(generation, suggestions)
+
+    def show_suggestions(self, generation, suggestions):
+        """Runs on the UI thread; ignores answers to outdated keystrokes"""
+        if not self.is_current(generation):
+            return
+        self.model.setStringList(suggestions)
+        if suggestions and self.line_edit.hasFocus():
+            self.completer.complete()
+        else:
+            self.completer.popup().hide()
@@ -1,7 +1,80 @@
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QTabWidget
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QComboBox, QFrame
+from utils.vargas import VARGAS, SIGNS, chart_vargas
+
+# South Indian chart: fixed grid cell of each sign
+SIGN_CELLS = {
+    'Pisces': (0, 0), 'Aries': (0, 1), 'Taurus': (0, 2), 'Gemini': (0, 3),
+    'Aquarius': (1, 0), 'Cancer': (1, 3),
+    'Capricorn': (2, 0), 'Leo': (2, 3),
+    'Sagittarius': (3, 0), 'Scorpio': (3, 1), 'Libra': (3, 2), 'Virgo': (3, 3)
+}
+BODY_ABBREVIATIONS = {
+    'Ascendant': 'Asc', 'Sun': 'Su', 'Moon': 'Mo', 'Mars': 'Ma', 'Mercury': 'Me',
+    'Jupiter': 'Ju', 'Venus': 'Ve', 'Saturn': 'Sa', 'Rahu': 'Ra', 'Ketu': 'Ke',
+    'Uranus': 'Ur', 'Neptune': 'Ne', 'Pluto': 'Pl'
+}
 
 class DivisionalChartsTab(QWidget):
+    """Any varga (D1-D60) of a chart as a South Indian chart.
+
+    The varga sign matrix is calculated once per chart (chart_vargas caches
+    it in the chart), so switching vargas only refills the labels.
+    """
+
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.chart_data = None
         self.layout = QVBoxLayout(self)
-        # Add your divisional charts implementation here 
\ No newline at end of file
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Divisional chart:"))
+        self.varga_combo = QComboBox()
+        for number, (name, _, _) in VARGAS.items():
+            self.varga_combo.addItem(f"D{number} {name}", number)
+        self.varga_combo.setCurrentIndex(list(VARGAS).index(9))
+        self.varga_combo.currentIndexChanged.connect(self.show_selected)
+        controls.addWidget(self.varga_combo)
+        controls.addStretch(1)
+        self.layout.addLayout(controls)
+
+        grid = QGridLayout()
+        grid.setSpacing(0)
+        self.sign_labels = {}
+        for sign, (row, column) in SIGN_CELLS.items():
+            label = QLabel()
+            label.setFrameShape(QFrame.Shape.Box)
+            label.setAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+            label.setWordWrap(True)
+            label.setMinimumSize(110, 90)
+            grid.addWidget(label, row, column)
+            self.sign_labels[sign] = label
+        self.title_label = QLabel()
+        self.title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        grid.addWidget(self.title_label, 1, 1, 2, 2)
+        self.layout.addLayout(grid)
+
+    def set_chart(self, chart_data):
+        """Show the vargas of a chart dict"""
+        self.chart_data = chart_data
+        self.show_selected()
+
+    def show_selected(self):
+        self.show_varga(self.varga_combo.currentData())
+
+    def show_varga(self, number):
+        """Fill the chart from the cached sign matrix"""
+        if not self.chart_data:
+            return
+        try:
+            vargas = chart_vargas(self.chart_data)
+        except Exception as e:
+            print(f"Error calculating divisional charts: {e}")
+            return
+        row = vargas["numbers"].index(number)
+        occupants = {sign: [] for sign in SIGNS}
+        for body, sign in zip(vargas["bodies"], vargas["signs"][row]):
+            occupants[SIGNS[sign]].append(BODY_ABBREVIATIONS.get(body, body))
+        for sign, label in self.sign_labels.items():
+            label.setText(f"<small>{sign}</small><br><b>{' '.join(occupants[sign])}</b>")
+        self.title_label.setText(f"<b>D{number}</b><br>{VARGAS[number][0]}")
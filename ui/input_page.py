@@ -3,26 +3,37 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, 
                            QPushButton, QLabel, QMessageBox, QDialog, 
-                           QTableWidget, QTableWidgetItem, QTextEdit, 
+                           QTableWidget, QTableWidgetItem, QTableView, QTextEdit, 
                            QGroupBox, QComboBox, QScrollArea, QDateTimeEdit,
-                           QTreeWidget, QTreeWidgetItem, QStackedWidget, QApplication)
-from PyQt6.QtCore import QDateTime, Qt
-from geopy.geocoders import Nominatim
+                           QTreeWidget, QTreeWidgetItem, QStackedWidget, QApplication,
+                           QFileDialog, QProgressDialog)
+from PyQt6.QtCore import QDateTime, Qt, QTimer
 from geopy.exc import GeocoderTimedOut
-import json
 from utils.astro_calc import AstroCalc, DashaCalculator
+from utils.gazetteer import Gazetteer
+from utils.geocode_cache import CachedGeocoder, nominatim_provider
+from utils.profile_store import ProfileStore
+from utils.profile_import import ProfileImporter
+from utils.chart_codec import encode_chart, decode_chart, chart_settings_hash
 from datetime import datetime
 from PyQt6 import QtGui
 from .yogeswarananda_window import YogeswarananadaWindow
 from .chart_widgets import NorthernChartWidget
 from .chart_dialog import ChartDialog
 from .results_window import ResultsWindow
+from .city_completer import CityCompleter
+from .profile_table_model import ProfileTableModel
+from .divisional_charts import DivisionalChartsTab
 
 class InputPage(QWidget):
     def __init__(self):
         super().__init__()
         self.astro_calc = AstroCalc()
+        self.gazetteer = Gazetteer()  # Offline geocoder, opened on first search
+        self.geocoder = None  # Cached Nominatim lookups, created on first search
+        self.profile_store = ProfileStore()
         self.chart_data = None
+        self.chart_hash = None  # Settings hash of chart_data, see chart_codec
         self.results_window = None
         self.init_ui()
         
@@ -243,6 +254,7 @@ class InputPage(QWidget):
         city_label = QLabel("City:")
         city_label.setMinimumWidth(100)
         self.city_input = QLineEdit()
+        self.city_completer = CityCompleter(self.city_input)
         search_btn = QPushButton("Search")
         search_btn.setMaximumWidth(100)
         search_btn.clicked.connect(self.fetch_coordinates)
@@ -398,10 +410,13 @@ class InputPage(QWidget):
         # Profile management buttons
         self.save_btn = QPushButton("Save Profile")
         self.open_btn = QPushButton("Open Profile")
+        self.import_btn = QPushButton("Import Profiles")
         self.dashas_btn = QPushButton("Show Dashas")
         self.yogeswarananada_btn = QPushButton("Yogeswarananada")
+        self.divisional_btn = QPushButton("Divisional Charts")
         
-        for btn in [self.save_btn, self.open_btn, self.dashas_btn, self.yogeswarananada_btn]:
+        for btn in [self.save_btn, self.open_btn, self.import_btn, self.dashas_btn, self.yogeswarananada_btn,
+                    self.divisional_btn]:
             btn.setStyleSheet("""
                 QPushButton {
                     padding: 6px 12px;
@@ -417,8 +432,10 @@ class InputPage(QWidget):
         
         self.save_btn.clicked.connect(self.save_profile)
         self.open_btn.clicked.connect(self.open_profile)
+        self.import_btn.clicked.connect(self.import_profiles)
         self.dashas_btn.clicked.connect(self.show_dashas)
         self.yogeswarananada_btn.clicked.connect(self.yogeswarananada_handler)
+        self.divisional_btn.clicked.connect(self.show_divisional_charts)
         
         actions_layout.addLayout(primary_actions)
         actions_layout.addLayout(secondary_actions)
@@ -447,12 +464,13 @@ class InputPage(QWidget):
             return
             
         try:
-            # Make API request
-            geolocator = Nominatim(user_agent="astrology_app")
-            location = geolocator.geocode(city)
-            if location:
-                lat = location.latitude
-                lon = location.longitude
+            # Offline gazetteer first, then cached results, then Nominatim
+            if self.geocoder is None:
+                self.geocoder = CachedGeocoder(nominatim_provider, gazetteer=self.gazetteer)
+            place = self.geocoder.resolve(city)
+            if place:
+                lat = place["latitude"]
+                lon = place["longitude"]
                 
                 # Convert to DMS format
                 self.lat_input.setText(self.decimal_to_dms(lat, True))
@@ -474,30 +492,18 @@ class InputPage(QWidget):
             
         try:
             # Check if profile already exists
-            current_name = self.name_input.text()
-            existing_profiles = []
-            profile_exists = False
-            
-            try:
-                with open("profiles.json", "r") as f:
-                    for line in f:
-                        if line.strip():
-                            profile = json.loads(line)
-                            if profile["name"] == current_name and not profile_exists:
-                                profile_exists = True
-                                reply = QMessageBox.question(
-                                    self, 
-                                    "Profile Exists",
-                                    f"A profile with name '{current_name}' already exists. Do you want to overwrite it?",
-                                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                    QMessageBox.StandardButton.No
-                                )
-                                if reply == QMessageBox.StandardButton.No:
-                                    return
-                            elif profile["name"] != current_name:
-                                existing_profiles.append(profile)
-            except FileNotFoundError:
-                pass  # File doesn't exist yet, which is fine
+            # Stripped as the store saves it, so " mihir" still asks first
+            current_name = self.name_input.text().strip()
+            if self.profile_store.exists(current_name):
+                reply = QMessageBox.question(
+                    self, 
+                    "Profile Exists",
+                    f"A profile with name '{current_name}' already exists. Do you want to overwrite it?",
+                    QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                    QMessageBox.StandardButton.No
+                )
+                if reply == QMessageBox.StandardButton.No:
+                    return
                 
             # Get the current date time from the widget
             current_datetime = self.date_time.dateTime()
@@ -519,13 +525,13 @@ class InputPage(QWidget):
                 "longitude_decimal": lon_decimal  # Store decimal for calculations
             }
             
-            # Write all profiles back to file
-            with open("profiles.json", "w") as f:
-                for profile in existing_profiles:
-                    json.dump(profile, f)
-                    f.write("\n")
-                json.dump(new_profile, f)
-                f.write("\n")
+            # Insert or overwrite by name
+            self.profile_store.save(new_profile)
+            
+            # Store the chart on screen with it if it was calculated from this form
+            if self.chart_data and self.chart_hash == chart_settings_hash(**self.chart_inputs()):
+                self.profile_store.save_snapshot(current_name, encode_chart(self.chart_data),
+                                                 self.chart_hash)
                 
             QMessageBox.information(self, "Success", "Profile saved successfully!")
             
@@ -536,12 +542,9 @@ class InputPage(QWidget):
 
     def open_profile(self):
         try:
-            # Read all profiles from the file
-            profiles = []
-            with open("profiles.json", "r") as f:
-                for line in f:
-                    if line.strip():
-                        profiles.append(json.loads(line))
+            if not self.profile_store.has_profiles():
+                QMessageBox.information(self, "Info", "No saved profiles found")
+                return
             
             # Create dialog
             dialog = QDialog(self)
@@ -549,25 +552,30 @@ class InputPage(QWidget):
             dialog.setMinimumWidth(600)
             layout = QVBoxLayout()
             
-            # Create table
-            table = QTableWidget()
-            table.setColumnCount(5)
-            table.setHorizontalHeaderLabels(["Name", "Date & Time", "City", "Latitude", "Longitude"])
-            table.setRowCount(len(profiles))
-            
-            # Fill table with data
-            for row, profile in enumerate(profiles):
-                table.setItem(row, 0, QTableWidgetItem(str(profile.get("name", ""))))
-                table.setItem(row, 1, QTableWidgetItem(str(profile.get("datetime", ""))))
-                table.setItem(row, 2, QTableWidgetItem(str(profile.get("city", ""))))
-                table.setItem(row, 3, QTableWidgetItem(str(profile.get("latitude", ""))))
-                table.setItem(row, 4, QTableWidgetItem(str(profile.get("longitude", ""))))
+            # Search box, applied once typing pauses
+            search_input = QLineEdit()
+            search_input.setPlaceholderText("Search name or city")
+            
+            # Table reads profiles from the store a page at a time
+            model = ProfileTableModel(self.profile_store, dialog)
+            table = QTableView()
+            table.setModel(model)
+            table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+            table.setSelectionMode(QTableView.SelectionMode.SingleSelection)
+            table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+            table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+            table.setSortingEnabled(True)  # Loads the first page in saved order
+            
+            search_timer = QTimer(dialog)
+            search_timer.setSingleShot(True)
+            search_timer.setInterval(150)
+            search_timer.timeout.connect(lambda: model.set_search(search_input.text()))
+            search_input.textChanged.connect(search_timer.start)
             
             # Add load button
             def load_selected():
-                current_row = table.currentRow()
-                if current_row >= 0:
-                    profile = profiles[current_row]
+                profile = model.profile(table.currentIndex().row())
+                if profile:
                     self.name_input.setText(str(profile.get("name", "")))
                     self.city_input.setText(str(profile.get("city", "")))
                     self.lat_input.setText(str(profile.get("latitude", "")))
@@ -577,28 +585,63 @@ class InputPage(QWidget):
                     datetime_str = profile.get("datetime", "")
                     if datetime_str:
                         dt = QDateTime.fromString(datetime_str, "dd/MM/yyyy hh:mm:ss")
+                        if not dt.isValid():
+                            dt = QDateTime.fromString(datetime_str, "dd/MM/yyyy hh:mm")
                         if dt.isValid():
                             self.date_time.setDateTime(dt)
                         else:
                             print(f"Failed to parse datetime: {datetime_str}")
                     
                     dialog.accept()
+                    self.open_profile_chart(profile["name"])
             
             load_btn = QPushButton("Load")
             load_btn.clicked.connect(load_selected)
+            table.doubleClicked.connect(load_selected)
             
             # Add widgets to layout
+            layout.addWidget(search_input)
             layout.addWidget(table)
             layout.addWidget(load_btn)
             
             dialog.setLayout(layout)
             dialog.exec()
             
-        except FileNotFoundError:
-            QMessageBox.information(self, "Info", "No saved profiles found")
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load profiles: {str(e)}")
 
+    def import_profiles(self):
+        """Bulk import profiles from a CSV or JSONL file"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Profiles", "", "Profile files (*.csv *.jsonl *.json);;All files (*)")
+        if not path:
+            return
+            
+        progress_dialog = QProgressDialog("Importing profiles...", "Cancel", 0, 1000, self)
+        progress_dialog.setWindowTitle("Import Profiles")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(300)
+        
+        def progress(stats):
+            progress_dialog.setValue(stats["bytes_read"] * 1000 // max(stats["total_bytes"], 1))
+            progress_dialog.setLabelText(f"Imported {stats['imported']} of {stats['read']} profiles read...")
+            QApplication.processEvents()
+            return not progress_dialog.wasCanceled()
+        
+        try:
+            result = ProfileImporter(self.profile_store).import_file(path, progress)
+            progress_dialog.close()
+            
+            message = f"Imported {result['imported']} profiles."
+            if result["invalid"]:
+                details = "\n".join(f"Line {line}: {reason}" for line, reason in result["errors"][:10])
+                message += f"\n\n{result['invalid']} invalid records were skipped:\n{details}"
+            QMessageBox.information(self, "Import Profiles", message)
+            
+        except Exception as e:
+            progress_dialog.close()
+            QMessageBox.warning(self, "Error", f"Failed to import profiles: {str(e)}")
+
     def get_form_data(self):
         """Get and validate form data."""
         try:
@@ -634,90 +677,143 @@ class InputPage(QWidget):
                 QMessageBox.warning(self, "Error", "Please enter both latitude and longitude")
                 return
                 
-            # Get datetime
-            birth_time = self.date_time.dateTime()
-            if not birth_time.isValid():
-                QMessageBox.warning(self, "Error", "Please enter a valid date and time")
-                return
-                
-            # Validate coordinates
             try:
-                lat_text = self.lat_input.text().strip()
-                lon_text = self.long_input.text().strip()
-                
-                # Try DMS format first
-                try:
-                    if lat_text[-1].upper() in ['N', 'S'] and lon_text[-1].upper() in ['E', 'W']:
-                        latitude = self.dms_to_decimal(lat_text)
-                        longitude = self.dms_to_decimal(lon_text)
-                    else:
-                        # Try decimal format
-                        latitude = float(lat_text)
-                        longitude = float(lon_text)
-                except (ValueError, IndexError):
-                    # Try decimal format as fallback
-                    latitude = float(lat_text)
-                    longitude = float(lon_text)
-            
-                # Validate ranges
-                if abs(latitude) > 90:
-                    raise ValueError("Latitude must be between 90°N and 90°S")
-                if abs(longitude) > 180:
-                    raise ValueError("Longitude must be between 180°E and 180°W")
-                    
+                inputs = self.chart_inputs()
             except ValueError as e:
                 QMessageBox.warning(self, "Error", str(e))
                 return
                 
             # Calculate the chart data
-            self.chart_data = self.astro_calc.calculate_chart(
-                dt=birth_time.toPyDateTime(),
-                lat=latitude,
-                lon=longitude,
-                calc_type=self.calc_type.currentText(),
-                zodiac=self.zodiac_system.currentText(),
-                ayanamsa=self.ayanamsa.currentText(),
-                house_system=self.house_system.currentText(),
-                node_type=self.node_type.currentText()
-            )
-            
-            # Enable buttons after successful calculation
-            self.yogeswarananada_btn.setEnabled(True)
-            self.dashas_btn.setEnabled(True)
-            
-            # Create or show results window
-            if not self.results_window:
-                self.results_window = ResultsWindow(self)
+            self.chart_data = self.astro_calc.calculate_chart(**inputs)
+            self.chart_hash = chart_settings_hash(**inputs)
             
-            # Generate and display results
-            html_content = self.generate_html_results(self.chart_data)
-            self.results_window.set_html_content(html_content)
-            self.results_window.show()
-            self.results_window.raise_()  # Bring window to front
-            
-            # Find existing chart dialog
-            existing_dialog = None
-            for widget in QApplication.topLevelWidgets():
-                if isinstance(widget, ChartDialog) and not widget.isHidden():
-                    existing_dialog = widget
-                    break
+            self.show_chart(self.chart_data, self.chart_hash)
             
-            if existing_dialog:
-                # Update existing chart widget
-                existing_dialog.chart_widget.update_data(self.chart_data)
-                existing_dialog.chart_widget.update()
-            else:
-                # Create and show new chart dialog
-                chart_widget = NorthernChartWidget(self, input_page=self)
-                chart_widget.update_data(self.chart_data)
-                dialog = ChartDialog(chart_widget, self)
-                dialog.show()
+            # Keep the saved profile's snapshot current
+            self.profile_store.save_snapshot(self.name_input.text().strip(),
+                                             encode_chart(self.chart_data), self.chart_hash)
             
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to calculate chart: {str(e)}")
             self.yogeswarananada_btn.setEnabled(False)
             self.dashas_btn.setEnabled(False)
 
+    def chart_inputs(self):
+        """Chart arguments from the form and settings; raises ValueError when invalid"""
+        birth_time = self.date_time.dateTime()
+        if not birth_time.isValid():
+            raise ValueError("Please enter a valid date and time")
+            
+        lat_text = self.lat_input.text().strip()
+        lon_text = self.long_input.text().strip()
+        
+        # Try DMS format first
+        try:
+            if lat_text[-1].upper() in ['N', 'S'] and lon_text[-1].upper() in ['E', 'W']:
+                latitude = self.dms_to_decimal(lat_text)
+                longitude = self.dms_to_decimal(lon_text)
+            else:
+                # Try decimal format
+                latitude = float(lat_text)
+                longitude = float(lon_text)
+        except (ValueError, IndexError):
+            # Try decimal format as fallback
+            latitude = float(lat_text)
+            longitude = float(lon_text)
+    
+        # Validate ranges
+        if abs(latitude) > 90:
+            raise ValueError("Latitude must be between 90°N and 90°S")
+        if abs(longitude) > 180:
+            raise ValueError("Longitude must be between 180°E and 180°W")
+            
+        return {
+            "dt": birth_time.toPyDateTime(),
+            "lat": latitude,
+            "lon": longitude,
+            "calc_type": self.calc_type.currentText(),
+            "zodiac": self.zodiac_system.currentText(),
+            "ayanamsa": self.ayanamsa.currentText(),
+            "house_system": self.house_system.currentText(),
+            "node_type": self.node_type.currentText()
+        }
+
+    def open_profile_chart(self, name):
+        """Show a loaded profile's chart from its snapshot, recalculating only if outdated"""
+        try:
+            inputs = self.chart_inputs()
+        except ValueError as e:
+            print(f"Cannot show chart for profile {name}: {e}")
+            return
+            
+        snapshot, snapshot_hash = self.profile_store.get_snapshot(name)
+        chart_hash = chart_settings_hash(**inputs)
+        if snapshot and snapshot_hash == chart_hash:
+            try:
+                self.chart_data = decode_chart(snapshot, self.astro_calc)
+                self.chart_hash = chart_hash
+                self.show_chart(self.chart_data, self.chart_hash)
+                return
+            except Exception as e:
+                print(f"Error decoding chart snapshot for {name}: {e}")
+        
+        # Missing, or made with other inputs, settings or engine version:
+        # recalculate once the profile dialog has closed
+        QTimer.singleShot(0, lambda: self.regenerate_snapshot(name, inputs))
+
+    def regenerate_snapshot(self, name, inputs):
+        """Recalculate a profile's chart, store its snapshot and show it"""
+        try:
+            self.chart_data = self.astro_calc.calculate_chart(**inputs)
+            self.chart_hash = chart_settings_hash(**inputs)
+            self.profile_store.save_snapshot(name, encode_chart(self.chart_data), self.chart_hash)
+            self.show_chart(self.chart_data, self.chart_hash)
+        except Exception as e:
+            print(f"Error regenerating chart for profile {name}: {e}")
+
+    def show_chart(self, chart_data, chart_hash=None):
+        """Display already calculated chart data in the results window and chart dialog.
+
+        chart_hash is the settings hash of the form inputs the chart was
+        calculated from; other charts (a horary chart, a variant picked in
+        the chart widget) leave it None so Save Profile doesn't store them
+        as the profile's snapshot.
+        """
+        self.chart_data = chart_data
+        self.chart_hash = chart_hash
+        
+        # Enable buttons after successful calculation
+        self.yogeswarananada_btn.setEnabled(True)
+        self.dashas_btn.setEnabled(True)
+        
+        # Create or show results window
+        if not self.results_window:
+            self.results_window = ResultsWindow(self)
+        
+        # Generate and display results
+        html_content = self.generate_html_results(self.chart_data)
+        self.results_window.set_html_content(html_content)
+        self.results_window.show()
+        self.results_window.raise_()  # Bring window to front
+        
+        # Find existing chart dialog
+        existing_dialog = None
+        for widget in QApplication.topLevelWidgets():
+            if isinstance(widget, ChartDialog) and not widget.isHidden():
+                existing_dialog = widget
+                break
+        
+        if existing_dialog:
+            # Update existing chart widget
+            existing_dialog.chart_widget.update_data(self.chart_data)
+            existing_dialog.chart_widget.update()
+        else:
+            # Create and show new chart dialog
+            chart_widget = NorthernChartWidget(self, input_page=self)
+            chart_widget.update_data(self.chart_data)
+            dialog = ChartDialog(chart_widget, self)
+            dialog.show()
+
     def generate_html_results(self, chart_data):
         """Generate HTML formatted results."""
         try:
@@ -967,6 +1063,19 @@ class InputPage(QWidget):
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to calculate dashas: {str(e)}")
 
+    def show_divisional_charts(self):
+        """Show the vargas (D1-D60) of the current chart"""
+        if not self.chart_data:
+            QMessageBox.warning(self, "Error", "Please calculate the chart first")
+            return
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Divisional Charts")
+        layout = QVBoxLayout(dialog)
+        tab = DivisionalChartsTab(dialog)
+        tab.set_chart(self.chart_data)
+        layout.addWidget(tab)
+        dialog.show()
+
     # Add the handler method for the new button
     def yogeswarananada_handler(self):
         try:
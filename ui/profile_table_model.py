@@ -0,0 +1,86 @@
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+class ProfileTableModel(QAbstractTableModel):
+    """Table model over the profile store that loads rows a page at a time.
+
+    Views call fetchMore() as they scroll, so opening the picker only reads
+    the first page however many profiles are saved. Searching and sorting
+    are done by the store's indexes, not in Python.
+    """
+
+    HEADERS = ["Name", "Date & Time", "City", "Latitude", "Longitude"]
+    FIELDS = ["name", "datetime", "city", "latitude", "longitude"]
+    # Store sort for each column; coordinates keep insertion order
+    SORTS = ["name", "birth", "city", "id", "id"]
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.search = ""
+        self.sort_key = "id"
+        self.descending = False
+        self.rows = []
+        self.cursor = None
+        self.exhausted = False
+
+    def reload(self):
+        """Drop the loaded rows and read the first page again"""
+        self.beginResetModel()
+        self.rows = []
+        self.cursor = None
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def set_search(self, text):
+        if text.strip().lower() != self.search:
+            self.search = text.strip().lower()
+            self.reload()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        value = self.rows[index.row()].get(self.FIELDS[index.column()])
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        """Append the next page from the store"""
+        if parent.isValid() or self.exhausted:
+            return
+        try:
+            page = self.store.search_page(self.search, self.sort_key, self.descending, self.cursor)
+        except Exception as e:
+            print(f"Error loading profiles: {e}")
+            page = []
+        if len(page) < self.store.PAGE_SIZE:
+            self.exhausted = True
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(profile for cursor, profile in page)
+        self.cursor = page[-1][0]
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Sort in the database; birth dates sort chronologically"""
+        self.sort_key = self.SORTS[column] if 0 <= column < len(self.SORTS) else "id"
+        self.descending = order == Qt.SortOrder.DescendingOrder
+        self.reload()
+
+    def profile(self, row):
+        """The full profile dict shown at row"""
+        return self.rows[row] if 0 <= row < len(self.rows) else None
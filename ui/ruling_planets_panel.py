@@ -0,0 +1,83 @@
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QFrame, QLabel, QVBoxLayout
+from utils.ruling_planets import RulingPlanets
+
+class RulingPlanetsPanel(QFrame):
+    """Live KP ruling planets for a location.
+
+    The lords are recalculated only when the last result says they change
+    (ascendant or Moon sub ingress, sunrise); the timer tick in between just
+    counts down to that moment.
+    """
+
+    TICK_MS = 2000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFrameShape(QFrame.Shape.StyledPanel)
+        self.setFixedWidth(260)
+        self.setAutoFillBackground(True)
+        self.ruling = None
+        self.result = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(8, 8, 8, 8)
+        self.lords_label = QLabel()
+        self.lords_label.setTextFormat(Qt.TextFormat.RichText)
+        self.countdown_label = QLabel()
+        layout.addWidget(self.lords_label)
+        layout.addWidget(self.countdown_label)
+
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.timer.setInterval(self.TICK_MS)
+        self.timer.timeout.connect(self.refresh)
+
+    def set_location(self, lat, lon, zodiac="Sidereal", ayanamsa="Krishnamurti", calc=None):
+        """Show the ruling planets for a location; recalculates at once"""
+        settings = (float(lat), float(lon), zodiac, ayanamsa)
+        if self.ruling is None or (self.ruling.lat, self.ruling.lon, self.ruling.zodiac,
+                                   self.ruling.ayanamsa) != settings:
+            self.ruling = RulingPlanets(lat, lon, zodiac, ayanamsa, calc=calc)
+            self.result = None
+        self.refresh()
+
+    def start(self):
+        self.refresh()
+        self.timer.start()
+        self.show()
+
+    def stop(self):
+        self.timer.stop()
+        self.hide()
+
+    def refresh(self):
+        """Timer tick: recalculate only once the ruling planets have changed"""
+        if self.ruling is None:
+            self.lords_label.setText("No chart location")
+            return
+        now = self.ruling.calc.julian_day_utc()
+        if self.result is None or now >= self.result["next_change"]:
+            try:
+                self.result = self.ruling.calculate(now)
+            except Exception as e:
+                print(f"Error calculating ruling planets: {e}")
+                return
+            self.show_lords()
+        seconds = max(0, int((self.result["next_change"] - now) * 86400))
+        self.countdown_label.setText(
+            f"Next change ({self.result['next_change_part']}) in {seconds // 60}:{seconds % 60:02d}")
+
+    def show_lords(self):
+        result = self.result
+        rows = "".join(
+            f"<tr><td>{name}</td><td>{part['sign_lord']}</td><td>{part['star_lord']}</td>"
+            f"<td>{part['sub_lord']}</td></tr>"
+            for name, part in [("Asc", result["ascendant"]), ("Moon", result["moon"])])
+        time = result["time"].astimezone().strftime("%H:%M:%S")
+        self.lords_label.setText(
+            f"<b>Ruling planets</b> at {time}<br>"
+            f"<table><tr><th></th><th>Sign</th><th>Star</th><th>Sub</th></tr>{rows}</table>"
+            f"Day lord: {result['day_lord']}<br>"
+            f"<b>{', '.join(result['ruling_planets'])}</b>")
+        self.adjustSize()
@@ -0,0 +1,53 @@
+import time
+from collections import deque
+from PyQt6.QtCore import QObject, QTimer
+
+class SpeculativePrecompute(QObject):
+    """Precompute likely next chart variants while the event loop is idle.
+
+    Jobs run in small slices from a zero-interval timer, so they only use time
+    the UI isn't using. Each slice stops after ``slice_budget`` seconds of CPU
+    time and the whole run stops after ``total_budget`` seconds.
+    """
+
+    def __init__(self, compute, parent=None, slice_budget=0.02, total_budget=1.5):
+        super().__init__(parent)
+        self.compute = compute  # callable(job) -> None, stores its own result
+        self.slice_budget = slice_budget
+        self.total_budget = total_budget
+        self.jobs = deque()
+        self.cpu_used = 0.0
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(0)
+        self.timer.timeout.connect(self.run_slice)
+
+    def start(self, jobs):
+        """Replace any pending work with a new ordered list of jobs"""
+        self.cancel()
+        self.jobs.extend(jobs)
+        if self.jobs:
+            self.timer.start()
+
+    def cancel(self):
+        """Drop all pending jobs"""
+        self.timer.stop()
+        self.jobs.clear()
+        self.cpu_used = 0.0
+
+    def is_running(self):
+        return self.timer.isActive()
+
+    def run_slice(self):
+        """Run jobs until the slice budget is used up"""
+        slice_start = time.process_time()
+        while self.jobs and time.process_time() - slice_start < self.slice_budget:
+            job = self.jobs.popleft()
+            try:
+                self.compute(job)
+            except Exception as e:
+                print(f"Error precomputing {job}: {e}")
+
+        self.cpu_used += time.process_time() - slice_start
+        if not self.jobs or self.cpu_used >= self.total_budget:
+            self.cancel()
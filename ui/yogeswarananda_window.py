@@ -2,12 +2,14 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QTextBrowser, QMessageBox)
 from PyQt6.QtCore import Qt
 from datetime import datetime
 from .yogeswarananda_results import YogeswaranandaResultsWindow
+from utils.house_strength import HouseStrengthCalculator
 from PyQt6.QtCore import Qt
 
 class YogeswarananadaWindow(QDialog):
     def __init__(self, chart_data, parent=None):
         super().__init__(parent)
         self.chart_data = chart_data
+        self.house_strength = HouseStrengthCalculator(chart_data)
         self.house_points = {i: 0 for i in range(1, 13)}  # Initialize points for each house
         self.calculation_details = ""  # Store calculation details
         self.results_window = None
@@ -86,63 +88,6 @@ class YogeswarananadaWindow(QDialog):
             if show_calculations:
                 scrollbar.setValue(scrollbar.maximum())
 
-    def get_house_lord(self, sign):
-        """Get the lord of a sign"""
-        sign_lords = {
-            'Aries': 'Mars',
-            'Taurus': 'Venus',
-            'Gemini': 'Mercury',
-            'Cancer': 'Moon',
-            'Leo': 'Sun',
-            'Virgo': 'Mercury',
-            'Libra': 'Venus',
-            'Scorpio': 'Mars',
-            'Sagittarius': 'Jupiter',
-            'Capricorn': 'Saturn',
-            'Aquarius': 'Saturn',
-            'Pisces': 'Jupiter'
-        }
-        return sign_lords.get(sign)
-
-    def get_houses_owned_by(self, planet):
-        """Get list of houses owned by a planet"""
-        owned_houses = []
-        for house_num in range(1, 13):
-            house_key = f"House_{house_num}"
-            house_sign = self.chart_data['houses'][house_key]['sign']
-            if self.get_house_lord(house_sign) == planet:
-                owned_houses.append(house_num)
-        return owned_houses
-
-    def add_points(self, house_num, points, reason=""):
-        """Add points to a house and track the reason"""
-        self.house_points[house_num] += points
-        return f"House {house_num}: +{points} points ({reason})\n"
-
-    def handle_rahu_ketu(self, planet, house_num, points, point_type):
-        """Special handling for Rahu/Ketu points"""
-        details = ""
-        if planet in ['Rahu', 'Ketu']:
-            house_sign = self.chart_data['houses'][f"House_{house_num}"]['sign']
-            house_lord = self.get_house_lord(house_sign)
-            
-            # Give points to houses owned by the house lord
-            for owned_house in self.get_houses_owned_by(house_lord):
-                details += self.add_points(owned_house, points, 
-                    f"{point_type} points via {planet}'s house lord {house_lord}")
-            
-            # Extra point for house lord's placement
-            lord_house = None
-            for h in range(1, 13):
-                if self.chart_data['points'][house_lord]['house'] == h:
-                    lord_house = h
-                    break
-            if lord_house:
-                details += self.add_points(lord_house, points, 
-                    f"Extra {points} points for {house_lord}'s placement (as {planet}'s house lord)")
-        
-        return details
-
     def get_current_dasa_lord(self):
         """Determine the current dasa lord from chart data"""
         try:
@@ -175,88 +120,6 @@ class YogeswarananadaWindow(QDialog):
             print(f"Error determining dasa lord: {e}")
             return 'Moon'  # Fallback
 
-    def calculate_house_strengths(self, x, y, z):
-        """Calculate house strengths for given X, Y, Z planets"""
-        output = "Point Distribution Details:\n"
-        output += "-------------------------\n"
-        
-        # Handle X (Main Planet)
-        x_data = self.chart_data['points'][x]
-        if x in ['Rahu', 'Ketu']:
-            output += self.handle_rahu_ketu(x, x_data['house'], 1, "Power 1: Main Planet")
-        else:
-            # Power 1: Houses owned by X
-            for house in self.get_houses_owned_by(x):
-                output += self.add_points(house, 1, f"Power 1: House owned by {x}")
-        # Power 2: House where X is placed
-        output += self.add_points(x_data['house'], 2, f"Power 2: House where {x} is placed")
-        
-        # Handle Y (Star Lord) - only if different from X
-        if y != x:
-            y_data = self.chart_data['points'][y]
-            if y in ['Rahu', 'Ketu']:
-                output += self.handle_rahu_ketu(y, y_data['house'], 3, "Power 3: Star Lord")
-            else:
-                # Power 3: Houses owned by Y
-                for house in self.get_houses_owned_by(y):
-                    output += self.add_points(house, 3, f"Power 3: House owned by {y}")
-            # Power 4: House where Y is placed
-            output += self.add_points(y_data['house'], 4, f"Power 4: House where {y} is placed")
-        
-        # Handle Z (Sub Lord)
-        z_data = self.chart_data['points'][z]
-        if z in ['Rahu', 'Ketu']:
-            output += self.handle_rahu_ketu(z, z_data['house'], 5, "Power 5: Sub Lord")
-        else:
-            # Power 5: Houses owned by Z
-            for house in self.get_houses_owned_by(z):
-                output += self.add_points(house, 5, f"Power 5: House owned by {z}")
-        # Power 6: House where Z is placed
-        output += self.add_points(z_data['house'], 6, f"Power 6: House where {z} is placed")
-        
-        # Handle cuspal points
-        for house_num in range(1, 13):
-            house_data = self.chart_data['houses'][f"House_{house_num}"]
-            
-            # Powers 7 & 10: X as cuspal lord
-            if house_data['star_lord'] == x:
-                output += self.add_points(house_num, 7, f"Power 7: House where {x} is star lord of cusp")
-            if house_data['sub_lord'] == x:
-                output += self.add_points(house_num, 10, f"Power 10: House where {x} is sub lord of cusp")
-            
-            # Powers 8 & 11: Y as cuspal lord (only if different from X)
-            if y != x:
-                if house_data['star_lord'] == y:
-                    output += self.add_points(house_num, 8, f"Power 8: House where {y} is star lord of cusp")
-                if house_data['sub_lord'] == y:
-                    output += self.add_points(house_num, 11, f"Power 11: House where {y} is sub lord of cusp")
-            
-            # Powers 9 & 12: Z as cuspal lord
-            if house_data['star_lord'] == z:
-                output += self.add_points(house_num, 9, f"Power 9: House where {z} is star lord of cusp")
-            if house_data['sub_lord'] == z:
-                output += self.add_points(house_num, 12, f"Power 12: House where {z} is sub lord of cusp")
-        
-        return output
-
-    def calculate_single_planet(self, planet, role):
-        """Helper method to calculate for a single planet"""
-        x_data = self.chart_data['points'][planet]
-        y = x_data['star_lord']
-        z = x_data['sub_lord']
-        
-        details = f"Planets Involved:\n"
-        details += f"{role} (X): {planet}\n"
-        details += f"Star Lord (Y): {y}\n"
-        details += f"Sub Lord (Z): {z}\n\n"
-        
-        details += self.calculate_house_strengths(planet, y, z)
-        details += "\nResults:\n"
-        for house, points in self.house_points.items():
-            details += f"House {house}: {points} points\n"
-        
-        return details
-
     def calculate_yogeswarananada(self):
         try:
             output = "Yogeswarananda House Strength Calculations\n"
@@ -286,8 +149,7 @@ class YogeswarananadaWindow(QDialog):
                     
                     output += f"\n{role}: {planet} - {planet_data['star_lord']} - {planet_data['sub_lord']}\n"
                     output += "=" * 40 + "\n"
-                    self.house_points = {i: 0 for i in range(1, 13)}
-                    details = self.calculate_single_planet(planet, "X")
+                    self.house_points, details = self.house_strength.planet_strengths(planet, "X")
                     output += details
                     calculated_results[planet] = True
             
@@ -406,8 +268,7 @@ class YogeswarananadaWindow(QDialog):
                 sub_lord = planet_data['sub_lord']
                 
                 # Calculate points for this planet
-                self.house_points = {i: 0 for i in range(1, 13)}
-                self.calculate_house_strengths(planet, star_lord, sub_lord)
+                self.house_points, _ = self.house_strength.house_strengths(planet, star_lord, sub_lord)
                 
                 html_output += f'<div class="section">'
                 html_output += f'<h3 class="section-title">{planet}</h3>'
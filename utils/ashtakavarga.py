@@ -0,0 +1,142 @@
+"""Ashtakavarga: benefic points (bindus) of the seven planets by sign.
+
+For each planet's Bhinnashtakavarga (BAV) each of eight contributors (the
+seven planets and the ascendant) gives a bindu to fixed houses counted
+from its own sign. Those houses are kept as 12-bit masks (bit 0 for the
+contributor's own sign), so placing a contributor is a 12-bit rotation
+by its sign and a BAV is the bit count per sign over eight rotated masks.
+The Sarvashtakavarga (SAV) adds up the seven BAVs. Everything works on
+arrays of signs, so one chart and a million charts take the same path.
+"""
+import numpy as np
+
+PLANETS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+CONTRIBUTORS = PLANETS + ["Ascendant"]
+SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+         'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+
+# BENEFIC_HOUSES[planet][contributor]: houses from the contributor's sign
+# where it gives the planet a bindu (Parashara)
+BENEFIC_HOUSES = {
+    "Sun": {
+        "Sun": [1, 2, 4, 7, 8, 9, 10, 11], "Moon": [3, 6, 10, 11],
+        "Mars": [1, 2, 4, 7, 8, 9, 10, 11], "Mercury": [3, 5, 6, 9, 10, 11, 12],
+        "Jupiter": [5, 6, 9, 11], "Venus": [6, 7, 12],
+        "Saturn": [1, 2, 4, 7, 8, 9, 10, 11], "Ascendant": [3, 4, 6, 10, 11, 12]
+    },
+    "Moon": {
+        "Sun": [3, 6, 7, 8, 10, 11], "Moon": [1, 3, 6, 7, 10, 11],
+        "Mars": [2, 3, 5, 6, 9, 10, 11], "Mercury": [1, 3, 4, 5, 7, 8, 10, 11],
+        "Jupiter": [1, 4, 7, 8, 10, 11, 12], "Venus": [3, 4, 5, 7, 9, 10, 11],
+        "Saturn": [3, 5, 6, 11], "Ascendant": [3, 6, 10, 11]
+    },
+    "Mars": {
+        "Sun": [3, 5, 6, 10, 11], "Moon": [3, 6, 11],
+        "Mars": [1, 2, 4, 7, 8, 10, 11], "Mercury": [3, 5, 6, 11],
+        "Jupiter": [6, 10, 11, 12], "Venus": [6, 8, 11, 12],
+        "Saturn": [1, 4, 7, 8, 9, 10, 11], "Ascendant": [1, 3, 6, 10, 11]
+    },
+    "Mercury": {
+        "Sun": [5, 6, 9, 11, 12], "Moon": [2, 4, 6, 8, 10, 11],
+        "Mars": [1, 2, 4, 7, 8, 9, 10, 11], "Mercury": [1, 3, 5, 6, 9, 10, 11, 12],
+        "Jupiter": [6, 8, 11, 12], "Venus": [1, 2, 3, 4, 5, 8, 9, 11],
+        "Saturn": [1, 2, 4, 7, 8, 9, 10, 11], "Ascendant": [1, 2, 4, 6, 8, 10, 11]
+    },
+    "Jupiter": {
+        "Sun": [1, 2, 3, 4, 7, 8, 9, 10, 11], "Moon": [2, 5, 7, 9, 11],
+        "Mars": [1, 2, 4, 7, 8, 10, 11], "Mercury": [1, 2, 4, 5, 6, 9, 10, 11],
+        "Jupiter": [1, 2, 3, 4, 7, 8, 10, 11], "Venus": [2, 5, 6, 9, 10, 11],
+        "Saturn": [3, 5, 6, 12], "Ascendant": [1, 2, 4, 5, 6, 7, 9, 10, 11]
+    },
+    "Venus": {
+        "Sun": [8, 11, 12], "Moon": [1, 2, 3, 4, 5, 8, 9, 11, 12],
+        "Mars": [3, 5, 6, 9, 11, 12], "Mercury": [3, 5, 6, 9, 11],
+        "Jupiter": [5, 8, 9, 10, 11], "Venus": [1, 2, 3, 4, 5, 8, 9, 10, 11],
+        "Saturn": [3, 4, 5, 8, 9, 10, 11], "Ascendant": [1, 2, 3, 4, 5, 8, 9, 11]
+    },
+    "Saturn": {
+        "Sun": [1, 2, 4, 7, 8, 10, 11], "Moon": [3, 6, 11],
+        "Mars": [3, 5, 6, 10, 11, 12], "Mercury": [6, 8, 9, 10, 11, 12],
+        "Jupiter": [5, 6, 11, 12], "Venus": [6, 11, 12],
+        "Saturn": [3, 5, 6, 11], "Ascendant": [1, 3, 4, 6, 10, 11]
+    }
+}
+
+# BENEFIC_MASKS[planet index, contributor index]: 12-bit house masks
+BENEFIC_MASKS = np.array([[sum(1 << (house - 1) for house in BENEFIC_HOUSES[planet][contributor])
+                           for contributor in CONTRIBUTORS] for planet in PLANETS], dtype=np.uint16)
+FULL_MASK = (1 << 12) - 1
+SIGN_BITS = np.arange(12, dtype=np.uint16)
+
+def rotate(masks, signs):
+    """Masks counted from a sign turned into masks of absolute signs (12-bit rotation)"""
+    signs = np.asarray(signs, dtype=np.uint16)
+    return ((masks << signs) | (masks >> ((12 - signs) % 12))) & FULL_MASK
+
+def popcount(masks):
+    """Set bits of each 12-bit mask"""
+    return ((np.asarray(masks)[..., None] >> SIGN_BITS) & 1).sum(axis=-1)
+
+def chart_signs(chart):
+    """Sign indices of the contributors in a chart dict, CONTRIBUTORS order"""
+    return np.array([SIGNS.index(chart["points"][name]["sign"]) for name in CONTRIBUTORS])
+
+def column_signs(columns):
+    """Sign indices (charts x contributors) from a columnar chart file"""
+    return np.asarray(columns["sign"][:, [columns.body_index(name) for name in CONTRIBUTORS]], dtype=np.int64)
+
+def ashtakavarga(signs):
+    """BAV and SAV for contributor signs (..., 8).
+
+    Returns (bav, sav): bav is (..., 7 planets, 12 signs) bindus and sav
+    (..., 12 signs). The masks themselves are (..., 7, 8) after rotation.
+    """
+    rotated = rotate(BENEFIC_MASKS, np.asarray(signs)[..., None, :])
+    # Bindus per sign: the bit for that sign summed over the contributors
+    bav = ((rotated[..., None] >> SIGN_BITS) & 1).sum(axis=-2, dtype=np.int64)
+    return bav, bav.sum(axis=-2)
+
+class AshtakavargaCalculator:
+    """Ashtakavarga of one chart dict, with a transit quality score"""
+
+    def __init__(self, chart_data):
+        self.chart_data = chart_data
+        self.signs = chart_signs(chart_data)
+        self.bav, self.sav = ashtakavarga(self.signs)
+
+    def bhinnashtakavarga(self):
+        """planet -> {sign: bindus}"""
+        return {planet: dict(zip(SIGNS, (int(b) for b in self.bav[i]))) for i, planet in enumerate(PLANETS)}
+
+    def sarvashtakavarga(self):
+        """sign -> total bindus (337 over the zodiac)"""
+        return dict(zip(SIGNS, (int(b) for b in self.sav)))
+
+    def totals(self):
+        """planet -> bindus over the zodiac (popcount of its eight masks)"""
+        masks = BENEFIC_MASKS.astype(np.int64)
+        return {planet: int(popcount(masks[i]).sum()) for i, planet in enumerate(PLANETS)}
+
+    def transit_quality(self, transits):
+        """How well transiting planets are placed by the natal Ashtakavarga.
+
+        transits maps names to points with a sign (calculate_transits).
+        Each planet gets its BAV bindus and the SAV of its transit sign;
+        the score adds bindus - 4 over the planets (4 of 8 is neutral),
+        so a positive score is a supportive transit.
+        """
+        planets = {}
+        for i, planet in enumerate(PLANETS):
+            if planet not in transits:
+                continue
+            sign = SIGNS.index(transits[planet]["sign"])
+            planets[planet] = {"sign": SIGNS[sign], "bindus": int(self.bav[i, sign]), "sav": int(self.sav[sign])}
+        return {"planets": planets, "score": sum(p["bindus"] - 4 for p in planets.values())}
+
+def transit_quality_batch(natal_signs, transit_signs):
+    """Transit scores (bindus - 4 summed over the planets) for many natal
+    charts (..., 8 contributor signs) against transit planet signs (..., 7)"""
+    bav, _ = ashtakavarga(natal_signs)
+    transit_signs = np.broadcast_to(transit_signs, bav.shape[:-1])
+    bindus = np.take_along_axis(bav, transit_signs[..., None], axis=-1)[..., 0]
+    return (bindus - 4).sum(axis=-1)
@@ -0,0 +1,136 @@
+"""Aspects between chart points.
+
+The circular distances between every pair of points form one NumPy
+matrix, and each distance is matched against all aspect angles at once:
+the aspect is the closest angle within its orb. Vedic graha drishti is by
+whole signs instead: every graha aspects the 7th sign from its own, Mars
+also the 4th and 8th, Jupiter the 5th and 9th and Saturn the 3rd and 10th.
+
+Points are dicts of name to point dicts with a longitude (and sign), as in
+chart["points"] or calculate_transits, so the same engine works within
+one chart, from transits to a natal chart and from chart to chart.
+"""
+import numpy as np
+
+MAJOR_ASPECTS = {
+    'Conjunction': 0,
+    'Opposition': 180,
+    'Trine': 120,
+    'Square': 90,
+    'Sextile': 60
+}
+
+# Orbs in degrees
+DEFAULT_ORBS = {
+    'Conjunction': 8.0,
+    'Opposition': 8.0,
+    'Trine': 7.0,
+    'Square': 7.0,
+    'Sextile': 5.0
+}
+
+# Houses counted from a graha's own sign (its own sign being the 1st)
+GRAHA_DRISHTI = {
+    "Sun": (7,),
+    "Moon": (7,),
+    "Mercury": (7,),
+    "Venus": (7,),
+    "Mars": (4, 7, 8),
+    "Jupiter": (5, 7, 9),
+    "Saturn": (3, 7, 10)
+}
+
+SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+         'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+
+class AspectEngine:
+    """Aspect matrices with configurable aspects and orbs"""
+
+    def __init__(self, aspects=None, orbs=None, default_orb=5.0):
+        self.aspects = dict(aspects or MAJOR_ASPECTS)
+        self.names = list(self.aspects)
+        self.angles = np.array([self.aspects[name] for name in self.names], dtype=float)
+        orbs = dict(DEFAULT_ORBS, **(orbs or {}))
+        self.orbs = np.array([orbs.get(name, default_orb) for name in self.names], dtype=float)
+        # drishti[graha][houses - 1]: whether the graha aspects that house from its sign
+        self.drishti_table = {graha: np.isin(np.arange(1, 13), houses) for graha, houses in GRAHA_DRISHTI.items()}
+
+    def distances(self, first, second):
+        """Circular distances (0-180) between every pair of longitudes"""
+        first = np.asarray(first, dtype=float)
+        second = np.asarray(second, dtype=float)
+        return np.abs((first[..., :, None] - second[..., None, :] + 180) % 360 - 180)
+
+    def classify(self, distances):
+        """Aspect index (-1 for none) and orb of each distance"""
+        deviations = np.abs(distances[..., None] - self.angles)
+        deviations = np.where(deviations <= self.orbs, deviations, np.inf)
+        closest = np.argmin(deviations, axis=-1)
+        orbs = np.take_along_axis(deviations, closest[..., None], -1)[..., 0]
+        return np.where(np.isfinite(orbs), closest, -1), orbs
+
+    def drishti(self, names, first_signs, second_signs):
+        """Whether each graha (by name, in a sign index) aspects each sign in second_signs"""
+        houses = (np.asarray(second_signs)[None, :] - np.asarray(first_signs)[:, None]) % 12
+        table = np.array([self.drishti_table.get(name, np.zeros(12, dtype=bool)) for name in names])
+        return np.take_along_axis(table, houses, axis=1), houses + 1
+
+    def compute(self, first, second=None):
+        """Aspects from the points in first to those in second (default:
+        within first, each pair once).
+
+        Returns a dict: first and second (point names), distance, aspect
+        (index into names, -1 for none) and orb matrices, drishti (bool
+        matrix, graha in first aspecting the point in second), and aspects
+        and drishti lists of dicts (from, to, aspect, angle, orb / houses).
+        """
+        within = second is None
+        second = first if within else second
+        first_names = [name for name in first if 'longitude' in first[name]]
+        second_names = [name for name in second if 'longitude' in second[name]]
+        first_longitudes = np.array([first[name]['longitude'] for name in first_names], dtype=float)
+        second_longitudes = np.array([second[name]['longitude'] for name in second_names], dtype=float)
+
+        distance = self.distances(first_longitudes, second_longitudes)
+        aspect, orb = self.classify(distance)
+        drishti, houses = self.drishti(first_names, (first_longitudes // 30).astype(int) % 12,
+                                       (second_longitudes // 30).astype(int) % 12)
+
+        # Within a chart a point does not aspect itself, and each pair counts once
+        pair_mask = np.ones(distance.shape, dtype=bool)
+        if within:
+            pair_mask = np.triu(pair_mask, k=1)
+            drishti &= ~np.eye(len(first_names), dtype=bool)
+
+        aspects = [{
+            "from": first_names[i],
+            "to": second_names[j],
+            "aspect": self.names[aspect[i, j]],
+            "angle": float(self.angles[aspect[i, j]]),
+            "orb": float(orb[i, j])
+        } for i, j in zip(*np.nonzero((aspect >= 0) & pair_mask))]
+        aspects.sort(key=lambda found: found["orb"])
+
+        return {
+            "first": first_names,
+            "second": second_names,
+            "distance": distance,
+            "aspect": aspect,
+            "orb": orb,
+            "drishti": drishti,
+            "aspects": aspects,
+            "drishti_aspects": [{"from": first_names[i], "to": second_names[j], "houses": int(houses[i, j])}
+                                for i, j in zip(*np.nonzero(drishti))]
+        }
+
+    def chart_aspects(self, chart):
+        """Aspects within one chart"""
+        return self.compute(chart["points"])
+
+    def transit_aspects(self, chart, transits):
+        """Aspects from transiting points to a natal chart's points"""
+        return self.compute(transits, chart["points"])
+
+    def synastry(self, first_chart, second_chart):
+        """Aspects from one chart's points to another's"""
+        return self.compute(first_chart["points"], second_chart["points"])
@@ -1,7 +1,7 @@
 import swisseph as swe
-from datetime import datetime, timedelta
-import pandas as pd
-from dateutil.relativedelta import relativedelta
+import numpy as np
+from fractions import Fraction
+from datetime import datetime, timedelta, timezone
 
 class AstroCalc:
     def __init__(self):
@@ -85,6 +85,23 @@ class AstroCalc:
             "Mercury": ["Mercury", "Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn"]
         }
 
+        # Start longitudes of the 243 KP subs: each nakshatra split in its
+        # lord's Vimshottari order, each sub as long as its lord's dasha years
+        dasha_years = DashaCalculator().dasha_years
+        sub_starts = []
+        start = Fraction(0)
+        for star_lord in self.nakshatra_lords:
+            for lord in self.sub_lords[star_lord]:
+                sub_starts.append(float(start))
+                start += Fraction(40, 3) * dasha_years[lord] / 120
+        self.sub_starts = np.array(sub_starts)
+
+        # Optional EphemerisCache for vectorized body_positions lookups
+        self.ephemeris_cache = None
+
+        # ARMC -> ascendant tables for horary charts, per latitude and obliquity
+        self.ascendant_tables = {}
+
     def datetime_to_julian(self, dt):
         """Convert datetime to Julian Day."""
         try:
@@ -111,23 +128,22 @@ class AstroCalc:
 
     def get_nakshatra_data(self, longitude):
         """Calculate nakshatra, pada, and lords for a given longitude."""
-        nakshatra_length = 13.333333  # 360/27
+        nakshatra_length = 360 / 27
         pada_length = nakshatra_length / 4
 
-        # Calculate nakshatra number (0-26)
-        nakshatra_num = int(longitude / nakshatra_length)
+        # Find the KP sub (0-242); its nakshatra is the sub number // 9
+        sub_index = int(np.searchsorted(self.sub_starts, longitude % 360, side='right')) - 1
+        nakshatra_num = sub_index // 9
         
         # Calculate pada (1-4)
-        pada = int((longitude % nakshatra_length) / pada_length) + 1
+        nakshatra_start = self.sub_starts[nakshatra_num * 9]
+        pada = min(int((longitude % 360 - nakshatra_start) / pada_length), 3) + 1
         
         # Get star lord (nakshatra lord)
         star_lord = self.nakshatra_lords[nakshatra_num]
         
         # Calculate sub-lord
-        position_in_nakshatra = (longitude % nakshatra_length) / nakshatra_length
-        sub_division = position_in_nakshatra * 9  # 9 sub-divisions
-        sub_lord_index = int(sub_division)
-        sub_lord = self.sub_lords[star_lord][sub_lord_index]
+        sub_lord = self.sub_lords[star_lord][sub_index % 9]
 
         return {
             "nakshatra": self.nakshatras[nakshatra_num],
@@ -140,18 +156,39 @@ class AstroCalc:
                        zodiac="Sidereal", ayanamsa="Lahiri", 
                        house_system="Placidus", node_type="True Node (Rahu/Ketu)"):
         """Calculate full birth chart."""
+        try:
+            sweep = self.calculate_house_sweep(dt, lat, lon, calc_type=calc_type,
+                                               zodiac=zodiac, ayanamsa=ayanamsa,
+                                               node_type=node_type,
+                                               house_systems=[house_system])
+            return self.chart_from_sweep(sweep, house_system)
+                
+        except Exception as e:
+            print(f"Error in calculate_chart: {e}")
+            raise
+
+    def calculate_house_sweep(self, dt, lat, lon, calc_type="Topocentric",
+                              zodiac="Sidereal", ayanamsa="Lahiri",
+                              node_type="True Node (Rahu/Ketu)", house_systems=None):
+        """Calculate planets once and house cusps for every requested house system.
+
+        Returns a dict holding the shared body positions plus a (systems x 12)
+        ``cusps`` matrix and a (systems x bodies) ``placements`` matrix of house
+        numbers. Use ``chart_from_sweep`` to get the usual chart dict for one system.
+        """
+        if house_systems is None:
+            house_systems = list(self.house_system_map)
+        house_systems = list(house_systems)
+        if not house_systems:
+            raise ValueError("At least one house system is required")
+        unknown = [name for name in house_systems if name not in self.house_system_map]
+        if unknown:
+            raise ValueError(f"Unknown house systems: {', '.join(map(str, unknown))}")
+
         try:
             # Strip out the (Rahu/Ketu) part for the calculation
             node_type_base = node_type.split(" (")[0]  # This will give "True Node" or "Mean Node"
-            
-            # Set the appropriate flag for node calculation
-            node_flag = swe.FLG_SWIEPH
-            if node_type_base == "Mean Node":
-                rahu_id = swe.MEAN_NODE
-                ketu_id = swe.MEAN_NODE
-            else:  # "True Node"
-                rahu_id = swe.TRUE_NODE
-                ketu_id = swe.TRUE_NODE
+            rahu_id = swe.MEAN_NODE if node_type_base == "Mean Node" else swe.TRUE_NODE
 
             # Update node type
             self.node_type = node_type
@@ -159,38 +196,64 @@ class AstroCalc:
             # Convert to Julian Day
             julian_day = self.datetime_to_julian(dt)
             
-            # Set calculation flags
-            flags = 0
+            # Set calculation flags; speeds are needed for the retrograde flags
+            flags = swe.FLG_SPEED
             
             # Handle Topocentric setting
             if calc_type == "Topocentric":
                 flags |= swe.FLG_TOPOCTR
-                swe.set_topo(float(lat), float(lon), 0)
+                swe.set_topo(float(lon), float(lat), 0)
             
-            # Handle Sidereal setting
+            # Handle Sidereal setting; the ayanamsa mode is always set so the
+            # reported ayanamsa value doesn't depend on the previous calculation
+            swe.set_sid_mode(self.ayanamsa_map[ayanamsa])
             if zodiac == "Sidereal":
                 flags |= swe.FLG_SIDEREAL
-                swe.set_sid_mode(self.ayanamsa_map[ayanamsa])
             
             # Get ayanamsa value
             ayanamsa_value = swe.get_ayanamsa(julian_day)
-            
-            # Calculate houses
-            house_system_code = self.house_system_map[house_system]
-            houses_data = swe.houses_ex(julian_day, float(lat), float(lon), house_system_code)
-            
-            # Get ascendant
+
+            # Calculate planets once; the node entry of self.planets is replaced
+            # by the requested node type below
+            bodies = [name for name in self.planets.values() if name != "Rahu"]
+            longitudes = []
+            speeds = []
+            retrograde = []
+            for planet_id, planet_name in self.planets.items():
+                if planet_name == "Rahu":
+                    continue
+                calc = swe.calc(julian_day, planet_id, flags)
+                longitudes.append(calc[0][0])
+                speeds.append(calc[0][3])
+                retrograde.append(calc[0][3] < 0)
+
+            # Rahu (North Node) and Ketu (South Node) - always 180° opposite to Rahu
+            rahu_longitude, _, _, rahu_speed = swe.calc(julian_day, rahu_id, flags)[0][:4]
+            bodies += ["Rahu", "Ketu"]
+            longitudes += [rahu_longitude, (rahu_longitude + 180) % 360]
+            speeds += [rahu_speed, rahu_speed]
+            retrograde += [False, False]
+
+            longitudes = np.array(longitudes)
+
+            # Only the house routine runs per system
+            raw_cusps = np.empty((len(house_systems), 12))
+            for row, house_system in enumerate(house_systems):
+                houses_data = swe.houses_ex(julian_day, float(lat), float(lon),
+                                            self.house_system_map[house_system])
+                raw_cusps[row] = houses_data[0][:12]
+
+            # Get ascendant (independent of the house system)
             tropical_asc = houses_data[1][0]
             sidereal_asc = tropical_asc - ayanamsa_value if zodiac == "Sidereal" else tropical_asc
-            
-            # Normalize to 0-360 range
-            if sidereal_asc < 0:
-                sidereal_asc += 360
-            elif sidereal_asc >= 360:
-                sidereal_asc -= 360
-            
-            # Initialize results
-            results = {
+            sidereal_asc %= 360
+
+            cusps = raw_cusps.copy()
+            if zodiac == "Sidereal":
+                cusps -= ayanamsa_value
+                cusps[cusps < 0] += 360
+
+            return {
                 "meta": {
                     "datetime": dt.strftime('%Y-%m-%d %H:%M:%S'),
                     "latitude": lat,
@@ -199,119 +262,181 @@ class AstroCalc:
                     "zodiac_system": zodiac,
                     "ayanamsa": ayanamsa,
                     "ayanamsa_value": ayanamsa_value,
-                    "house_system": house_system
+                    "node_type": node_type
                 },
-                "points": {},
-                "houses": {}
+                "julian_day": julian_day,
+                "ascendant": sidereal_asc,
+                "systems": list(house_systems),
+                "bodies": bodies,
+                "longitudes": longitudes,
+                "speeds": np.array(speeds),
+                "retrograde": np.array(retrograde),
+                "nakshatras": [self.get_nakshatra_data(lon_) for lon_ in longitudes],
+                "cusps": cusps,
+                # Planets and cusps in the same zodiac
+                "placements": self.determine_houses(longitudes, cusps)
             }
-            
-            # Add ascendant
-            asc_sign_num = int(sidereal_asc / 30)
-            results["points"]["Ascendant"] = {
-                'longitude': sidereal_asc,
-                'sign': self.signs[asc_sign_num],
-                'house': 1,
-                'degree': sidereal_asc % 30
+
+        except Exception as e:
+            print(f"Error in calculate_house_sweep: {e}")
+            raise
+
+    def calculate_horary_chart(self, number, dt, lat, lon, calc_type="Topocentric",
+                               zodiac="Sidereal", ayanamsa="Krishnamurti",
+                               house_system="Placidus", node_type="True Node (Rahu/Ketu)"):
+        """KP horary chart for a number from 1 to 249.
+
+        The planets are those of the moment of the question; the ascendant is
+        fixed at the start of the number's KP sub and the cusps are the ones
+        the location has when that degree rises (the ARMC is solved for it).
+        """
+        from utils.kp import horary_sub
+        sub = horary_sub(number)
+        sweep = self.calculate_house_sweep(dt, lat, lon, calc_type, zodiac, ayanamsa, node_type,
+                                           house_systems=[house_system])
+        julian_day = sweep["julian_day"]
+        ayanamsa_value = sweep["meta"]["ayanamsa_value"] if zodiac == "Sidereal" else 0.0
+        obliquity = swe.calc(julian_day, swe.ECL_NUT, 0)[0][0]
+
+        armc = self.armc_for_ascendant((sub["start"] + ayanamsa_value) % 360, float(lat), obliquity)
+        raw_cusps = np.array([swe.houses_armc(armc, float(lat), obliquity,
+                                              self.house_system_map[house_system])[0][:12]])
+        cusps = (raw_cusps - ayanamsa_value) % 360
+        cusps[0, 0] = sub["start"]  # Exactly, not a rounding error below it
+
+        sweep.update({
+            "ascendant": sub["start"],
+            "cusps": cusps,
+            "placements": self.determine_houses(sweep["longitudes"], cusps)
+        })
+        chart = self.chart_from_sweep(sweep, house_system)
+        chart["meta"]["horary_number"] = int(number)
+        return chart
+
+    def armc_for_ascendant(self, ascendant, lat, obliquity):
+        """ARMC at which a (tropical) ecliptic longitude rises at a latitude.
+
+        Interpolates in a cached one-degree ARMC -> ascendant table, then
+        refines with a few secant steps on houses_armc.
+        """
+        key = (round(lat, 4), round(obliquity, 3))
+        if key not in self.ascendant_tables:
+            armcs = np.arange(0.0, 361.0)
+            ascendants = [swe.houses_armc(armc, lat, obliquity, b'P')[1][0] for armc in armcs]
+            self.ascendant_tables[key] = (armcs, np.degrees(np.unwrap(np.radians(ascendants))))
+        armcs, ascendants = self.ascendant_tables[key]
+
+        # The ascendant rises through 360° as the ARMC does
+        target = ascendants[0] + (ascendant - ascendants[0]) % 360
+        armc = float(np.interp(target, ascendants, armcs))
+
+        def offset(armc):
+            return (swe.houses_armc(armc % 360, lat, obliquity, b'P')[1][0] - ascendant + 180) % 360 - 180
+        previous, previous_offset = armc + 0.01, offset(armc + 0.01)
+        for _ in range(8):
+            current_offset = offset(armc)
+            if abs(current_offset) < 1e-9 or current_offset == previous_offset:
+                break
+            armc, previous, previous_offset = (
+                armc - current_offset * (armc - previous) / (current_offset - previous_offset),
+                armc, current_offset)
+        return armc % 360
+
+    def chart_from_sweep(self, sweep, house_system):
+        """Build the full chart dict for one house system of a sweep."""
+        row = sweep["systems"].index(house_system)
+
+        results = {
+            "meta": {
+                "datetime": sweep["meta"]["datetime"],
+                "latitude": sweep["meta"]["latitude"],
+                "longitude": sweep["meta"]["longitude"],
+                "calculation_type": sweep["meta"]["calculation_type"],
+                "zodiac_system": sweep["meta"]["zodiac_system"],
+                "ayanamsa": sweep["meta"]["ayanamsa"],
+                "ayanamsa_value": sweep["meta"]["ayanamsa_value"],
+                "house_system": house_system,
+                "node_type": sweep["meta"]["node_type"]
+            },
+            "points": {},
+            "houses": {}
+        }
+
+        # Add ascendant
+        sidereal_asc = sweep["ascendant"]
+        results["points"]["Ascendant"] = {
+            'longitude': sidereal_asc,
+            'sign': self.signs[int(sidereal_asc / 30)],
+            'house': 1,
+            'degree': sidereal_asc % 30
+        }
+
+        node_type = sweep["meta"]["node_type"]
+        for index, planet_name in enumerate(sweep["bodies"]):
+            longitude = float(sweep["longitudes"][index])
+            nakshatra_data = sweep["nakshatras"][index]
+            point = {
+                'longitude': longitude,
+                'sign': self.signs[int(longitude / 30)],
+                'house': int(sweep["placements"][row, index])
             }
-            
-            # Calculate planets
-            for planet_id, planet_name in self.planets.items():
-                calc = swe.calc(julian_day, planet_id, flags)
-                longitude = calc[0][0]
-                
-                # Get nakshatra data
-                nakshatra_data = self.get_nakshatra_data(longitude)
-                
-                results["points"][planet_name] = {
-                    'longitude': longitude,
-                    'sign': self.signs[int(longitude / 30)],
-                    'house': self.determine_house(longitude, houses_data[0]),
-                    'is_retrograde': calc[0][3] < 0,
+            if planet_name in ("Rahu", "Ketu"):
+                point.update({
                     'degree': longitude % 30,
-                    'nakshatra': nakshatra_data['nakshatra'],
-                    'pada': nakshatra_data['pada'],
-                    'star_lord': nakshatra_data['star_lord'],
-                    'sub_lord': nakshatra_data['sub_lord']
-                }
-            
-            # Calculate Rahu (North Node)
-            rahu_calc = swe.calc(julian_day, rahu_id, flags)
-            rahu_longitude = rahu_calc[0][0]
-            rahu_sign_num = int(rahu_longitude / 30)
-            rahu_house = self.determine_house(rahu_longitude, houses_data[0])
+                    'type': f"{node_type} Node"
+                })
+            else:
+                point.update({
+                    'is_retrograde': bool(sweep["retrograde"][index]),
+                    'degree': longitude % 30
+                })
+            if "speeds" in sweep:
+                point['speed'] = float(sweep["speeds"][index])  # Degrees per day
+            point.update({
+                'nakshatra': nakshatra_data['nakshatra'],
+                'pada': nakshatra_data['pada'],
+                'star_lord': nakshatra_data['star_lord'],
+                'sub_lord': nakshatra_data['sub_lord']
+            })
+            if planet_name in ("Rahu", "Ketu"):
+                point['type'] = "True Node"
+            results["points"][planet_name] = point
+
+        # Add house calculations with nakshatra details
+        for house in range(1, 13):
+            cusp_longitude = float(sweep["cusps"][row, house - 1])
             
-            # Calculate Ketu (South Node) - always 180° opposite to Rahu
-            ketu_longitude = (rahu_longitude + 180) % 360
-            ketu_sign_num = int(ketu_longitude / 30)
-            ketu_house = self.determine_house(ketu_longitude, houses_data[0])
+            # Get nakshatra data for house cusp
+            nakshatra_data = self.get_nakshatra_data(cusp_longitude)
             
-            # Add nodes to results
-            results["points"]["Rahu"] = {
-                'longitude': rahu_longitude,
-                'sign': self.signs[rahu_sign_num],
-                'house': rahu_house,
-                'degree': rahu_longitude % 30,
-                'type': f"{node_type} Node"
-            }
-            
-            results["points"]["Ketu"] = {
-                'longitude': ketu_longitude,
-                'sign': self.signs[ketu_sign_num],
-                'house': ketu_house,
-                'degree': ketu_longitude % 30,
-                'type': f"{node_type} Node"
+            results["houses"][f"House_{house}"] = {
+                "longitude": cusp_longitude,
+                "sign": self.signs[int(cusp_longitude / 30)],
+                "degree": cusp_longitude % 30,
+                "nakshatra": nakshatra_data['nakshatra'],
+                "pada": nakshatra_data['pada'],
+                "star_lord": nakshatra_data['star_lord'],
+                "sub_lord": nakshatra_data['sub_lord']
             }
 
-            # Special handling for Rahu and Ketu
-            rahu_longitude = results["points"]["Rahu"]["longitude"]
-            ketu_longitude = results["points"]["Ketu"]["longitude"]
-            
-            # Add nakshatra data for Rahu
-            rahu_nakshatra = self.get_nakshatra_data(rahu_longitude)
-            results["points"]["Rahu"].update({
-                "nakshatra": rahu_nakshatra["nakshatra"],
-                "pada": rahu_nakshatra["pada"],
-                "star_lord": rahu_nakshatra["star_lord"],
-                "sub_lord": rahu_nakshatra["sub_lord"],
-                "type": "True Node"
-            })
-            
-            # Add nakshatra data for Ketu
-            ketu_nakshatra = self.get_nakshatra_data(ketu_longitude)
-            results["points"]["Ketu"].update({
-                "nakshatra": ketu_nakshatra["nakshatra"],
-                "pada": ketu_nakshatra["pada"],
-                "star_lord": ketu_nakshatra["star_lord"],
-                "sub_lord": ketu_nakshatra["sub_lord"],
-                "type": "True Node"
-            })
+        return results
 
-            # Add house calculations with nakshatra details
-            for house in range(1, 13):
-                cusp_longitude = houses_data[0][house - 1]
-                if zodiac == "Sidereal":
-                    cusp_longitude -= ayanamsa_value
-                    if cusp_longitude < 0:
-                        cusp_longitude += 360
-                
-                # Get nakshatra data for house cusp
-                nakshatra_data = self.get_nakshatra_data(cusp_longitude)
-                
-                results["houses"][f"House_{house}"] = {
-                    "longitude": cusp_longitude,
-                    "sign": self.signs[int(cusp_longitude / 30)],
-                    "degree": cusp_longitude % 30,
-                    "nakshatra": nakshatra_data['nakshatra'],
-                    "pada": nakshatra_data['pada'],
-                    "star_lord": nakshatra_data['star_lord'],
-                    "sub_lord": nakshatra_data['sub_lord']
-                }
+    def determine_houses(self, longitudes, house_cusps):
+        """Vectorized determine_house for many longitudes against rows of cusps.
 
-            return results
-                
-        except Exception as e:
-            print(f"Error in calculate_chart: {e}")
-            raise
+        ``house_cusps`` is a (systems x 12) array; returns a (systems x bodies)
+        array of house numbers using the same first-match rule as determine_house.
+        """
+        longitudes = np.asarray(longitudes, dtype=float) % 360
+        cusps = np.atleast_2d(np.asarray(house_cusps, dtype=float)) % 360
+
+        start = cusps[:, :11, None]
+        width = (cusps[:, 1:, None] - start) % 360
+        inside = (longitudes[None, None, :] - start) % 360 < width
+
+        houses = np.argmax(inside, axis=1) + 1
+        houses[~inside.any(axis=1)] = 12
+        return houses.astype(np.int8)
 
     def determine_house(self, longitude, house_cusps):
         """Helper function to determine house placement."""
@@ -339,6 +464,116 @@ class AstroCalc:
         # If we get here, the point must be in house 12
         return 12
 
+    def use_ephemeris_cache(self, cache):
+        """Serve body_positions from an EphemerisCache (None: always Swiss Ephemeris)"""
+        self.ephemeris_cache = cache
+
+    def body_positions(self, body, julian_days, zodiac="Sidereal", ayanamsa="Lahiri",
+                       node_type="True Node (Rahu/Ketu)"):
+        """Geocentric longitudes and speeds (degrees/day) of one body at many Julian days.
+
+        Uses the ephemeris cache when one is set and covers the days,
+        otherwise one swe.calc call per day. Returns two float arrays.
+        """
+        julian_days = np.asarray(julian_days, dtype=float)
+        node = node_type.split(" (")[0]
+        if self.ephemeris_cache is not None and self.ephemeris_cache.covers(julian_days):
+            return self.ephemeris_cache.longitudes(body, julian_days, zodiac, ayanamsa, node)
+
+        if body in ("Rahu", "Ketu"):
+            body_id = swe.MEAN_NODE if node == "Mean Node" else swe.TRUE_NODE
+        else:
+            body_id = next(planet_id for planet_id, name in self.planets.items() if name == body)
+        flags = swe.FLG_SPEED
+        swe.set_sid_mode(self.ayanamsa_map[ayanamsa])
+        if zodiac == "Sidereal":
+            flags |= swe.FLG_SIDEREAL
+        positions = np.array([swe.calc(jd, body_id, flags)[0][:4:3] for jd in julian_days.ravel()])
+        positions = positions.reshape(julian_days.shape + (2,))
+        longitudes, speeds = positions[..., 0], positions[..., 1]
+        if body == "Ketu":
+            longitudes = (longitudes + 180) % 360
+        return longitudes, speeds
+
+    def julian_day_utc(self, when=None):
+        """Julian Day (UT) for an aware datetime, a naive UTC one, or now"""
+        if when is None:
+            when = datetime.now(timezone.utc)
+        elif when.tzinfo is not None:
+            when = when.astimezone(timezone.utc)
+        return swe.julday(when.year, when.month, when.day,
+                          when.hour + when.minute / 60.0 + (when.second + when.microsecond / 1e6) / 3600.0)
+
+    def datetime_utc(self, julian_day):
+        """Aware UTC datetime for a Julian Day (UT), the inverse of julian_day_utc"""
+        return datetime(2000, 1, 1, 12, tzinfo=timezone.utc) + timedelta(days=julian_day - 2451545.0)
+
+    def ascendant(self, julian_day, lat, lon, zodiac="Sidereal", ayanamsa="Lahiri"):
+        """Ascendant longitude alone: one houses_ex call, no bodies"""
+        ascendant = swe.houses_ex(julian_day, float(lat), float(lon), b'P')[1][0]
+        if zodiac == "Sidereal":
+            swe.set_sid_mode(self.ayanamsa_map[ayanamsa])
+            ascendant -= swe.get_ayanamsa(julian_day)
+        return ascendant % 360
+
+    def calculate_transits(self, natal_chart, when=None, bodies=None):
+        """Transit positions placed in the natal houses.
+
+        Uses the natal chart's settings (zodiac, ayanamsa, calculation type,
+        node type) and location; ``when`` is an aware or UTC datetime
+        (default: now). ``bodies`` limits the calculation, e.g. to the fast
+        moving ["Moon", "Ascendant"]. Returns {body: point dict} shaped like
+        chart["points"], plus each body's speed in degrees per day.
+        """
+        meta = natal_chart["meta"]
+        if bodies is None:
+            bodies = ["Ascendant"] + list(self.planets.values()) + ["Ketu"]
+        julian_day = self.julian_day_utc(when)
+
+        flags = swe.FLG_SPEED
+        if meta["calculation_type"] == "Topocentric":
+            flags |= swe.FLG_TOPOCTR
+            swe.set_topo(float(meta["longitude"]), float(meta["latitude"]), 0)
+        swe.set_sid_mode(self.ayanamsa_map[meta["ayanamsa"]])
+        sidereal = meta["zodiac_system"] == "Sidereal"
+        if sidereal:
+            flags |= swe.FLG_SIDEREAL
+
+        ids = {name: planet_id for planet_id, name in self.planets.items() if name != "Rahu"}
+        ids["Rahu"] = swe.MEAN_NODE if meta.get("node_type", "").startswith("Mean") else swe.TRUE_NODE
+        positions = {}
+        for body in bodies:
+            if body == "Ascendant":
+                positions[body] = (self.ascendant(julian_day, meta["latitude"], meta["longitude"],
+                                                  meta["zodiac_system"], meta["ayanamsa"]), None)
+            elif body in ("Rahu", "Ketu"):
+                calc = swe.calc(julian_day, ids["Rahu"], flags)[0]
+                offset = 180 if body == "Ketu" else 0
+                positions[body] = ((calc[0] + offset) % 360, calc[3])
+            else:
+                calc = swe.calc(julian_day, ids[body], flags)[0]
+                positions[body] = (calc[0], calc[3])
+
+        natal_cusps = [natal_chart["houses"][f"House_{house}"]["longitude"] for house in range(1, 13)]
+        longitudes = [longitude for longitude, _ in positions.values()]
+        houses = self.determine_houses(longitudes, natal_cusps)[0] if longitudes else []
+
+        transits = {}
+        for (body, (longitude, speed)), house in zip(positions.items(), houses):
+            point = {
+                'longitude': longitude,
+                'sign': self.signs[int(longitude / 30)],
+                'degree': longitude % 30,
+                'house': int(house)
+            }
+            if body != "Ascendant":
+                point.update(self.get_nakshatra_data(longitude))
+                point['speed'] = speed
+                if body not in ("Rahu", "Ketu"):
+                    point['is_retrograde'] = speed < 0
+            transits[body] = point
+        return transits
+
 class DashaCalculator:
     def __init__(self):
         # Dasha order and durations (in years)
@@ -390,8 +625,8 @@ class DashaCalculator:
         """Add exact minutes to a datetime"""
         return dt + timedelta(minutes=total_minutes)
 
-    def calculate_dashas(self, birth_date, moon_longitude):
-        """Calculate all five levels of dashas"""
+    def calculate_dashas(self, birth_date, moon_longitude, levels=5):
+        """Calculate dashas down to the given level (all five by default)"""
         try:
             # Calculate nakshatra and balance
             nakshatra_degree = moon_longitude % 13.333333
@@ -423,7 +658,8 @@ class DashaCalculator:
                 'start_date': current_date,
                 'end_date': end_date,
                 'duration_str': duration_str,
-                'sub_dashas': self.calculate_antardashas(current_date, remaining_minutes, current_lord)
+                'sub_dashas': self.calculate_antardashas(current_date, total_dasha_minutes, current_lord,
+                                                         levels) if levels > 1 else []
             }
             all_dashas.append(current_dasha)
             current_date = end_date
@@ -443,7 +679,8 @@ class DashaCalculator:
                     'start_date': current_date,
                     'end_date': end_date,
                     'duration_str': duration_str,
-                    'sub_dashas': self.calculate_antardashas(current_date, total_minutes, lord)
+                    'sub_dashas': self.calculate_antardashas(current_date, total_minutes, lord,
+                                                             levels) if levels > 1 else []
                 }
 
                 all_dashas.append(dasha)
@@ -455,7 +692,45 @@ class DashaCalculator:
             print(f"Error in calculate_dashas: {e}")
             raise
 
-    def calculate_antardashas(self, start_date, total_minutes, main_lord):
+    def lord_indices(self, birth_minutes, moon_longitudes, when_minutes, levels=2):
+        """Vectorized point query: the dasha, bhukti, ... lords running at
+        when_minutes for births at birth_minutes with the given Moon
+        longitudes, as indices into dasha_order.
+
+        Times are minutes on any common scale and the arrays broadcast
+        together; the result has a leading axis of length levels. Periods
+        are those of calculate_dashas (365-day years), repeating every 120.
+        """
+        years = np.array([self.dasha_years[lord] for lord in self.dasha_order], dtype=float)
+        # cumulative[s, k]: years from the start of lord s's dasha to its k-th successor's
+        cumulative = np.array([np.concatenate([[0], np.cumsum(np.roll(years, -s))]) for s in range(9)])
+
+        nakshatra_length = 40 / 3
+        moon = np.asarray(moon_longitudes, dtype=float) % 360
+        lord = (moon // nakshatra_length).astype(int) % 9
+        elapsed = (moon % nakshatra_length) / nakshatra_length * years[lord]
+        # Years since the start of the dasha running at birth, within the 120 year cycle
+        position = ((np.asarray(when_minutes, dtype=float) - birth_minutes) / 525600 + elapsed) % 120
+        lord = np.broadcast_to(lord, position.shape)
+
+        result = []
+        for _ in range(levels):
+            starts = cumulative[lord]
+            passed = np.minimum((position[..., None] >= starts[..., 1:]).sum(-1), 8)
+            period = (lord + passed) % 9
+            result.append(period)
+            # Sub-periods divide a period as the dasha years divide 120
+            start = np.take_along_axis(starts, passed[..., None], -1)[..., 0]
+            position = (position - start) / years[period] * 120
+            lord = period
+        return np.array(result)
+
+    def dasha_lords(self, birth_date, moon_longitude, when, levels=2):
+        """The dasha, bhukti, ... lords running at a datetime"""
+        minutes = (when - birth_date).total_seconds() / 60
+        return [self.dasha_order[index] for index in self.lord_indices(0.0, moon_longitude, minutes, levels)]
+
+    def calculate_antardashas(self, start_date, total_minutes, main_lord, levels=5):
         """Calculate Antardashas (level 2)"""
         antardashas = []
         current_date = start_date
@@ -476,7 +751,8 @@ class DashaCalculator:
                 'end_date': end_date,
                 'duration_str': duration_str,
                 'sub_dashas': self.calculate_pratyantar_dashas(current_date, antardasha_minutes, 
-                                                             main_lord, antardasha_lord)
+                                                             main_lord, antardasha_lord,
+                                                             levels) if levels > 2 else []
             }
 
             antardashas.append(antardasha)
@@ -484,7 +760,7 @@ class DashaCalculator:
 
         return antardashas
 
-    def calculate_pratyantar_dashas(self, start_date, total_minutes, main_lord, antardasha_lord):
+    def calculate_pratyantar_dashas(self, start_date, total_minutes, main_lord, antardasha_lord, levels=5):
         """Calculate Pratyantar dashas (level 3)"""
         pratyantars = []
         current_date = start_date
@@ -505,7 +781,8 @@ class DashaCalculator:
                 'end_date': end_date,
                 'duration_str': duration_str,
                 'sub_dashas': self.calculate_sookshma_dashas(current_date, pratyantar_minutes,
-                                                           main_lord, antardasha_lord, pratyantar_lord)
+                                                           main_lord, antardasha_lord, pratyantar_lord,
+                                                           levels) if levels > 3 else []
             }
 
             pratyantars.append(pratyantar)
@@ -513,7 +790,8 @@ class DashaCalculator:
 
         return pratyantars
 
-    def calculate_sookshma_dashas(self, start_date, total_minutes, main_lord, antardasha_lord, pratyantar_lord):
+    def calculate_sookshma_dashas(self, start_date, total_minutes, main_lord, antardasha_lord, pratyantar_lord,
+                                  levels=5):
         """Calculate Sookshma dashas (level 4)"""
         sookshmas = []
         current_date = start_date
@@ -534,7 +812,8 @@ class DashaCalculator:
                 'end_date': end_date,
                 'duration_str': duration_str,
                 'sub_dashas': self.calculate_prana_dashas(current_date, sookshma_minutes,
-                                                        main_lord, antardasha_lord, pratyantar_lord, sookshma_lord)
+                                                        main_lord, antardasha_lord, pratyantar_lord,
+                                                        sookshma_lord) if levels > 4 else []
             }
 
             sookshmas.append(sookshma)
@@ -0,0 +1,362 @@
+"""Append-only, memory-mapped archive of charts keyed by profile id.
+
+Layout of the archive file (little endian):
+
+    0   4 bytes   magic b"ACAR"
+    4   uint16    format version (1)
+    6   uint16    reserved, 0
+    8   uint64    committed record count
+    16  uint32    length H of the JSON header
+    20  H bytes   JSON header: bodies, strings (see chart_columns) and the
+                  record layout (names, formats, offsets, itemsize)
+    4096          fixed-width records, one per append
+
+Each record holds the profile ``id``, ``flags`` (1 chart, 0 deletion) and
+the chart_columns values for one chart. Records are only ever appended; the
+count is bumped after the record is written, so readers never see a half
+written one. Readers build the record dtype from the header, so archives
+written with an older layout stay readable.
+
+The sidecar ``<archive>.idx`` maps ids to records: after a 16 byte header
+(b"ACIX", uint16 version, uint16 reserved, uint64 records covered) slot
+``id`` is an int64 holding the record position + 1, or 0 when the id has
+no chart. Profile ids are small sequential integers, so a direct-address
+table gives O(1) lookups.
+"""
+import os
+import sys
+import json
+import time
+import struct
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.constants import CHART_ARCHIVE_PATH
+from utils.chart_columns import (BODY_COLUMNS, CUSP_COLUMNS, META_COLUMNS, StringTable,
+                                 chart_values, values_chart)
+
+ARCHIVE_MAGIC = b"ACAR"
+ARCHIVE_FORMAT = 1
+INDEX_MAGIC = b"ACIX"
+INDEX_FORMAT = 1
+HEADER_SIZE = 4096
+INDEX_HEADER = 16
+
+def record_dtype(body_count):
+    """Current record layout for charts with ``body_count`` bodies"""
+    fields = [("id", "<i8"), ("flags", "u1")]
+    fields += [(name, dtype, (body_count,)) for name, dtype in BODY_COLUMNS.items()]
+    fields += [(name, dtype, (12,)) for name, dtype in CUSP_COLUMNS.items()]
+    fields += [(name, dtype) for name, dtype in META_COLUMNS.items() if name != "valid"]
+    return np.dtype(fields, align=True)
+
+def dtype_layout(dtype):
+    """JSON description of a record dtype, for the archive header"""
+    return {
+        "names": list(dtype.names),
+        "formats": [[dtype.fields[name][0].base.str, list(dtype.fields[name][0].shape)]
+                    for name in dtype.names],
+        "offsets": [dtype.fields[name][1] for name in dtype.names],
+        "itemsize": dtype.itemsize
+    }
+
+def layout_dtype(layout):
+    return np.dtype({
+        "names": layout["names"],
+        "formats": [(base, tuple(shape)) if shape else base for base, shape in layout["formats"]],
+        "offsets": layout["offsets"],
+        "itemsize": layout["itemsize"]
+    })
+
+class ChartArchive:
+    """Charts by profile id in an append-only memory-mapped file.
+
+    Any number of processes may read while one writer (``writable=True``,
+    guarded by a lock file) appends. Readers see appends after refresh(),
+    which get() calls by itself when the index points past what it has
+    mapped. ``self[field]`` is a zero-copy view of one field over every
+    record, e.g. ``archive["longitude"][:, moon]``.
+    """
+
+    def __init__(self, path=CHART_ARCHIVE_PATH, writable=False, astro_calc=None):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.writable = writable
+        self.astro_calc = astro_calc
+        self.lock_file = None
+        self.count = 0
+        self.bodies = None
+        self.table = StringTable()
+        self.dtype = None
+        self.records = None
+        self.index = np.zeros(0, dtype="<i8")
+
+        if writable:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.acquire_lock()
+            if os.path.exists(path):
+                self.recover()
+        elif not os.path.exists(path):
+            raise FileNotFoundError(f"No chart archive at {path}")
+        self.refresh()
+
+    def acquire_lock(self):
+        """Single writer: hold an exclusive lock on <archive>.lock"""
+        self.lock_file = open(self.path + ".lock", "a+b")
+        try:
+            if fcntl:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                msvcrt.locking(self.lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self.lock_file.close()
+            self.lock_file = None
+            raise RuntimeError(f"{self.path} is already open for writing")
+
+    def read_header(self):
+        # The writer may be rewriting the JSON (new strings); retry a torn read
+        for attempt in range(5):
+            with open(self.path, "rb") as f:
+                magic, version, _, count, length = struct.unpack("<4sHHQI", f.read(20))
+                if magic != ARCHIVE_MAGIC:
+                    raise ValueError(f"{self.path} is not a chart archive")
+                if version > ARCHIVE_FORMAT:
+                    raise ValueError(f"Chart archive format {version} is newer than this version supports")
+                try:
+                    return count, json.loads(f.read(length).decode("utf-8"))
+                except ValueError:
+                    time.sleep(0.01)
+        raise ValueError(f"Could not read the header of {self.path}")
+
+    def write_header(self, f):
+        header = json.dumps({"bodies": self.bodies, "strings": self.table.strings,
+                             "layout": dtype_layout(self.dtype)}).encode("utf-8")
+        if 20 + len(header) > HEADER_SIZE:
+            raise ValueError("Chart archive header is full")
+        f.seek(16)
+        f.write(struct.pack("<I", len(header)) + header)
+
+    def refresh(self):
+        """Map the records and index as they are now"""
+        if not os.path.exists(self.path):
+            return
+        self.count, header = self.read_header()
+        self.bodies = header["bodies"]
+        self.table = StringTable(header["strings"])
+        self.dtype = layout_dtype(header["layout"])
+        if self.count:
+            self.records = np.memmap(self.path, dtype=self.dtype, mode="r",
+                                     offset=HEADER_SIZE, shape=(self.count,))
+        else:
+            self.records = np.zeros(0, dtype=self.dtype)
+        self.index = self.read_index()
+
+    def read_index(self):
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) <= INDEX_HEADER:
+            return np.zeros(0, dtype="<i8")
+        size = (os.path.getsize(self.index_path) - INDEX_HEADER) // 8
+        return np.memmap(self.index_path, dtype="<i8", mode="r", offset=INDEX_HEADER, shape=(size,))
+
+    def recover(self):
+        """Drop a torn append and index records the last writer did not get to"""
+        count, header = self.read_header()
+        item_size = header["layout"]["itemsize"]
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + count * item_size)
+
+        covered = 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                magic, _, _, covered = struct.unpack("<4sHHQ", f.read(INDEX_HEADER).ljust(INDEX_HEADER, b"\0"))
+            if magic != INDEX_MAGIC or covered > count:
+                covered = 0
+        if covered != count or not os.path.exists(self.index_path):
+            records = np.memmap(self.path, dtype=layout_dtype(header["layout"]), mode="r",
+                                offset=HEADER_SIZE, shape=(count,))[covered:] if count else {"id": [], "flags": []}
+            self.write_index(records["id"], records["flags"], covered, count, rebuild=covered == 0)
+
+    def write_index(self, ids, flags, start, end, rebuild=False):
+        """Point the index at records start..end-1 with these ids and flags.
+
+        A rebuild writes a new file and swaps it in, so readers that have
+        the old one mapped are not affected; otherwise slots are updated in
+        place (the file only ever grows).
+        """
+        ids = np.asarray(ids, dtype="<i8")
+        slots = np.where(np.asarray(flags, dtype=bool), np.arange(start, end) + 1, 0)
+        # The last record for an id wins
+        ids, last = np.unique(ids[::-1], return_index=True)
+        slots = slots[::-1][last]
+
+        path = self.index_path + ".new" if rebuild else self.index_path
+        with open(path, "w+b" if rebuild else "r+b") as f:
+            size = (os.fstat(f.fileno()).st_size - INDEX_HEADER) // 8
+            if len(ids) and ids[-1] >= size:
+                size = int(ids[-1]) + 1
+            f.truncate(INDEX_HEADER + size * 8)
+            if len(ids):
+                index = np.memmap(f, dtype="<i8", mode="r+", offset=INDEX_HEADER, shape=(size,))
+                index[ids] = slots
+                index.flush()
+                del index
+            f.seek(0)
+            f.write(INDEX_MAGIC + struct.pack("<HHQ", INDEX_FORMAT, 0, end))
+        if rebuild:
+            os.replace(path, self.index_path)
+
+    def append(self, profile_id, chart):
+        """Store the chart for a profile id, replacing any earlier one"""
+        return self.append_many([(profile_id, chart)])[0]
+
+    def append_many(self, items):
+        """Append (profile_id, chart) pairs; chart None deletes. Returns record positions."""
+        if not self.writable:
+            raise RuntimeError("Chart archive is open read only")
+        items = list(items)
+        if not items:
+            return []
+        if self.bodies is None:
+            first = next((chart for _, chart in items if chart is not None), None)
+            if first is None:
+                return []
+            self.create(list(first["points"]))
+        if self.astro_calc is None:
+            from utils.astro_calc import AstroCalc
+            self.astro_calc = AstroCalc()
+
+        known = {key: len(values) for key, values in self.table.strings.items()}
+        block = np.zeros(len(items), dtype=self.dtype)
+        for record, (profile_id, chart) in zip(block, items):
+            if int(profile_id) < 0:
+                raise ValueError(f"Invalid profile id {profile_id}")
+            record["id"] = profile_id
+            if chart is None:
+                continue
+            if list(chart["points"]) != self.bodies:
+                raise ValueError(f"Chart bodies do not match the archive ({self.bodies})")
+            record["flags"] = 1
+            for name, value in chart_values(chart, self.table, self.astro_calc).items():
+                if name in self.dtype.names:
+                    record[name] = value
+
+        start = self.count
+        with open(self.path, "r+b") as f:
+            f.seek(HEADER_SIZE + start * self.dtype.itemsize)
+            f.write(block.tobytes())
+            if {key: len(values) for key, values in self.table.strings.items()} != known:
+                self.write_header(f)
+            f.flush()
+            os.fsync(f.fileno())
+            # Commit: readers only look at records below the count
+            f.seek(8)
+            f.write(struct.pack("<Q", start + len(items)))
+        self.write_index(block["id"], block["flags"], start, start + len(items))
+        self.refresh()
+        return list(range(start, start + len(items)))
+
+    def delete(self, profile_id):
+        """Forget a profile's chart (appends a deletion record)"""
+        if self.bodies is not None:
+            self.append_many([(profile_id, None)])
+
+    def create(self, bodies):
+        self.bodies = bodies
+        self.dtype = record_dtype(len(bodies))
+        with open(self.path, "w+b") as f:
+            f.write(ARCHIVE_MAGIC + struct.pack("<HHQ", ARCHIVE_FORMAT, 0, 0))
+            f.truncate(HEADER_SIZE)
+            self.write_header(f)
+        self.write_index([], [], 0, 0, rebuild=True)
+
+    def position(self, profile_id):
+        profile_id = int(profile_id)
+        if 0 <= profile_id < len(self.index):
+            slot = int(self.index[profile_id])
+            return slot - 1 if slot else None
+        return None
+
+    def get(self, profile_id):
+        """The archived record for a profile id (a NumPy structured scalar), or None"""
+        for attempt in range(3):
+            position = self.position(profile_id)
+            if position is not None and position < self.count and self.records[position]["id"] == profile_id:
+                return self.records[position]
+            if position is None and attempt:
+                return None
+            # Appended or compacted since we mapped the files
+            self.refresh()
+        return None
+
+    def chart(self, profile_id):
+        """The calculate_chart dict for a profile id, or None"""
+        record = self.get(profile_id)
+        if record is None:
+            return None
+        if self.astro_calc is None:
+            from utils.astro_calc import AstroCalc
+            self.astro_calc = AstroCalc()
+        values = {name: record[name] for name in self.dtype.names}
+        return values_chart(values, self.bodies, self.table.strings, self.astro_calc)
+
+    def ids(self):
+        """Profile ids with an archived chart"""
+        return np.flatnonzero(np.asarray(self.index))
+
+    def live_positions(self):
+        """Positions of the current record for every id, in append order"""
+        index = np.asarray(self.index)
+        return np.sort(index[index > 0] - 1)
+
+    def __len__(self):
+        return int(np.count_nonzero(np.asarray(self.index)))
+
+    def __getitem__(self, field):
+        return self.records[field]
+
+    def compact(self):
+        """Rewrite the archive with only the current chart per id.
+
+        Also upgrades records written with an older layout. Readers that
+        have the old files mapped keep working; they pick up the new files
+        on their next refresh.
+        """
+        if not self.writable:
+            raise RuntimeError("Chart archive is open read only")
+        if self.bodies is None:
+            return
+        positions = self.live_positions()
+        dtype = record_dtype(len(self.bodies))
+        records = np.zeros(len(positions), dtype=dtype)
+        for name in dtype.names:
+            if name in self.dtype.names:
+                records[name] = self.records[name][positions]
+            elif name == "speed":
+                records[name] = np.nan
+
+        temp_path = self.path + ".compact"
+        self.dtype = dtype
+        with open(temp_path, "w+b") as f:
+            f.write(ARCHIVE_MAGIC + struct.pack("<HHQ", ARCHIVE_FORMAT, 0, len(records)))
+            f.truncate(HEADER_SIZE)
+            self.write_header(f)
+            f.seek(HEADER_SIZE)
+            f.write(records.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self.records = None
+        os.replace(temp_path, self.path)
+        self.write_index(records["id"], records["flags"], 0, len(records), rebuild=True)
+        self.refresh()
+
+    def close(self):
+        self.records = None
+        self.index = np.zeros(0, dtype="<i8")
+        if self.lock_file:
+            self.lock_file.close()
+            self.lock_file = None
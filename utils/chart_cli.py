@@ -0,0 +1,332 @@
+"""Headless batch chart generation.
+
+    python -m utils.chart_cli [options] [records.jsonl|records.csv|-] ...
+
+Reads birth records (JSONL or CSV, stdin by default) and writes one
+result per record: the chart, Vimshottari dashas and Yogeswarananda house
+strengths. Only the compute core is imported (no Qt, no kerykeion), so the
+tool starts quickly on servers.
+
+A record needs a datetime ("dd/mm/yyyy hh:mm[:ss]" as saved by the app,
+or ISO 8601), a latitude and a longitude (decimal or DMS such as
+20° 15' 37" N), or a city with --geocode. Optional fields: name, calc_type,
+zodiac, ayanamsa, house_system and node_type override the command line
+settings.
+
+For large inputs, -j spreads the work over processes and --checkpoint
+lets an interrupted run resume (see chart_pipeline).
+"""
+import os
+import sys
+import csv
+import json
+import struct
+import argparse
+import contextlib
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.astro_calc import AstroCalc, DashaCalculator
+from utils.house_strength import HouseStrengthCalculator
+from utils.chart_codec import encode_chart
+from utils.chart_columns import ChartColumnWriter
+from utils.profile_import import parse_coordinates, FIELD_ALIASES
+
+SETTING_FIELDS = ("calc_type", "zodiac", "ayanamsa", "house_system", "node_type")
+DATETIME_FORMATS = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M")
+
+def parse_datetime(value):
+    """Parse an app style "dd/mm/yyyy hh:mm[:ss]" or an ISO 8601 datetime"""
+    value = str(value).strip()
+    for fmt in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid datetime: {value!r}")
+
+def counted_lines(f, position):
+    """Decode a binary file line by line, keeping position[0] at the byte
+    offset after the last line read"""
+    for raw in f:
+        position[0] += len(raw)
+        yield raw.decode("utf-8-sig" if position[0] == len(raw) else "utf-8")
+
+def skip_to(f, offset, position):
+    """Move a binary file to a byte offset (stdin by reading up to it)"""
+    if f.seekable():
+        f.seek(offset)
+        position[0] = offset
+        return
+    for raw in f:
+        position[0] += len(raw)
+        if position[0] >= offset:
+            break
+
+def read_records(paths, start=(0, 0), positions=None):
+    """Yield record dicts from JSONL / CSV files; "-" reads JSONL from stdin.
+
+    ``start`` is a (file index, byte offset) position to resume from. With
+    a ``positions`` list (or deque) the position after each record is
+    appended to it before the record is yielded, so a checkpoint can say
+    where to resume without reading the earlier records again.
+    """
+    paths = paths or ["-"]
+    for index in range(start[0], len(paths)):
+        path = paths[index]
+        offset = start[1] if index == start[0] else 0
+        f = sys.stdin.buffer if path == "-" else open(path, "rb")
+        with f if path != "-" else contextlib.nullcontext(f):
+            position = [0]
+            lines = counted_lines(f, position)
+            if path.lower().endswith(".csv"):
+                reader = csv.DictReader(lines)
+                if reader.fieldnames and offset > position[0]:
+                    skip_to(f, offset, position)
+                columns = {}
+                for header in reader.fieldnames or []:
+                    key = header.strip().lower()
+                    for field, aliases in FIELD_ALIASES.items():
+                        if key in aliases and field not in columns:
+                            columns[field] = header
+                    if key in SETTING_FIELDS:
+                        columns[key] = header
+                for row in reader:
+                    if positions is not None:
+                        positions.append((index, position[0]))
+                    yield {field: row.get(header) for field, header in columns.items()}
+            else:
+                if offset:
+                    skip_to(f, offset, position)
+                for line in lines:
+                    if line.strip():
+                        if positions is not None:
+                            positions.append((index, position[0]))
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError as e:
+                            yield {"_error": f"{path}: byte {position[0] - len(line.encode('utf-8'))}: "
+                                             f"invalid JSON: {e}"}
+
+def chart_inputs(record, defaults):
+    """calculate_chart arguments for one record; raises ValueError when invalid"""
+    if "_error" in record:
+        raise ValueError(record["_error"])
+    lat = record.get("latitude_decimal", record.get("latitude"))
+    lon = record.get("longitude_decimal", record.get("longitude"))
+    lat, lon = parse_coordinates([lat], True)[0], parse_coordinates([lon], False)[0]
+    if lat != lat or lon != lon:  # NaN
+        raise ValueError("Invalid latitude or longitude")
+    inputs = {"dt": parse_datetime(record.get("datetime", "")), "lat": float(lat), "lon": float(lon)}
+    for field in SETTING_FIELDS:
+        inputs[field] = record.get(field) or defaults[field]
+    return inputs
+
+def json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+class JsonlWriter:
+    """One JSON object per record"""
+
+    def __init__(self, out, header=True):
+        self.out = out
+
+    def write(self, result):
+        self.out.write(json.dumps(result, default=json_default, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self.out.flush()
+
+class CsvWriter:
+    """One flat row per record: positions, cusps, mahadashas and strengths"""
+
+    BODIES = ["Ascendant", "Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn",
+              "Uranus", "Neptune", "Pluto", "Rahu", "Ketu"]
+    BODY_FIELDS = ["longitude", "house", "nakshatra", "star_lord", "sub_lord"]
+    STRENGTH_PLANETS = ["Moon", "Sun", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Rahu", "Ketu"]
+
+    def __init__(self, out, header=True):
+        self.out = out
+        self.writer = csv.writer(out)
+        if header:
+            self.write_header()
+
+    def write_header(self):
+        self.writer.writerow(
+            ["name", "datetime", "latitude", "longitude", "house_system", "error"] +
+            [f"{body}_{field}" for body in self.BODIES for field in self.BODY_FIELDS] +
+            [f"House_{house}" for house in range(1, 13)] +
+            ["dashas"] + [f"{planet}_strengths" for planet in self.STRENGTH_PLANETS])
+
+    def write(self, result):
+        chart = result.get("chart")
+        if chart is None:
+            self.writer.writerow([result.get("name", ""), "", "", "", "", result["error"]])
+            return
+        meta = chart["meta"]
+        row = [result.get("name", ""), meta["datetime"], meta["latitude"], meta["longitude"],
+               meta["house_system"], ""]
+        for body in self.BODIES:
+            point = chart["points"].get(body, {})
+            row += [point.get(field, "") for field in self.BODY_FIELDS]
+        row += [chart["houses"][f"House_{house}"]["longitude"] for house in range(1, 13)]
+        row.append(";".join(f"{d['lord']}:{d['end_date'].isoformat()}" for d in result.get("dashas", [])))
+        strengths = result.get("house_strengths", {})
+        row += [" ".join(str(strengths[planet]["points"][house]) for house in range(1, 13))
+                if planet in strengths else "" for planet in self.STRENGTH_PLANETS]
+        self.writer.writerow(row)
+
+    def close(self):
+        self.out.flush()
+
+class SnapshotWriter:
+    """Binary stream of chart snapshots (see chart_codec).
+
+    Layout: the magic b"ACSS", then per record a little endian uint32
+    length followed by that many bytes of encode_chart output. Records that
+    failed are written with length 0. Dashas and house strengths are not
+    stored; they are cheap to derive from the chart.
+    """
+
+    MAGIC = b"ACSS"
+    binary = True
+
+    def __init__(self, out, header=True):
+        self.out = out
+        if header:
+            self.out.write(self.MAGIC)
+
+    def write(self, result):
+        snapshot = encode_chart(result["chart"]) if result.get("chart") else b""
+        self.out.write(struct.pack("<I", len(snapshot)) + snapshot)
+
+    def close(self):
+        self.out.flush()
+
+class ColumnarWriter:
+    """Memory-mappable columnar file (see chart_columns), one row per record.
+
+    Charts only; dashas and house strengths are not stored.
+    """
+
+    binary = True
+    appendable = False
+
+    def __init__(self, out, header=True):
+        if not header:
+            raise ValueError("Columnar output can't be appended to")
+        self.columns = ChartColumnWriter(out)
+
+    def write(self, result):
+        self.columns.write(result.get("chart"), result.get("name", ""))
+
+    def close(self):
+        self.columns.close()
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "binary": SnapshotWriter, "columnar": ColumnarWriter}
+
+class ChartBatch:
+    """Computes chart, dasha and house strength results for birth records"""
+
+    def __init__(self, defaults=None, dasha_levels=1, strengths=True):
+        self.calc = AstroCalc()
+        self.dasha_calc = DashaCalculator()
+        self.defaults = {"calc_type": "Topocentric", "zodiac": "Sidereal", "ayanamsa": "Lahiri",
+                         "house_system": "Placidus", "node_type": "True Node (Rahu/Ketu)"}
+        self.defaults.update(defaults or {})
+        self.dasha_levels = dasha_levels
+        self.strengths = strengths
+
+    def compute(self, record):
+        """Result dict for one record; errors are reported, not raised"""
+        return self.compute_dashas(self.compute_chart(record), record)
+
+    def compute_chart(self, record):
+        """Result dict with the chart, or the error, for one record"""
+        result = {"name": record.get("name", "")}
+        try:
+            result["chart"] = self.calc.calculate_chart(**chart_inputs(record, self.defaults))
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+    def compute_dashas(self, result, record):
+        """Add dashas and house strengths to a compute_chart result"""
+        chart = result.get("chart")
+        if chart is None:
+            return result
+        try:
+            if self.dasha_levels > 0:
+                result["dashas"] = self.dasha_calc.calculate_dashas(
+                    parse_datetime(record.get("datetime", "")), chart["points"]["Moon"]["longitude"],
+                    levels=self.dasha_levels)
+            if self.strengths:
+                result["house_strengths"] = HouseStrengthCalculator(chart).calculate_all()
+        except Exception as e:
+            result["error"] = str(e)
+        return result
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m utils.chart_cli",
+        description="Calculate charts, dashas and house strengths for birth records.")
+    parser.add_argument("inputs", nargs="*", help="JSONL or CSV files; - or nothing reads JSONL from stdin")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--calc-type", default="Topocentric")
+    parser.add_argument("--zodiac", default="Sidereal")
+    parser.add_argument("--ayanamsa", default="Lahiri")
+    parser.add_argument("--house-system", default="Placidus")
+    parser.add_argument("--node-type", default="True Node (Rahu/Ketu)")
+    parser.add_argument("--dasha-levels", type=int, default=1, choices=range(0, 6),
+                        help="dasha levels to include, 0 for none (default: 1, mahadashas)")
+    parser.add_argument("--no-strengths", action="store_true", help="skip house strengths")
+    parser.add_argument("-j", "--workers", type=int, default=0,
+                        help="worker processes (default: 0, calculate in this process)")
+    parser.add_argument("--chunk-size", type=int, default=200, help="records per work unit (default: 200)")
+    parser.add_argument("--checkpoint", metavar="PATH",
+                        help="save progress here and resume from it after an interruption (needs -o)")
+    parser.add_argument("--geocode", choices=["offline", "online"],
+                        help="look up coordinates for records that only have a city: from the "
+                             "gazetteer and geocode cache, or also online (one request per second)")
+    parser.add_argument("-v", "--verbose", action="store_true",
+                        help="show calculation debug output on stderr")
+    args = parser.parse_args(argv)
+    if args.checkpoint and not args.output:
+        parser.error("--checkpoint needs --output")
+
+    # Imported here: the pipeline module builds on this one
+    from utils.chart_pipeline import ChartPipeline, offline_provider
+    geocoder = None
+    if args.geocode:
+        from utils.gazetteer import Gazetteer
+        from utils.geocode_cache import CachedGeocoder, nominatim_provider
+        geocoder = CachedGeocoder(nominatim_provider, gazetteer=Gazetteer()) if args.geocode == "online" \
+            else CachedGeocoder(offline_provider, gazetteer=Gazetteer(), min_interval=0)
+
+    pipeline = ChartPipeline({"calc_type": args.calc_type, "zodiac": args.zodiac, "ayanamsa": args.ayanamsa,
+                              "house_system": args.house_system, "node_type": args.node_type},
+                             dasha_levels=args.dasha_levels, strengths=not args.no_strengths,
+                             workers=args.workers, chunk_size=args.chunk_size, geocoder=geocoder,
+                             verbose=args.verbose)
+    try:
+        count, errors = pipeline.run(
+            args.inputs, args.output, WRITERS[args.format], checkpoint_path=args.checkpoint,
+            on_error=lambda number, result: print(f"Record {number}: {result['error']}", file=sys.stderr))
+    except BrokenPipeError:
+        # Output closed early (e.g. piped into head); stop quietly
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(f"{count} records, {errors} errors", file=sys.stderr)
+    return 1 if errors and errors == count else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import struct
+import hashlib
+import json
+import numpy as np
+import swisseph as swe
+
+# Bump whenever a change to AstroCalc alters chart results, so stored
+# snapshots made by the old code are recalculated
+CHART_ENGINE_VERSION = 6
+
+SNAPSHOT_MAGIC = b'ACS'
+SNAPSHOT_FORMAT = 2
+
+# Chart meta strings, in snapshot order
+META_STRINGS = ("datetime", "calculation_type", "zodiac_system", "ayanamsa",
+                "house_system", "node_type")
+
+def engine_version():
+    """Chart engine version, including the Swiss Ephemeris release"""
+    return f"{CHART_ENGINE_VERSION}/{swe.version}"
+
+def chart_settings_hash(dt, lat, lon, calc_type, zodiac, ayanamsa, house_system, node_type):
+    """Hash of everything a chart depends on: inputs, settings and engine version"""
+    key = json.dumps([
+        dt.strftime('%Y-%m-%d %H:%M:%S'), round(float(lat), 9), round(float(lon), 9),
+        calc_type, zodiac, ayanamsa, house_system, node_type, engine_version()
+    ])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def encode_chart(chart):
+    """Pack a calculate_chart result into a compact binary snapshot.
+
+    Only the calculated numbers are stored (body longitudes and speeds,
+    house placements, retrograde flags, cusps, ascendant); signs, degrees and
+    nakshatra details are derived again on decode.
+    """
+    meta = chart["meta"]
+    bodies = [name for name in chart["points"] if name != "Ascendant"]
+    points = [chart["points"][name] for name in bodies]
+    retrograde = sum(1 << i for i, point in enumerate(points) if point.get("is_retrograde"))
+
+    parts = [
+        SNAPSHOT_MAGIC,
+        struct.pack('<BB', SNAPSHOT_FORMAT, len(bodies)),
+        struct.pack('<4d', meta["latitude"], meta["longitude"], meta["ayanamsa_value"],
+                    chart["points"]["Ascendant"]["longitude"])
+    ]
+    for text in [meta[key] for key in META_STRINGS] + bodies:
+        data = str(text).encode('utf-8')
+        parts.append(struct.pack('<B', len(data)) + data)
+    parts.append(struct.pack(f'<{len(bodies)}d', *(point["longitude"] for point in points)))
+    parts.append(struct.pack(f'<{len(bodies)}d', *(point.get("speed", float("nan")) for point in points)))
+    parts.append(struct.pack(f'<{len(bodies)}BI', *(point["house"] for point in points), retrograde))
+    parts.append(struct.pack('<12d', *(chart["houses"][f"House_{house}"]["longitude"]
+                                       for house in range(1, 13))))
+    return b''.join(parts)
+
+def decode_chart(snapshot, astro_calc):
+    """Rebuild the full chart dict from an encode_chart snapshot"""
+    if snapshot[:3] != SNAPSHOT_MAGIC:
+        raise ValueError("Not a chart snapshot")
+    version, body_count = struct.unpack_from('<BB', snapshot, 3)
+    if version != SNAPSHOT_FORMAT:
+        raise ValueError(f"Unsupported chart snapshot format {version}")
+    offset = 5
+    latitude, longitude, ayanamsa_value, ascendant = struct.unpack_from('<4d', snapshot, offset)
+    offset += 32
+
+    strings = []
+    for _ in range(len(META_STRINGS) + body_count):
+        length = snapshot[offset]
+        strings.append(snapshot[offset + 1:offset + 1 + length].decode('utf-8'))
+        offset += 1 + length
+    meta = dict(zip(META_STRINGS, strings))
+    bodies = strings[len(META_STRINGS):]
+
+    longitudes = np.array(struct.unpack_from(f'<{body_count}d', snapshot, offset))
+    offset += 8 * body_count
+    speeds = np.array(struct.unpack_from(f'<{body_count}d', snapshot, offset))
+    offset += 8 * body_count
+    *houses, retrograde = struct.unpack_from(f'<{body_count}BI', snapshot, offset)
+    offset += struct.calcsize(f'<{body_count}BI')
+    cusps = np.array(struct.unpack_from('<12d', snapshot, offset))
+
+    meta.update(latitude=latitude, longitude=longitude, ayanamsa_value=ayanamsa_value)
+    retrograde = [bool(retrograde >> i & 1) for i in range(body_count)]
+    return build_chart(astro_calc, meta, ascendant, bodies, longitudes, retrograde, houses, cusps, speeds)
+
+def build_chart(astro_calc, meta, ascendant, bodies, longitudes, retrograde, houses, cusps, speeds=None):
+    """Chart dict from stored numbers, built exactly like a fresh calculate_chart.
+
+    ``meta`` holds the META_STRINGS plus latitude, longitude and
+    ayanamsa_value; the per-body sequences follow ``bodies`` (no Ascendant).
+    Without speeds (or with none known, all NaN) the points have no speed.
+    """
+    longitudes = np.asarray(longitudes, dtype=float)
+    # A one-system sweep, so the chart is built exactly like a fresh one
+    sweep = {
+        "meta": {
+            "datetime": meta["datetime"],
+            "latitude": float(meta["latitude"]),
+            "longitude": float(meta["longitude"]),
+            "calculation_type": meta["calculation_type"],
+            "zodiac_system": meta["zodiac_system"],
+            "ayanamsa": meta["ayanamsa"],
+            "ayanamsa_value": float(meta["ayanamsa_value"]),
+            "node_type": meta["node_type"]
+        },
+        "ascendant": float(ascendant),
+        "systems": [meta["house_system"]],
+        "bodies": list(bodies),
+        "longitudes": longitudes,
+        "retrograde": np.asarray(retrograde, dtype=bool),
+        "nakshatras": [astro_calc.get_nakshatra_data(lon_) for lon_ in longitudes],
+        "cusps": np.asarray(cusps, dtype=float)[None, :],
+        "placements": np.array([houses], dtype=np.int8)
+    }
+    if speeds is not None and not np.isnan(speeds).all():
+        sweep["speeds"] = np.asarray(speeds, dtype=float)
+    return astro_calc.chart_from_sweep(sweep, meta["house_system"])
@@ -0,0 +1,344 @@
+"""Columnar binary format for chart batches.
+
+A ``.acol`` file stores many charts column by column, so analytics can
+memory-map it and scan e.g. every Moon longitude of a million charts as one
+NumPy array without parsing anything. Any row can be turned back into the
+usual calculate_chart dict on demand.
+
+Layout (little endian):
+
+    0   4 bytes   magic b"ACOL"
+    4   uint16    format version (1)
+    6   uint16    reserved, 0
+    8   uint64    length H of the JSON header
+    16  H bytes   JSON header, UTF-8
+    ... zero padding up to a multiple of 64: the data start
+
+The header holds ``count`` (N charts), ``bodies`` (B names, Ascendant
+first), ``strings`` (the lists the id columns index into) and ``columns``,
+mapping each column name to its ``dtype``, ``shape`` and byte ``offset``
+from the data start. Every column is a C-ordered array starting on a
+64 byte boundary:
+
+    longitude    float64 (N, B)   sidereal/tropical longitude per body
+    speed        float64 (N, B)   degrees/day, NaN for the Ascendant
+    house        uint8   (N, B)   house placement, 1-12
+    retrograde   uint8   (N, B)   1 when retrograde
+    sign         uint8   (N, B)   index into strings["sign"]
+    nakshatra    uint8   (N, B)   index into strings["nakshatra"]
+    pada         uint8   (N, B)   1-4
+    star_lord    uint8   (N, B)   index into strings["lord"]
+    sub_lord     uint8   (N, B)   index into strings["lord"]
+    cusp         float64 (N, 12)  house cusp longitudes
+    cusp_sign, cusp_nakshatra, cusp_pada, cusp_star_lord, cusp_sub_lord
+                 uint8   (N, 12)  as above, for the cusps
+    datetime     int64   (N,)     birth time as seconds since 1970-01-01
+                                  (naive local time, as entered)
+    latitude, longitude_geo, ayanamsa_value
+                 float64 (N,)
+    calculation_type, zodiac_system, ayanamsa, house_system, node_type
+                 uint8   (N,)     index into strings[<column name>]
+    valid        uint8   (N,)     0 for records whose chart failed
+    name_offset  int64   (N + 1,) name i is name_data[name_offset[i]:name_offset[i + 1]]
+    name_data    uint8   (total,) UTF-8 record names
+
+Rows of failed records keep their place (valid 0, NaN / 0 fields), so row
+i always belongs to input record i.
+"""
+import os
+import json
+import shutil
+import struct
+import tempfile
+import numpy as np
+
+from utils.chart_codec import META_STRINGS, build_chart
+
+COLUMNS_MAGIC = b"ACOL"
+COLUMNS_FORMAT = 1
+ALIGNMENT = 64
+
+SIGNS = ["Aries", "Taurus", "Gemini", "Cancer", "Leo", "Virgo",
+         "Libra", "Scorpio", "Sagittarius", "Capricorn", "Aquarius", "Pisces"]
+NAKSHATRAS = [
+    "Ashwini", "Bharani", "Krittika", "Rohini", "Mrigashira", "Ardra",
+    "Punarvasu", "Pushya", "Ashlesha", "Magha", "Purva Phalguni", "Uttara Phalguni",
+    "Hasta", "Chitra", "Swati", "Vishakha", "Anuradha", "Jyeshtha",
+    "Mula", "Purva Ashadha", "Uttara Ashadha", "Shravana", "Dhanishta", "Shatabhisha",
+    "Purva Bhadrapada", "Uttara Bhadrapada", "Revati"
+]
+# Vimshottari order
+LORDS = ["Ketu", "Venus", "Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury"]
+
+# Per body columns and their dtype; the cusp_ columns mirror the id columns
+BODY_COLUMNS = {"longitude": "<f8", "speed": "<f8", "house": "u1", "retrograde": "u1",
+                "sign": "u1", "nakshatra": "u1", "pada": "u1", "star_lord": "u1", "sub_lord": "u1"}
+CUSP_COLUMNS = {"cusp": "<f8", "cusp_sign": "u1", "cusp_nakshatra": "u1", "cusp_pada": "u1",
+                "cusp_star_lord": "u1", "cusp_sub_lord": "u1"}
+# Chart meta fields stored as ids; the rest of META_STRINGS is the datetime
+CATEGORY_COLUMNS = [key for key in META_STRINGS if key != "datetime"]
+META_COLUMNS = dict({"datetime": "<i8", "latitude": "<f8", "longitude_geo": "<f8",
+                     "ayanamsa_value": "<f8", "valid": "u1"},
+                    **{key: "u1" for key in CATEGORY_COLUMNS})
+
+ROW_COLUMNS = dict(BODY_COLUMNS, **CUSP_COLUMNS, **META_COLUMNS)
+
+EPOCH = np.datetime64("1970-01-01T00:00:00", "s")
+
+def aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+class StringTable:
+    """The string lists id columns index into; meta lists grow as values appear"""
+
+    def __init__(self, strings=None):
+        self.strings = {"sign": list(SIGNS), "nakshatra": list(NAKSHATRAS), "lord": list(LORDS)}
+        self.strings.update({key: [] for key in CATEGORY_COLUMNS})
+        self.strings.update({key: list(values) for key, values in (strings or {}).items()})
+        self.ids = {key: {value: i for i, value in enumerate(values)} for key, values in self.strings.items()}
+
+    def id(self, key, value):
+        ids = self.ids[key]
+        if value not in ids:
+            if key not in CATEGORY_COLUMNS or len(ids) >= 255:
+                raise ValueError(f"Unknown {key}: {value!r}")
+            ids[value] = len(ids)
+            self.strings[key].append(value)
+        return ids[value]
+
+def chart_values(chart, table, astro_calc):
+    """Column values for one chart dict: lists per body / cusp, scalars for meta"""
+    def lord_ids(details):
+        return [table.id("nakshatra", details["nakshatra"]), details["pada"],
+                table.id("lord", details["star_lord"]), table.id("lord", details["sub_lord"])]
+
+    row = {name: [] for name in list(BODY_COLUMNS) + list(CUSP_COLUMNS)}
+    for point in chart["points"].values():
+        if "nakshatra" not in point:  # The Ascendant only has its position
+            point = dict(astro_calc.get_nakshatra_data(point["longitude"]), **point)
+        row["longitude"].append(point["longitude"])
+        row["speed"].append(point.get("speed", np.nan))
+        row["house"].append(point["house"])
+        row["retrograde"].append(1 if point.get("is_retrograde") else 0)
+        row["sign"].append(table.id("sign", point["sign"]))
+        for column, value in zip(["nakshatra", "pada", "star_lord", "sub_lord"], lord_ids(point)):
+            row[column].append(value)
+    for house in range(1, 13):
+        cusp = chart["houses"][f"House_{house}"]
+        row["cusp"].append(cusp["longitude"])
+        row["cusp_sign"].append(table.id("sign", cusp["sign"]))
+        for column, value in zip(["cusp_nakshatra", "cusp_pada", "cusp_star_lord", "cusp_sub_lord"],
+                                 lord_ids(cusp)):
+            row[column].append(value)
+
+    meta = chart["meta"]
+    row["datetime"] = int((np.datetime64(meta["datetime"].replace(" ", "T"), "s") - EPOCH).astype(np.int64))
+    row["latitude"] = meta["latitude"]
+    row["longitude_geo"] = meta["longitude"]
+    row["ayanamsa_value"] = meta["ayanamsa_value"]
+    row["valid"] = 1
+    for key in CATEGORY_COLUMNS:
+        row[key] = table.id(key, meta[key])
+    return row
+
+def values_chart(values, bodies, strings, astro_calc):
+    """Rebuild the calculate_chart dict from one row of column values"""
+    meta = {key: strings[key][values[key]] for key in CATEGORY_COLUMNS}
+    meta["datetime"] = str(EPOCH + np.timedelta64(int(values["datetime"]), "s")).replace("T", " ")
+    meta["latitude"] = values["latitude"]
+    meta["longitude"] = values["longitude_geo"]
+    meta["ayanamsa_value"] = values["ayanamsa_value"]
+
+    asc = bodies.index("Ascendant")
+    rest = [i for i in range(len(bodies)) if i != asc]
+    # Archive records of an older layout have no speed field
+    speeds = values["speed"][rest] if "speed" in values else None
+    return build_chart(astro_calc, meta, values["longitude"][asc], [bodies[i] for i in rest],
+                       values["longitude"][rest], values["retrograde"][rest],
+                       values["house"][rest], values["cusp"], speeds)
+
+class ChartColumnWriter:
+    """Streams charts into a columnar file.
+
+    Rows are buffered ``chunk_size`` at a time and spilled to one temporary
+    file per column, so memory stays bounded however many charts are
+    written; close() assembles the final file. ``out`` is a path or a
+    binary file object (which need not be seekable, e.g. stdout).
+    """
+
+    def __init__(self, out, astro_calc=None, chunk_size=4096):
+        self.out = out
+        self.astro_calc = astro_calc
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.bodies = None
+        self.table = StringTable()
+        self.dtypes = dict(ROW_COLUMNS)
+        self.rows = {name: [] for name in self.dtypes}
+        self.spill_dir = tempfile.TemporaryDirectory(prefix="chart_columns_")
+        self.spills = {name: open(os.path.join(self.spill_dir.name, name), "wb")
+                       for name in list(self.dtypes) + ["name_offset", "name_data"]}
+        self.name_size = 0
+        self.name_offsets = [0]  # Not yet spilled, like self.rows
+        self.leading_failures = 0
+
+    def write(self, chart, name=""):
+        """Append one chart dict; None records a failed chart"""
+        row = self.chart_row(chart) if chart is not None else None
+        data = str(name or "").encode("utf-8")
+        self.spills["name_data"].write(data)
+        self.name_size += len(data)
+        self.name_offsets.append(self.name_size)
+        if len(self.name_offsets) >= self.chunk_size:
+            self.flush_names()
+        if row is not None:
+            self.add_row(row)
+        elif self.bodies is None:
+            self.leading_failures += 1  # Written once the body count is known
+        else:
+            self.add_row(self.failed_row())
+
+    def failed_row(self):
+        row = {}
+        for columns, shape in ((BODY_COLUMNS, len(self.bodies)), (CUSP_COLUMNS, 12), (META_COLUMNS, ())):
+            for name, dtype in columns.items():
+                row[name] = np.full(shape, np.nan if dtype == "<f8" else 0, dtype=dtype)
+        return row
+
+    def set_bodies(self, bodies):
+        self.bodies = bodies
+        for _ in range(self.leading_failures):
+            self.add_row(self.failed_row())
+        self.leading_failures = 0
+
+    def chart_row(self, chart):
+        bodies = list(chart["points"])
+        if self.bodies is None:
+            self.set_bodies(bodies)
+        elif bodies != self.bodies:
+            raise ValueError(f"Chart bodies {bodies} do not match {self.bodies}")
+
+        if self.astro_calc is None:
+            from utils.astro_calc import AstroCalc
+            self.astro_calc = AstroCalc()
+        return chart_values(chart, self.table, self.astro_calc)
+
+    def add_row(self, row):
+        for name, value in row.items():
+            self.rows[name].append(value)
+        self.count += 1
+        if len(self.rows["valid"]) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Spill the buffered rows to the per-column temporary files"""
+        for name, values in self.rows.items():
+            if values:
+                np.asarray(values, dtype=self.dtypes[name]).tofile(self.spills[name])
+            self.rows[name] = []
+        self.flush_names()
+
+    def flush_names(self):
+        np.asarray(self.name_offsets, dtype="<i8").tofile(self.spills["name_offset"])
+        self.name_offsets = []
+
+    def close(self):
+        """Write the final file and remove the temporary column files"""
+        if self.bodies is None:
+            self.set_bodies([])  # Only failures were written
+        self.flush()
+        for f in self.spills.values():
+            f.close()
+
+        shapes = {name: [self.count, len(self.bodies)] for name in BODY_COLUMNS}
+        shapes.update({name: [self.count, 12] for name in CUSP_COLUMNS})
+        shapes.update({name: [self.count] for name in META_COLUMNS})
+        shapes["name_offset"] = [self.count + 1]
+        shapes["name_data"] = [self.name_size]
+        dtypes = dict(self.dtypes, name_offset="<i8", name_data="u1")
+
+        columns = {}
+        offset = 0
+        for name, shape in shapes.items():
+            columns[name] = {"dtype": dtypes[name], "shape": shape, "offset": offset}
+            offset = aligned(offset + int(np.prod(shape)) * np.dtype(dtypes[name]).itemsize)
+        header = json.dumps({"count": self.count, "bodies": self.bodies,
+                             "strings": self.table.strings, "columns": columns}).encode("utf-8")
+        start = 16 + len(header)
+
+        out = open(self.out, "wb") if isinstance(self.out, (str, os.PathLike)) else self.out
+        try:
+            out.write(COLUMNS_MAGIC + struct.pack("<HHQ", COLUMNS_FORMAT, 0, len(header)) + header)
+            out.write(b"\0" * (aligned(start) - start))
+            position = 0
+            for name, column in columns.items():
+                out.write(b"\0" * (column["offset"] - position))
+                with open(os.path.join(self.spill_dir.name, name), "rb") as f:
+                    shutil.copyfileobj(f, out)
+                position = column["offset"] + int(np.prod(column["shape"])) * np.dtype(column["dtype"]).itemsize
+            out.flush()
+        finally:
+            if out is not self.out:
+                out.close()
+            self.spill_dir.cleanup()
+
+class ChartColumns:
+    """Read only, memory-mapped view of a columnar chart file.
+
+    ``columns[name]`` (or ``self[name]``) is a NumPy array backed by the
+    file, so scans only touch the pages they need.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            magic, version, _, length = struct.unpack("<4sHHQ", f.read(16))
+            if magic != COLUMNS_MAGIC:
+                raise ValueError(f"{path} is not a columnar chart file")
+            if version != COLUMNS_FORMAT:
+                raise ValueError(f"Unsupported columnar chart format {version}")
+            header = json.loads(f.read(length).decode("utf-8"))
+        start = aligned(16 + length)
+
+        self.count = header["count"]
+        self.bodies = header["bodies"]
+        self.strings = header["strings"]
+        self.columns = {}
+        for name, column in header["columns"].items():
+            shape = tuple(column["shape"])
+            if np.prod(shape) == 0:
+                self.columns[name] = np.zeros(shape, dtype=column["dtype"])
+            else:
+                self.columns[name] = np.memmap(path, dtype=column["dtype"], mode="r",
+                                               offset=start + column["offset"], shape=shape)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def body_index(self, body):
+        return self.bodies.index(body)
+
+    def labels(self, name):
+        """String values for an id column, e.g. labels("star_lord")"""
+        key = name.replace("cusp_", "")
+        key = "lord" if key in ("star_lord", "sub_lord") else key
+        return np.asarray(self.strings[key])[self.columns[name]]
+
+    def name(self, row):
+        offsets = self.columns["name_offset"]
+        return bytes(self.columns["name_data"][offsets[row]:offsets[row + 1]]).decode("utf-8")
+
+    def chart(self, row, astro_calc):
+        """The calculate_chart dict for one row, or None for a failed record"""
+        if not self.columns["valid"][row]:
+            return None
+        values = {name: column[row] for name, column in self.columns.items() if name in ROW_COLUMNS}
+        return values_chart(values, self.bodies, self.strings, astro_calc)
+
+    def charts(self, astro_calc):
+        """Yield (name, chart dict or None) for every row"""
+        for row in range(self.count):
+            yield self.name(row), self.chart(row, astro_calc)
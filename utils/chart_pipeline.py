@@ -0,0 +1,245 @@
+"""Streaming chart pipeline for very large record sets.
+
+Records flow through generator stages, one chunk at a time:
+
+    read -> geocode -> compute chart -> compute dashas -> write
+
+Reading and geocoding run in this process (geocoding shares one cache and
+one rate limited network worker). The chart and dasha stages run in a
+process pool; at most ``max_pending`` chunks are in flight, and the reader
+is only asked for the next chunk when one finishes, so memory stays flat
+however large the input. Results come back in input order, which lets a
+checkpoint record "the first N records are written", with the input file
+and byte offset after record N, and a later run seek there and resume.
+"""
+import os
+import sys
+import json
+import time
+import contextlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.chart_cli import ChartBatch, read_records
+
+def offline_provider(query):
+    """Provider for offline runs: places missing from the gazetteer and cache stay
+    unresolved (and are not cached as misses)"""
+    raise LookupError(f"{query!r} is not in the gazetteer or the geocode cache")
+
+def read_stage(paths, start=(0, 0), positions=None):
+    """Records from JSONL / CSV files from a (file index, byte offset)
+    position; the position after each record is appended to ``positions``"""
+    return read_records(paths, start, positions)
+
+def chunk_stage(records, chunk_size):
+    """Group records into lists of chunk_size"""
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def geocode_stage(chunks, geocoder):
+    """Fill in coordinates from the city for records that have none"""
+    for chunk in chunks:
+        missing = [record for record in chunk
+                   if record.get("latitude") in (None, "") or record.get("longitude") in (None, "")]
+        cities = [str(record.get("city") or "").strip() for record in missing]
+        places = geocoder.resolve_many([city for city in cities if city]) if any(cities) else {}
+        for record, city in zip(missing, cities):
+            place = places.get(city)
+            if place:
+                record["latitude"], record["longitude"] = place["latitude"], place["longitude"]
+            elif "_error" not in record:
+                record["_error"] = f"Could not geocode {city!r}" if city else "No coordinates or city"
+        yield chunk
+
+# One ChartBatch per worker process (pyswisseph keeps global state)
+worker_batch = None
+worker_verbose = False
+
+def start_batch(defaults, dasha_levels, strengths):
+    global worker_batch
+    worker_batch = ChartBatch(defaults, dasha_levels=dasha_levels, strengths=strengths)
+
+def init_worker(defaults, dasha_levels, strengths, verbose):
+    global worker_verbose
+    start_batch(defaults, dasha_levels, strengths)
+    worker_verbose = verbose
+
+@contextlib.contextmanager
+def debug_output(verbose):
+    """The calculation code prints debug details; keep them off the output
+    (on stderr when verbose, else discarded)"""
+    if verbose:
+        with contextlib.redirect_stdout(sys.stderr):
+            yield
+    else:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+
+def chart_stage(chunk):
+    return [worker_batch.compute_chart(record) for record in chunk]
+
+def dasha_stage(results, chunk):
+    return [worker_batch.compute_dashas(result, record) for result, record in zip(results, chunk)]
+
+def compute_chunk(chunk):
+    """Chart and dasha stages for one chunk"""
+    return dasha_stage(chart_stage(chunk), chunk)
+
+def worker_chunk(chunk):
+    """compute_chunk in a worker process"""
+    with debug_output(worker_verbose):
+        return compute_chunk(chunk)
+
+class Checkpoint:
+    """Progress of one pipeline job, saved atomically as JSON.
+
+    A checkpoint is only reused by the same job (inputs, output, format and
+    settings); it records how many records are written, where in the inputs
+    the next record starts (file index, byte offset) and how long the output
+    file was at that point.
+    """
+
+    def __init__(self, path, job):
+        self.path = path
+        self.job = job
+        self.records = 0
+        self.position = (0, 0)
+        self.output_bytes = 0
+        self.errors = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("job") == job:
+                self.records = state["records"]
+                self.position = tuple(state["position"])
+                self.output_bytes = state["output_bytes"]
+                self.errors = state["errors"]
+            else:
+                print(f"Checkpoint {path} is for a different job; starting over", file=sys.stderr)
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            print(f"Ignoring unreadable checkpoint {path}: {e}", file=sys.stderr)
+
+    def save(self, records, position, output_bytes, errors):
+        self.records, self.position = records, tuple(position)
+        self.output_bytes, self.errors = output_bytes, errors
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"job": self.job, "records": records, "position": list(position),
+                       "output_bytes": output_bytes, "errors": errors}, f)
+        os.replace(temp_path, self.path)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+class ChartPipeline:
+    """Runs the stages over records with a pool of ``workers`` processes.
+
+    workers=0 computes in this process (no pool); None uses every CPU.
+    """
+
+    def __init__(self, defaults=None, dasha_levels=1, strengths=True, workers=None,
+                 chunk_size=200, max_pending=None, geocoder=None, verbose=False):
+        self.settings = (defaults or {}, dasha_levels, strengths, verbose)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = chunk_size
+        self.max_pending = max_pending or max(2 * self.workers, 1)
+        self.geocoder = geocoder
+
+    def results(self, records):
+        """Yield (chunk records, chunk results) in input order"""
+        chunks = chunk_stage(records, self.chunk_size)
+        if self.geocoder is not None:
+            chunks = geocode_stage(chunks, self.geocoder)
+
+        if self.workers == 0:
+            start_batch(*self.settings[:3])
+            for chunk in chunks:
+                with debug_output(self.settings[3]):
+                    results = compute_chunk(chunk)
+                yield chunk, results
+            return
+
+        with ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=self.settings) as pool:
+            pending = deque()
+            try:
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(worker_chunk, chunk)))
+                    # Back-pressure: read on only once the oldest chunk is done
+                    if len(pending) >= self.max_pending:
+                        chunk, future = pending.popleft()
+                        yield chunk, future.result()
+                while pending:
+                    chunk, future = pending.popleft()
+                    yield chunk, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def run(self, paths, output, writer_class, checkpoint_path=None, checkpoint_every=10.0,
+            on_error=None):
+        """Process the input files with a chart_cli writer class.
+
+        ``output`` is a file path, or None for stdout. With a checkpoint path
+        the job resumes where an earlier, interrupted run with the same
+        settings left off; the checkpoint is removed once the job completes.
+        Returns (records, errors).
+        """
+        binary = getattr(writer_class, "binary", False)
+        checkpoint = None
+        if checkpoint_path:
+            if output is None or not getattr(writer_class, "appendable", True):
+                raise ValueError("Checkpoints need a jsonl, csv or binary output file")
+            defaults, dasha_levels, strengths, _ = self.settings
+            checkpoint = Checkpoint(checkpoint_path, {
+                "inputs": [os.path.abspath(path) for path in paths], "output": os.path.abspath(output),
+                "format": writer_class.__name__, "defaults": defaults, "dasha_levels": dasha_levels,
+                "strengths": strengths})
+        resume = checkpoint is not None and checkpoint.records > 0 and os.path.exists(output)
+        if resume:
+            with open(output, "r+b") as f:
+                f.truncate(checkpoint.output_bytes)  # Drop output written after the checkpoint
+            print(f"Resuming after record {checkpoint.records}", file=sys.stderr)
+        count, errors = (checkpoint.records, checkpoint.errors) if resume else (0, 0)
+        position = checkpoint.position if resume else (0, 0)
+        positions = deque()  # Input position after each record read but not yet written
+
+        if output is None:
+            out = sys.stdout.buffer if binary else sys.stdout
+        else:
+            mode = ("ab" if binary else "a") if resume else ("wb" if binary else "w")
+            out = open(output, mode, newline=None if binary else "", encoding=None if binary else "utf-8")
+        try:
+            writer = writer_class(out, header=not resume)
+            last_save = time.monotonic()
+            for chunk, results in self.results(read_stage(paths, position, positions)):
+                for result in results:
+                    writer.write(result)
+                    count += 1
+                    position = positions.popleft()
+                    if "error" in result:
+                        errors += 1
+                        if on_error:
+                            on_error(count, result)
+                if checkpoint and time.monotonic() - last_save >= checkpoint_every:
+                    out.flush()
+                    os.fsync(out.fileno())
+                    checkpoint.save(count, position, os.fstat(out.fileno()).st_size, errors)
+                    last_save = time.monotonic()
+            writer.close()
+        finally:
+            if output is not None:
+                out.close()
+        if checkpoint:
+            checkpoint.remove()
+        return count, errors
@@ -0,0 +1,259 @@
+"""Batch compatibility (synastry and Ashtakoota) between sets of charts.
+
+Both sides are columnar chart files (see chart_columns), so every Moon
+position and aspect longitude is already one NumPy array. All eight
+Ashtakoota (Guna Milan) scores depend only on the two Moon nakshatras and
+signs, and a Moon pada (0-107) fixes both, so the scores of every pada
+pair are tabulated once and a block of N x M pairs is a single fancy
+index. Inter-chart aspects between a few key points are classified per
+block with AspectEngine. Blocks of rows run in a process pool and keep
+only each row's top k matches (argpartition), so 10k x 10k pairs never
+sit in memory at once.
+
+In Ashtakoota the first set is the groom's side and the second the bride's.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.aspects import AspectEngine
+from utils.chart_columns import ChartColumns, SIGNS
+from utils.house_strength import SIGN_LORDS
+
+KOOTAS = ["Varna", "Vashya", "Tara", "Yoni", "Graha Maitri", "Gana", "Bhakoot", "Nadi"]
+KOOTA_POINTS = {"Varna": 1, "Vashya": 2, "Tara": 3, "Yoni": 4, "Graha Maitri": 5,
+                "Gana": 6, "Bhakoot": 7, "Nadi": 8}
+
+# Per sign: varna (Brahmin 3 ... Shudra 0) and vashya class
+SIGN_VARNA = [2, 1, 0, 3, 2, 1, 0, 3, 2, 1, 0, 3]
+VASHYA_CLASSES = ["Chatushpada", "Manava", "Jalachara", "Vanachara", "Keeta"]
+SIGN_VASHYA = [0, 0, 1, 2, 3, 1, 1, 4, 1, 0, 1, 2]
+VASHYA_SCORES = [
+    [2, 1, 1, 0.5, 1],
+    [1, 2, 0.5, 0, 1],
+    [1, 0.5, 2, 1, 1],
+    [0.5, 0, 1, 2, 0],
+    [1, 1, 1, 0, 2]
+]
+
+# Per nakshatra: yoni animal, gana and nadi
+YONIS = ["Horse", "Elephant", "Sheep", "Serpent", "Dog", "Cat", "Rat",
+         "Cow", "Buffalo", "Tiger", "Deer", "Monkey", "Mongoose", "Lion"]
+NAKSHATRA_YONI = [0, 1, 2, 3, 3, 4, 5, 2, 5, 6, 6, 7, 8, 9, 8, 9, 10, 10,
+                  4, 11, 12, 11, 13, 0, 13, 7, 1]
+YONI_SCORES = [
+    [4, 2, 2, 3, 2, 2, 2, 1, 0, 1, 3, 3, 2, 1],
+    [2, 4, 3, 3, 2, 2, 2, 2, 3, 1, 2, 3, 2, 0],
+    [2, 3, 4, 2, 1, 2, 1, 3, 3, 1, 2, 0, 3, 1],
+    [3, 3, 2, 4, 2, 1, 1, 1, 1, 2, 2, 2, 0, 2],
+    [2, 2, 1, 2, 4, 2, 1, 2, 2, 1, 0, 2, 1, 1],
+    [2, 2, 2, 1, 2, 4, 0, 2, 2, 1, 3, 3, 2, 1],
+    [2, 2, 1, 1, 1, 0, 4, 2, 2, 2, 2, 2, 1, 2],
+    [1, 2, 3, 1, 2, 2, 2, 4, 3, 0, 3, 2, 2, 1],
+    [0, 3, 3, 1, 2, 2, 2, 3, 4, 1, 2, 2, 2, 1],
+    [1, 1, 1, 2, 1, 1, 2, 0, 1, 4, 1, 1, 2, 1],
+    [3, 2, 2, 2, 0, 3, 2, 3, 2, 1, 4, 2, 2, 1],
+    [3, 3, 0, 2, 2, 3, 2, 2, 2, 1, 2, 4, 3, 2],
+    [2, 2, 3, 0, 1, 2, 1, 2, 2, 2, 2, 3, 4, 2],
+    [1, 0, 1, 2, 1, 1, 2, 1, 1, 1, 1, 2, 2, 4]
+]
+GANAS = ["Deva", "Manushya", "Rakshasa"]
+NAKSHATRA_GANA = [0, 1, 2, 1, 0, 1, 0, 0, 2, 2, 1, 1, 0, 2, 0, 2, 0, 2,
+                  2, 1, 1, 0, 2, 2, 1, 1, 0]
+# Groom's gana (rows) against the bride's
+GANA_SCORES = [
+    [6, 6, 1],
+    [5, 6, 0],
+    [1, 0, 6]
+]
+# Adi, Madhya, Antya, zigzagging through the nakshatras
+NAKSHATRA_NADI = [0, 1, 2, 2, 1, 0] * 4 + [0, 1, 2]
+
+MAITRI_LORDS = ["Sun", "Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn"]
+MAITRI_SCORES = [
+    [5, 5, 5, 4, 5, 0, 0],
+    [5, 5, 4, 1, 4, 0.5, 0.5],
+    [5, 4, 5, 0.5, 5, 3, 0.5],
+    [4, 1, 0.5, 5, 0.5, 5, 4],
+    [5, 4, 5, 0.5, 5, 0.5, 3],
+    [0, 0.5, 3, 5, 0.5, 5, 5],
+    [0, 0.5, 0.5, 4, 3, 5, 5]
+]
+
+# Inter-chart aspects: harmonious ones add, hard ones subtract
+ASPECT_BODIES = ["Ascendant", "Sun", "Moon", "Mars", "Venus", "Jupiter"]
+ASPECT_HARMONY = {"Conjunction": 1.0, "Trine": 1.0, "Sextile": 1.0, "Square": -1.0, "Opposition": -1.0}
+
+def koota_table():
+    """Ashtakoota scores of every (groom Moon pada, bride Moon pada) pair:
+    an array (8 kootas, 108, 108) in KOOTAS order"""
+    pada = np.arange(108)
+    nakshatra = pada // 4
+    sign = pada * 10 // 90  # A pada is 3°20', a sign 30°
+    groom_nak, bride_nak = nakshatra[:, None], nakshatra[None, :]
+    groom_sign, bride_sign = sign[:, None], sign[None, :]
+    varna = np.array(SIGN_VARNA)
+    vashya = np.array(SIGN_VASHYA)
+    yoni = np.array(NAKSHATRA_YONI)
+    gana = np.array(NAKSHATRA_GANA)
+    nadi = np.array(NAKSHATRA_NADI)
+    lords = np.array([MAITRI_LORDS.index(SIGN_LORDS[name]) for name in SIGNS])
+
+    # Tara: count from one star to the other, remainder by 9; 3, 5 and 7 are bad
+    def tara(start, end):
+        return np.where(np.isin(((end - start) % 27 + 1) % 9, [3, 5, 7]), 0, 1.5)
+
+    # Bhakoot: the 2/12, 5/9 and 6/8 sign relations score nothing
+    distance = (bride_sign - groom_sign) % 12 + 1
+
+    table = [
+        np.where(varna[groom_sign] >= varna[bride_sign], 1.0, 0.0),
+        np.array(VASHYA_SCORES)[vashya[groom_sign], vashya[bride_sign]],
+        tara(groom_nak, bride_nak) + tara(bride_nak, groom_nak),
+        np.array(YONI_SCORES)[yoni[groom_nak], yoni[bride_nak]],
+        np.array(MAITRI_SCORES)[lords[groom_sign], lords[bride_sign]],
+        np.array(GANA_SCORES)[gana[groom_nak], gana[bride_nak]],
+        np.where(np.isin(distance, [2, 12, 5, 9, 6, 8]), 0.0, 7.0),
+        np.where(nadi[groom_nak] == nadi[bride_nak], 0.0, 8.0)
+    ]
+    return np.array([np.broadcast_to(koota, (108, 108)) for koota in table], dtype=float)
+
+KOOTA_TABLE = koota_table()
+GUNA_TABLE = KOOTA_TABLE.sum(axis=0)
+
+class CompatibilityEngine:
+    """Compatibility of every chart in one columnar file with every chart
+    in another (or the same) file.
+
+    A pair's score is its Guna Milan total (out of 36) plus aspect_weight
+    times its aspect harmony (ASPECT_HARMONY summed over the aspects
+    between ASPECT_BODIES of the two charts).
+    """
+
+    def __init__(self, first, second=None, aspect_weight=0.25, bodies=None, engine=None):
+        self.first_path = first.path if isinstance(first, ChartColumns) else first
+        self.second_path = self.first_path if second is None else (
+            second.path if isinstance(second, ChartColumns) else second)
+        self.first = first if isinstance(first, ChartColumns) else ChartColumns(first)
+        self.second = self.first if self.second_path == self.first_path else (
+            second if isinstance(second, ChartColumns) else ChartColumns(second))
+        self.same = self.second_path == self.first_path
+        self.aspect_weight = aspect_weight
+        self.bodies = list(bodies or ASPECT_BODIES)
+        self.engine = engine or AspectEngine()
+        self.harmony_breaks, self.harmony_steps = self.harmony_table()
+
+        self.first_pada, self.first_longitudes, self.first_valid = self.side(self.first)
+        self.second_pada, self.second_longitudes, self.second_valid = self.side(self.second)
+
+    def side(self, columns):
+        """Moon pada, key point longitudes and valid flags of one file"""
+        moon = columns.body_index("Moon")
+        pada = columns["nakshatra"][:, moon].astype(np.int64) * 4 + columns["pada"][:, moon] - 1
+        longitudes = np.asarray(columns["longitude"][:, [columns.body_index(body) for body in self.bodies]])
+        valid = np.asarray(columns["valid"], dtype=bool)
+        return np.clip(pada, 0, 107), longitudes, valid
+
+    def guna(self, rows):
+        """Guna Milan totals of first rows against every second row"""
+        return GUNA_TABLE[self.first_pada[rows][:, None], self.second_pada[None, :]]
+
+    def harmony_table(self):
+        """Harmony as a step function of the difference of two longitudes.
+
+        The classification only changes at an orb edge or halfway between
+        two aspect angles (mirrored over the whole -360..360 range of a
+        difference), so searchsorted on those breaks gives each pair's
+        harmony without folding or classifying it (exact except on an edge).
+        """
+        angles, orbs = self.engine.angles, self.engine.orbs
+        middles = (np.sort(angles)[1:] + np.sort(angles)[:-1]) / 2
+        edges = np.clip(np.concatenate([angles - orbs, angles + orbs, middles]), 0, 180)
+        breaks = np.unique(np.concatenate([edges, -edges, 360 - edges, edges - 360]))
+        probes = np.concatenate([[breaks[0] - 1], (breaks[1:] + breaks[:-1]) / 2, [breaks[-1] + 1]])
+        aspect, _ = self.engine.classify(self.engine.distances(probes, [0.0])[:, 0])
+        values = np.array([ASPECT_HARMONY.get(name, 0.0) for name in self.engine.names] + [0.0])
+        # Index -1 (no aspect) picks the trailing 0
+        return breaks, values[aspect]
+
+    def aspect_harmony(self, rows):
+        """Aspect harmony of first rows against every second row"""
+        first = self.first_longitudes[rows]
+        harmony = np.zeros((len(first), len(self.second_longitudes)))
+        # One (rows x second) matrix per body pair keeps the block's memory small
+        for i in range(len(self.bodies)):
+            for j in range(len(self.bodies)):
+                differences = first[:, i, None] - self.second_longitudes[None, :, j]
+                harmony += self.harmony_steps[np.searchsorted(self.harmony_breaks, differences)]
+        return harmony
+
+    def scores(self, rows):
+        """Guna, harmony and total score matrices (rows x second) for first rows"""
+        rows = np.asarray(rows)
+        guna = self.guna(rows)
+        harmony = self.aspect_harmony(rows)
+        total = guna + self.aspect_weight * harmony
+        total[~self.first_valid[rows]] = -np.inf
+        total[:, ~self.second_valid] = -np.inf
+        if self.same:
+            total[np.arange(len(rows)), rows] = -np.inf
+        return guna, harmony, total
+
+    def top_block(self, start, stop, k):
+        """Top k second rows (and their scores) for first rows start..stop"""
+        rows = np.arange(start, stop)
+        guna, harmony, total = self.scores(rows)
+        k = min(k, total.shape[1])
+        best = np.argpartition(-total, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(total, best, 1), axis=1, kind="stable")
+        best = np.take_along_axis(best, order, 1)
+        return (best, np.take_along_axis(total, best, 1), np.take_along_axis(guna, best, 1),
+                np.take_along_axis(harmony, best, 1))
+
+    def kootas(self, first_row, second_row):
+        """Ashtakoota breakdown for one pair: koota name -> points"""
+        table = KOOTA_TABLE[:, self.first_pada[first_row], self.second_pada[second_row]]
+        return dict(zip(KOOTAS, (float(points) for points in table)))
+
+    def top_matches(self, k=10, workers=0, block_size=64):
+        """Best k matches of every first row, best first.
+
+        Returns arrays (first rows x k): match (second row indices, -1 where
+        there are fewer than k candidates), score, guna and harmony.
+        Blocks of rows run in ``workers`` processes (0: in this process).
+        """
+        blocks = [(start, min(start + block_size, len(self.first)))
+                  for start in range(0, len(self.first), block_size)]
+        if workers == 0 or len(blocks) <= 1:
+            results = [self.top_block(start, stop, k) for start, stop in blocks]
+        else:
+            # The aspect engine is rebuilt in each worker from its aspects and orbs
+            orbs = dict(zip(self.engine.names, self.engine.orbs.tolist()))
+            settings = (self.first_path, self.second_path, self.aspect_weight, self.bodies,
+                        self.engine.aspects, orbs)
+            with ProcessPoolExecutor(workers, initializer=init_worker, initargs=settings) as pool:
+                results = list(pool.map(top_block, [start for start, _ in blocks],
+                                        [stop for _, stop in blocks], [k] * len(blocks)))
+        match, score, guna, harmony = (np.concatenate([result[i] for result in results]) for i in range(4))
+        match = np.where(np.isfinite(score), match, -1)
+        return {"match": match, "score": score, "guna": guna, "harmony": harmony}
+
+    def ranked(self, row, k=10):
+        """Best k matches of one first row as dicts: name, row, score, guna, harmony"""
+        best, score, guna, harmony = (values[0] for values in self.top_block(row, row + 1, k))
+        return [{"name": self.second.name(int(match)), "row": int(match), "score": float(total),
+                 "guna": float(points), "harmony": float(value)}
+                for match, total, points, value in zip(best, score, guna, harmony) if np.isfinite(total)]
+
+# One engine per worker process; the files are memory-mapped, not copied
+worker_engine = None
+
+def init_worker(first_path, second_path, aspect_weight, bodies, aspects, orbs):
+    global worker_engine
+    worker_engine = CompatibilityEngine(first_path, second_path, aspect_weight, bodies,
+                                        AspectEngine(aspects, orbs))
+
+def top_block(start, stop, k):
+    return worker_engine.top_block(start, stop, k)
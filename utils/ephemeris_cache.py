@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import numpy as np
+import swisseph as swe
+from numpy.polynomial import chebyshev
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.constants import EPHEMERIS_CACHE_PATH
+
+# Tabulated series: Swiss Ephemeris id, segment length in days, Chebyshev degree.
+# Longitudes are geocentric and tropical; sidereal ones subtract the ayanamsa.
+BODY_SERIES = {
+    "Sun": (swe.SUN, 16, 13),
+    "Moon": (swe.MOON, 8, 13),
+    "Mercury": (swe.MERCURY, 8, 13),
+    "Venus": (swe.VENUS, 16, 13),
+    "Mars": (swe.MARS, 16, 13),
+    "Jupiter": (swe.JUPITER, 32, 13),
+    "Saturn": (swe.SATURN, 32, 13),
+    "Uranus": (swe.URANUS, 64, 13),
+    "Neptune": (swe.NEPTUNE, 64, 13),
+    "Pluto": (swe.PLUTO, 64, 13),
+    "True Node": (swe.TRUE_NODE, 4, 13),
+    "Mean Node": (swe.MEAN_NODE, 64, 13),
+}
+# Sidereal offset (ayanamsa plus the nutation that sidereal swe.calc leaves out),
+# segment length in days and degree; short enough to follow the fortnightly nutation terms
+AYANAMSA_SERIES = (16, 8)
+# Saved tables of another format are rebuilt (2: the error is measured on every segment)
+CACHE_FORMAT = 2
+
+class EphemerisCache:
+    """Chebyshev tables of body longitudes for fast vectorized lookups.
+
+    Each series covers ``start_year``..``end_year`` with fixed-length
+    segments; a segment stores the coefficients of a Chebyshev fit through
+    Swiss Ephemeris positions at the Chebyshev nodes. Tables are built on
+    first use, saved as .npy files under ``cache_path`` and memory-mapped,
+    so evaluating millions of instants is a few NumPy passes (Clenshaw
+    recurrence) instead of millions of swe.calc calls.
+
+    Error: every table records the largest difference from swe.calc found
+    halfway between the fit nodes of every segment when it was built
+    (``error_bounds()``, in arcseconds). The fits themselves are far below 0.01" for the Sun and
+    Moon; with the built-in Moshier ephemeris (no .se1 files) the measured
+    bound is about 1-2" for the planets, which is the noise of the Moshier
+    series rather than of the fit. Positions are evaluated like AstroCalc's
+    swe.calc calls on the same Julian day, geocentric only.
+    """
+
+    def __init__(self, cache_path=EPHEMERIS_CACHE_PATH, start_year=1800, end_year=2200):
+        self.cache_path = cache_path
+        self.start_year = start_year
+        self.end_year = end_year
+        self.start_jd = swe.julday(start_year, 1, 1, 0.0)
+        self.end_jd = swe.julday(end_year, 1, 1, 0.0)
+        self.tables = {}
+        self.derivatives = {}
+        self.meta = None
+
+    def file(self, name):
+        return os.path.join(self.cache_path, name)
+
+    def load_meta(self):
+        if self.meta is None:
+            try:
+                with open(self.file('meta.json'), encoding='utf-8') as f:
+                    self.meta = json.load(f)
+            except (FileNotFoundError, ValueError):
+                self.meta = {}
+            if self.meta.get('span') != [self.start_year, self.end_year] or \
+                    self.meta.get('swe_version') != swe.version or self.meta.get('format') != CACHE_FORMAT:
+                self.meta = {'span': [self.start_year, self.end_year], 'swe_version': swe.version,
+                             'format': CACHE_FORMAT, 'series': {}}
+        return self.meta
+
+    def save_meta(self):
+        with open(self.file('meta.json.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=1)
+        os.replace(self.file('meta.json.tmp'), self.file('meta.json'))
+
+    def series(self, name):
+        """Segment length, degree and position function of a series"""
+        if name in BODY_SERIES:
+            body_id, segment, degree = BODY_SERIES[name]
+            return segment, degree, lambda jd: swe.calc(jd, body_id, 0)[0][0]
+        if name.startswith('ayanamsa:'):
+            from utils.astro_calc import AstroCalc
+            mode = AstroCalc().ayanamsa_map[name.split(':', 1)[1]]
+
+            def ayanamsa(jd):
+                swe.set_sid_mode(mode)
+                return swe.calc(jd, swe.SUN, 0)[0][0] - swe.calc(jd, swe.SUN, swe.FLG_SIDEREAL)[0][0]
+            return AYANAMSA_SERIES[0], AYANAMSA_SERIES[1], ayanamsa
+        raise ValueError(f"No ephemeris series for {name!r}")
+
+    def build(self, name):
+        """Fit and save one series over the whole span"""
+        segment, degree, position = self.series(name)
+        count = int(np.ceil((self.end_jd - self.start_jd) / segment))
+        nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+        # Check points halfway between the nodes, where the fit is loosest
+        checks = np.cos(np.pi * np.arange(1, degree + 1) / (degree + 1))
+
+        coefficients = np.empty((count, degree + 1))
+        max_error = 0.0
+        for index in range(count):
+            begin = self.start_jd + index * segment
+            values = np.degrees(np.unwrap(np.radians([position(begin + (t + 1) * segment / 2) for t in nodes])))
+            coefficients[index] = chebyshev.chebfit(nodes, values, degree)
+            # Every segment, so the recorded figure is a bound over the whole table
+            fitted = chebyshev.chebval(checks, coefficients[index])
+            actual = np.array([position(begin + (t + 1) * segment / 2) for t in checks])
+            max_error = max(max_error, np.max(np.abs((fitted - actual + 180) % 360 - 180)) * 3600)
+
+        os.makedirs(self.cache_path, exist_ok=True)
+        file_name = name.replace(':', '_').replace(' ', '_').lower() + '.npy'
+        with open(self.file(file_name + '.tmp'), 'wb') as f:
+            np.save(f, coefficients)
+        os.replace(self.file(file_name + '.tmp'), self.file(file_name))
+        meta = self.load_meta()
+        meta['series'][name] = {'file': file_name, 'segment_days': segment, 'degree': degree,
+                                'max_error_arcsec': round(max_error, 6)}
+        self.save_meta()
+
+    def table(self, name):
+        """Coefficient table of a series, building it if needed"""
+        if name not in self.tables:
+            info = self.load_meta()['series'].get(name)
+            segment, degree, _ = self.series(name)
+            if not info or info['segment_days'] != segment or info['degree'] != degree \
+                    or not os.path.exists(self.file(info['file'])):
+                print(f"Building ephemeris cache for {name} ({self.start_year}-{self.end_year})")
+                self.build(name)
+                info = self.meta['series'][name]
+            self.tables[name] = np.load(self.file(info['file']), mmap_mode='r')
+        return self.tables[name]
+
+    def covers(self, julian_days):
+        julian_days = np.asarray(julian_days, dtype=float)
+        return julian_days.size == 0 or (julian_days.min() >= self.start_jd and julian_days.max() < self.end_jd)
+
+    def evaluate(self, name, julian_days, speed=False):
+        """Values (and day rates with speed=True) of a series at many Julian days"""
+        julian_days = np.asarray(julian_days, dtype=float)
+        if not self.covers(julian_days):
+            raise ValueError(f"Julian days outside the cached span {self.start_year}-{self.end_year}")
+        coefficients = self.table(name)
+        segment = self.meta['series'][name]['segment_days']
+        index = np.minimum(((julian_days - self.start_jd) // segment).astype(np.int64), len(coefficients) - 1)
+        t = 2 * (julian_days - self.start_jd - index * segment) / segment - 1
+
+        values = self.clenshaw(coefficients, index, t)
+        if not speed:
+            return values
+        if name not in self.derivatives:
+            self.derivatives[name] = chebyshev.chebder(np.asarray(coefficients), axis=1)
+        return values, self.clenshaw(self.derivatives[name], index, t) * 2 / segment
+
+    @staticmethod
+    def clenshaw(coefficients, index, t):
+        """Sum of coefficients[index, k] * T_k(t), vectorized over index and t"""
+        b1 = np.zeros_like(t)
+        b2 = np.zeros_like(t)
+        for k in range(coefficients.shape[1] - 1, 0, -1):
+            b1, b2 = coefficients[index, k] + 2 * t * b1 - b2, b1
+        return coefficients[index, 0] + t * b1 - b2
+
+    def longitudes(self, body, julian_days, zodiac="Sidereal", ayanamsa="Lahiri", node="True Node"):
+        """Longitudes and speeds (degrees/day) of a body at many Julian days.
+
+        Rahu is the ``node`` series ("True Node" or "Mean Node"), Ketu the
+        point opposite.
+        """
+        name = node if body in ("Rahu", "Ketu") else body
+        longitude, speed = self.evaluate(name, julian_days, speed=True)
+        if body == "Ketu":
+            longitude = longitude + 180
+        if zodiac == "Sidereal":
+            shift, shift_speed = self.evaluate(f"ayanamsa:{ayanamsa}", julian_days, speed=True)
+            longitude = longitude - shift
+            speed = speed - shift_speed
+        return longitude % 360, speed
+
+    def error_bounds(self):
+        """Max error of each built series in arcseconds, measured on every segment"""
+        return {name: info['max_error_arcsec'] for name, info in self.load_meta()['series'].items()}
@@ -0,0 +1,178 @@
+"""Exact ingress times of bodies into signs, nakshatras, padas and KP subs.
+
+Positions are sampled on a coarse grid (AstroCalc.body_positions, so an
+ephemeris cache speeds this up) and the grid is split at every station,
+where a body's speed changes sign. Between two neighbouring points the
+motion is then one way, so the boundaries crossed follow from the two end
+longitudes alone, and each crossing is refined inside its bracket with
+Newton steps on longitude minus boundary (the speed is the derivative),
+falling back to bisection whenever a step leaves the bracket.
+"""
+import os
+import sys
+from datetime import datetime
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.astro_calc import AstroCalc
+from utils.kp import SUB_BOUNDARIES, kp_sub
+
+EVENT_KINDS = ("sign", "nakshatra", "pada", "sub")
+
+def wrap_degrees(angle):
+    """Angle folded into [-180, 180)"""
+    return (np.asarray(angle) + 180) % 360 - 180
+
+class EventFinder:
+    """Finds ingress events for one zodiac / ayanamsa / node setting.
+
+    An event is a dict: julian_day, time (aware UTC datetime), body, kind
+    ("sign", "nakshatra", "pada" or "sub"), from and to (sign name,
+    nakshatra name, "<nakshatra> <pada>" or sub lord), longitude (the
+    boundary crossed) and retrograde (True when crossed moving backwards).
+    """
+
+    BODIES = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn",
+              "Uranus", "Neptune", "Pluto", "Rahu", "Ketu"]
+    # Grid spacing in days: short enough that speed changes sign at most once
+    # between points and the Moon crosses few subs per step
+    STEP_DAYS = {"Moon": 0.25, "Rahu": 0.25, "Ketu": 0.25}
+    DEFAULT_STEP_DAYS = 1.0
+    TOLERANCE_DAYS = 1e-6
+
+    def __init__(self, calc=None, zodiac="Sidereal", ayanamsa="Lahiri", node_type="True Node (Rahu/Ketu)"):
+        self.calc = calc or AstroCalc()
+        self.zodiac = zodiac
+        self.ayanamsa = ayanamsa
+        self.node_type = node_type
+
+        nakshatras = self.calc.nakshatras
+        self.divisions = {
+            "sign": (np.arange(12) * 30.0, self.calc.signs),
+            "nakshatra": (np.arange(27) * 40 / 3, nakshatras),
+            "pada": (np.arange(108) * 10 / 3, [f"{nakshatras[i // 4]} {i % 4 + 1}" for i in range(108)]),
+            "sub": (np.array(SUB_BOUNDARIES), [kp_sub(start)["sub_lord"] for start in SUB_BOUNDARIES])
+        }
+
+    def julian_day(self, when):
+        """Julian Day (UT) for a float Julian Day or an aware / UTC datetime"""
+        return self.calc.julian_day_utc(when) if isinstance(when, datetime) else float(when)
+
+    def positions(self, body, julian_days):
+        return self.calc.body_positions(body, julian_days, self.zodiac, self.ayanamsa, self.node_type)
+
+    def speed_roots(self, body, lo, hi):
+        """Times where the speed changes sign inside each [lo, hi] bracket (bisection)"""
+        lo = np.array(lo, dtype=float)
+        hi = np.array(hi, dtype=float)
+        if lo.size == 0:
+            return lo
+        lo_sign = np.sign(self.positions(body, lo)[1])
+        while np.max(hi - lo) > self.TOLERANCE_DAYS:
+            middle = (lo + hi) / 2
+            same = np.sign(self.positions(body, middle)[1]) == lo_sign
+            lo = np.where(same, middle, lo)
+            hi = np.where(same, hi, middle)
+        return (lo + hi) / 2
+
+    def monotonic_grid(self, body, start_jd, end_jd):
+        """Grid times and longitudes over [start_jd, end_jd], split at stations
+        so the body moves one way between neighbouring points"""
+        step = self.STEP_DAYS.get(body, self.DEFAULT_STEP_DAYS)
+        julian_days = np.append(np.arange(start_jd, end_jd, step), end_jd)
+        longitudes, speeds = self.positions(body, julian_days)
+        turns = np.nonzero(speeds[:-1] * speeds[1:] < 0)[0]
+        if len(turns):
+            stations = self.speed_roots(body, julian_days[turns], julian_days[turns + 1])
+            julian_days = np.insert(julian_days, turns + 1, stations)
+            longitudes = np.insert(longitudes, turns + 1, self.positions(body, stations)[0])
+        return julian_days, longitudes
+
+    def crossings(self, kind, longitudes):
+        """(interval index, division entered, direction) of every boundary crossed
+        between neighbouring grid longitudes"""
+        boundaries = self.divisions[kind][0]
+        count = len(boundaries)
+        # Unwrapped longitudes (each step moves less than 180°) and a division
+        # counter that keeps increasing past 360°
+        unwrapped = longitudes[0] + np.concatenate([[0], np.cumsum(wrap_degrees(np.diff(longitudes)))])
+        counter = count * np.floor(unwrapped / 360) + np.searchsorted(boundaries, unwrapped % 360, side="right") - 1
+        counter = counter.astype(np.int64)
+
+        found = []
+        for interval in np.nonzero(np.diff(counter))[0]:
+            before, after = counter[interval], counter[interval + 1]
+            if after > before:
+                found += [(interval, division % count, 1) for division in range(before + 1, after + 1)]
+            else:
+                found += [(interval, (division - 1) % count, -1) for division in range(before, after, -1)]
+        return found
+
+    def refine(self, body, boundaries, directions, lo, hi):
+        """Times where the longitude reaches each boundary inside [lo, hi]"""
+        boundaries, directions = np.asarray(boundaries), np.asarray(directions)
+        lo, hi = np.array(lo, dtype=float), np.array(hi, dtype=float)
+        times = (lo + hi) / 2
+        active = np.arange(len(times))
+        for _ in range(60):
+            longitudes, speeds = self.positions(body, times[active])
+            offsets = wrap_degrees(longitudes - boundaries[active])
+            before = offsets * directions[active] < 0
+            lo[active] = np.where(before, times[active], lo[active])
+            hi[active] = np.where(before, hi[active], times[active])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                guesses = times[active] - offsets / speeds
+            outside = ~((guesses > lo[active]) & (guesses < hi[active]))
+            guesses = np.where(outside, (lo[active] + hi[active]) / 2, guesses)
+            converged = np.abs(guesses - times[active]) < self.TOLERANCE_DAYS
+            times[active] = guesses
+            # Only the crossings still moving are evaluated again
+            active = active[~converged]
+            if not len(active):
+                break
+        return times
+
+    def body_events(self, body, start_jd, end_jd, kinds=EVENT_KINDS):
+        julian_days, longitudes = self.monotonic_grid(body, start_jd, end_jd)
+        found = [(kind,) + crossing for kind in kinds for crossing in self.crossings(kind, longitudes)]
+        if not found:
+            return []
+        intervals = np.array([interval for _, interval, _, _ in found])
+        # Moving forwards a body enters a division at its start, backwards at its end
+        boundaries = [self.divisions[kind][0][(division + (direction < 0)) % len(self.divisions[kind][0])]
+                      for kind, _, division, direction in found]
+        directions = [direction for _, _, _, direction in found]
+        times = self.refine(body, boundaries, directions, julian_days[intervals], julian_days[intervals + 1])
+
+        events = []
+        for (kind, _, division, direction), boundary, julian_day in zip(found, boundaries, times):
+            labels = self.divisions[kind][1]
+            events.append({
+                "julian_day": float(julian_day),
+                "time": self.calc.datetime_utc(julian_day),
+                "body": body,
+                "kind": kind,
+                "from": labels[(division - direction) % len(labels)],
+                "to": labels[division],
+                "longitude": float(boundary),
+                "retrograde": direction < 0
+            })
+        return events
+
+    def events(self, start, end, bodies=None, kinds=EVENT_KINDS):
+        """All ingress events between start and end (Julian Days or datetimes), sorted by time"""
+        start_jd, end_jd = self.julian_day(start), self.julian_day(end)
+        events = []
+        for body in bodies or self.BODIES:
+            events += self.body_events(body, start_jd, end_jd, kinds)
+        events.sort(key=lambda event: event["julian_day"])
+        return events
+
+    def stream(self, start, end=None, bodies=None, kinds=EVENT_KINDS, window_days=30.0):
+        """Events from start on (without end: indefinitely), found a window at a time"""
+        window_start = self.julian_day(start)
+        end_jd = None if end is None else self.julian_day(end)
+        while end_jd is None or window_start < end_jd:
+            window_end = window_start + window_days if end_jd is None else min(window_start + window_days, end_jd)
+            yield from self.events(window_start, window_end, bodies, kinds)
+            window_start = window_end
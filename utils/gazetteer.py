@@ -0,0 +1,242 @@
+import os
+import sys
+import sqlite3
+import unicodedata
+import zipfile
+import io
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.constants import GAZETTEER_PATH
+
+def normalize_place(text):
+    """Normalize a place name for lookups: no accents, lower case, single spaces."""
+    text = unicodedata.normalize('NFKD', str(text))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.lower().replace('.', ' ').split())
+
+class Gazetteer:
+    """Offline geocoder backed by a GeoNames dump loaded into SQLite.
+
+    Every name, ASCII name and alternate name of a place is indexed by its
+    normalized form together with the country code and population, so a
+    lookup is a single index range scan returning the most populous match.
+    """
+
+    # GeoNames "geoname" table columns we keep (tab separated dump)
+    GEONAMEID, NAME, ASCII_NAME, ALTERNATE_NAMES = 0, 1, 2, 3
+    LATITUDE, LONGITUDE, COUNTRY_CODE, ADMIN1 = 4, 5, 8, 10
+    POPULATION, TIMEZONE = 14, 17
+
+    def __init__(self, db_path=GAZETTEER_PATH):
+        self.db_path = db_path
+        self.conn = None
+        self.available = False
+
+    def connect(self):
+        """Open the gazetteer database, creating the schema if needed"""
+        if self.conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS places (
+                    geonameid INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    latitude REAL NOT NULL,
+                    longitude REAL NOT NULL,
+                    country_code TEXT,
+                    admin1 TEXT,
+                    population INTEGER,
+                    timezone TEXT
+                );
+                CREATE TABLE IF NOT EXISTS place_names (
+                    name_key TEXT NOT NULL,
+                    country_code TEXT,
+                    population INTEGER,
+                    geonameid INTEGER NOT NULL,
+                    PRIMARY KEY (name_key, country_code, population, geonameid)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS countries (
+                    country_key TEXT PRIMARY KEY,
+                    country_code TEXT NOT NULL
+                ) WITHOUT ROWID;
+            """)
+        return self.conn
+
+    def is_available(self):
+        """Check whether a gazetteer has been loaded"""
+        if not self.available:
+            if self.conn is None and not os.path.exists(self.db_path):
+                return False
+            row = self.connect().execute("SELECT 1 FROM places LIMIT 1").fetchone()
+            self.available = row is not None
+        return self.available
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+            self.available = False
+
+    def open_dump(self, path):
+        """Open a GeoNames text dump, either plain or as the distributed zip"""
+        if path.endswith('.zip'):
+            archive = zipfile.ZipFile(path)
+            name = next(n for n in archive.namelist() if n.endswith('.txt'))
+            return io.TextIOWrapper(archive.open(name), encoding='utf-8')
+        return open(path, encoding='utf-8')
+
+    def load_geonames(self, dump_path, country_info_path=None, min_population=0,
+                      batch_size=10000):
+        """Load a GeoNames dump (e.g. cities15000.txt) into the gazetteer.
+
+        country_info_path is GeoNames' countryInfo.txt, which lets queries
+        name the country ("bhubaneswar, india"); ISO codes always work.
+        Returns the number of places loaded.
+        """
+        conn = self.connect()
+        count = 0
+        places = []
+        names = []
+
+        def flush():
+            conn.executemany("INSERT OR REPLACE INTO places VALUES (?, ?, ?, ?, ?, ?, ?, ?)", places)
+            conn.executemany("INSERT OR IGNORE INTO place_names VALUES (?, ?, ?, ?)", names)
+            places.clear()
+            names.clear()
+
+        with conn:
+            with self.open_dump(dump_path) as f:
+                for line in f:
+                    fields = line.rstrip('\n').split('\t')
+                    if len(fields) <= self.TIMEZONE:
+                        continue
+                    population = int(fields[self.POPULATION] or 0)
+                    if population < min_population:
+                        continue
+
+                    geonameid = int(fields[self.GEONAMEID])
+                    country_code = fields[self.COUNTRY_CODE]
+                    places.append((
+                        geonameid,
+                        fields[self.NAME],
+                        float(fields[self.LATITUDE]),
+                        float(fields[self.LONGITUDE]),
+                        country_code,
+                        fields[self.ADMIN1],
+                        population,
+                        fields[self.TIMEZONE]
+                    ))
+
+                    keys = {normalize_place(fields[self.NAME]), normalize_place(fields[self.ASCII_NAME])}
+                    keys.update(normalize_place(n) for n in fields[self.ALTERNATE_NAMES].split(',') if n)
+                    names.extend((key, country_code, population, geonameid) for key in keys if key)
+
+                    count += 1
+                    if len(places) >= batch_size:
+                        flush()
+            flush()
+
+            if country_info_path:
+                self.load_country_info(country_info_path)
+
+        self.available = count > 0 or self.available
+        return count
+
+    def load_country_info(self, path):
+        """Load country names and ISO codes from GeoNames' countryInfo.txt"""
+        rows = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.startswith('#'):
+                    continue
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 5:
+                    continue
+                iso, iso3, name = fields[0], fields[1], fields[4]
+                for key in (iso, iso3, name):
+                    rows.append((normalize_place(key), iso))
+        with self.connect() as conn:
+            conn.executemany("INSERT OR REPLACE INTO countries VALUES (?, ?)", rows)
+
+    def country_code(self, country):
+        """Resolve a country name or ISO code to its two letter code"""
+        key = normalize_place(country)
+        row = self.connect().execute(
+            "SELECT country_code FROM countries WHERE country_key = ?", (key,)).fetchone()
+        if row:
+            return row[0]
+        return key.upper() if len(key) == 2 else None
+
+    def country_codes(self, prefix):
+        """Two letter codes (lower case) of the countries whose code or name
+        starts with prefix, e.g. "ind" -> {"in"}"""
+        key = normalize_place(prefix)
+        if not key or not self.is_available():
+            return set()
+        rows = self.connect().execute(
+            "SELECT DISTINCT country_code FROM countries WHERE country_key >= ? AND country_key < ?",
+            (key, key + '\uffff')).fetchall()
+        return {row[0].lower() for row in rows}
+
+    def lookup(self, query, limit=1):
+        """Resolve "city" or "city, [region,] country" to the most populous match.
+
+        Returns a place dict (or a list of up to ``limit`` dicts when limit > 1),
+        None / [] when nothing matches or no gazetteer is loaded.
+        """
+        if not self.is_available():
+            return [] if limit > 1 else None
+
+        parts = [part.strip() for part in str(query).split(',') if part.strip()]
+        if not parts:
+            return [] if limit > 1 else None
+
+        conn = self.connect()
+        country_code = self.country_code(parts[-1]) if len(parts) > 1 else None
+        if country_code:
+            # A recognized country is a constraint: no match there is no match,
+            # so the caller can fall back to an online geocoder
+            rows = conn.execute("""
+                SELECT geonameid FROM place_names
+                WHERE name_key = ? AND country_code = ?
+                ORDER BY population DESC LIMIT ?
+            """, (normalize_place(parts[0]), country_code, limit)).fetchall()
+        else:
+            # No country given (or not recognized): best match worldwide
+            rows = conn.execute("""
+                SELECT geonameid FROM place_names
+                WHERE name_key = ?
+                ORDER BY population DESC LIMIT ?
+            """, (normalize_place(parts[0]), limit)).fetchall()
+
+        places = [self.get_place(row[0]) for row in rows]
+        if limit > 1:
+            return places
+        return places[0] if places else None
+
+    def get_place(self, geonameid):
+        """Get one place by GeoNames id"""
+        row = self.connect().execute(
+            "SELECT geonameid, name, latitude, longitude, country_code, admin1, population, timezone "
+            "FROM places WHERE geonameid = ?", (geonameid,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "geonameid": row[0],
+            "name": row[1],
+            "latitude": row[2],
+            "longitude": row[3],
+            "country_code": row[4],
+            "admin1": row[5],
+            "population": row[6],
+            "timezone": row[7]
+        }
+
+if __name__ == "__main__":
+    # python -m utils.gazetteer cities15000.txt [countryInfo.txt]
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.gazetteer <geonames dump> [countryInfo.txt]")
+        sys.exit(1)
+    gazetteer = Gazetteer()
+    loaded = gazetteer.load_geonames(sys.argv[1], sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"Loaded {loaded} places into {gazetteer.db_path}")
@@ -0,0 +1,228 @@
+import os
+import sys
+import time
+import sqlite3
+import threading
+import queue
+from concurrent.futures import Future
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.constants import GEOCODE_CACHE_PATH, POSITIONSTACK_API_KEY
+from utils.gazetteer import normalize_place
+
+def geocode_key(query):
+    """Normalized cache key: "Bhubaneswar ,India " and "bhubaneswar, india" match"""
+    return ", ".join(normalize_place(part) for part in str(query).split(',') if part.strip())
+
+def nominatim_provider(query):
+    """Geocode with Nominatim; returns a place dict or None when not found"""
+    from geopy.geocoders import Nominatim
+    geolocator = Nominatim(user_agent="astrology_app")
+    location = geolocator.geocode(query)
+    if not location:
+        return None
+    return {"latitude": location.latitude, "longitude": location.longitude,
+            "name": location.address}
+
+def positionstack_provider(query):
+    """Geocode with PositionStack; returns a place dict or None when not found"""
+    import requests
+    response = requests.get(
+        "http://api.positionstack.com/v1/forward",
+        params={"access_key": POSITIONSTACK_API_KEY, "query": query}
+    )
+    data = response.json()
+    if "data" in data and len(data["data"]) > 0:
+        result = data["data"][0]
+        return {"latitude": result["latitude"], "longitude": result["longitude"],
+                "name": result.get("label", query)}
+    return None
+
+class GeocodeCache:
+    """Persistent SQLite cache of geocoding results, found and not found.
+
+    Not-found answers are cached too (with a shorter TTL) so typos and
+    unknown places don't go back to the network on every attempt.
+    """
+
+    POSITIVE_TTL = 180 * 24 * 3600  # Places don't move
+    NEGATIVE_TTL = 24 * 3600        # Retry unknown places daily
+
+    def __init__(self, db_path=GEOCODE_CACHE_PATH):
+        self.db_path = db_path
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocode_cache (
+                query_key TEXT PRIMARY KEY,
+                found INTEGER NOT NULL,
+                latitude REAL,
+                longitude REAL,
+                name TEXT,
+                provider TEXT,
+                expires_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+
+    def get(self, query):
+        """Look up a query; returns (hit, place) where place is None for cached misses"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT found, latitude, longitude, name FROM geocode_cache "
+                "WHERE query_key = ? AND expires_at > ?",
+                (geocode_key(query), time.time())).fetchone()
+        if row is None:
+            return False, None
+        if not row[0]:
+            return True, None
+        return True, {"latitude": row[1], "longitude": row[2], "name": row[3]}
+
+    def get_many(self, queries):
+        """Look up many queries at once; returns {query: place or None} for hits only"""
+        keys = {geocode_key(query): query for query in queries}
+        hits = {}
+        now = time.time()
+        key_list = list(keys)
+        with self.lock:
+            for start in range(0, len(key_list), 500):
+                chunk = key_list[start:start + 500]
+                rows = self.conn.execute(
+                    "SELECT query_key, found, latitude, longitude, name FROM geocode_cache "
+                    f"WHERE expires_at > ? AND query_key IN ({','.join('?' * len(chunk))})",
+                    [now] + chunk).fetchall()
+                for key, found, lat, lon, name in rows:
+                    hits[keys[key]] = {"latitude": lat, "longitude": lon, "name": name} if found else None
+        return hits
+
+    def put(self, query, place, provider=""):
+        """Store a result; place None records a negative (not found) result"""
+        ttl = self.POSITIVE_TTL if place else self.NEGATIVE_TTL
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO geocode_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (geocode_key(query), 1 if place else 0,
+                 place["latitude"] if place else None,
+                 place["longitude"] if place else None,
+                 place.get("name") if place else None,
+                 provider, time.time() + ttl))
+
+    def purge_expired(self):
+        """Delete expired entries"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM geocode_cache WHERE expires_at <= ?", (time.time(),))
+
+class CachedGeocoder:
+    """Geocoding chain: offline gazetteer, then the cache, then one online provider.
+
+    All network lookups go through a single worker thread that keeps at least
+    ``min_interval`` seconds between requests (Nominatim allows one per second),
+    however many callers or batch lookups are waiting.
+    """
+
+    def __init__(self, provider=nominatim_provider, cache=None, gazetteer=None,
+                 min_interval=1.0):
+        self.provider = provider
+        self.cache = cache if cache is not None else GeocodeCache()
+        self.gazetteer = gazetteer
+        self.min_interval = min_interval
+        self.requests = queue.Queue()
+        self.worker = None
+        self.worker_lock = threading.Lock()
+        self.last_request = 0.0
+
+    def resolve(self, city):
+        """Resolve one city to a place dict, or None if it can't be found.
+
+        Provider errors (timeouts, no network) are raised and not cached.
+        """
+        return self.resolve_many([city], raise_errors=True)[city]
+
+    def resolve_many(self, cities, progress=None, raise_errors=False):
+        """Resolve many cities, touching the network once per unknown place.
+
+        Queries are deduplicated by normalized key and served from the
+        gazetteer and the cache first. Returns {city: place or None};
+        progress(done, total) is called as network lookups finish.
+        """
+        results = {}
+        by_key = {}
+        for city in cities:
+            key = geocode_key(city)
+            if key:
+                by_key.setdefault(key, []).append(city)
+            else:
+                results[city] = None
+
+        pending = {}
+        for key, group in by_key.items():
+            place = self.gazetteer.lookup(group[0]) if self.gazetteer else None
+            if place:
+                for city in group:
+                    results[city] = place
+            else:
+                pending[key] = group
+
+        cached = self.cache.get_many(group[0] for group in pending.values())
+        for key in list(pending):
+            group = pending[key]
+            if group[0] in cached:
+                for city in group:
+                    results[city] = cached[group[0]]
+                del pending[key]
+
+        futures = {key: self.submit(group[0]) for key, group in pending.items()}
+        for done, (key, future) in enumerate(futures.items(), 1):
+            try:
+                place = future.result()
+            except Exception:
+                if raise_errors:
+                    raise
+                place = None
+            for city in pending[key]:
+                results[city] = place
+            if progress:
+                progress(done, len(futures))
+
+        return results
+
+    def submit(self, query):
+        """Queue a network lookup on the rate limited worker"""
+        future = Future()
+        with self.worker_lock:
+            self.requests.put((query, future))
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run_worker, daemon=True)
+                self.worker.start()
+        return future
+
+    def run_worker(self):
+        """Serve queued lookups one at a time, spaced by min_interval"""
+        while True:
+            try:
+                query, future = self.requests.get(timeout=5)
+            except queue.Empty:
+                with self.worker_lock:
+                    if self.requests.empty():
+                        self.worker = None
+                        return
+                continue
+
+            # Another caller may have resolved it while this one was queued
+            hit, place = self.cache.get(query)
+            if hit:
+                future.set_result(place)
+                continue
+
+            wait = self.last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                place = self.provider(query)
+                self.cache.put(query, place, getattr(self.provider, '__name__', ''))
+                future.set_result(place)
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.last_request = time.monotonic()
@@ -0,0 +1,183 @@
+SIGN_LORDS = {
+    'Aries': 'Mars',
+    'Taurus': 'Venus',
+    'Gemini': 'Mercury',
+    'Cancer': 'Moon',
+    'Leo': 'Sun',
+    'Virgo': 'Mercury',
+    'Libra': 'Venus',
+    'Scorpio': 'Mars',
+    'Sagittarius': 'Jupiter',
+    'Capricorn': 'Saturn',
+    'Aquarius': 'Saturn',
+    'Pisces': 'Jupiter'
+}
+
+# Planets scored by the Yogeswarananda system (after the Moon and its star lord)
+YOGESWARANANDA_PLANETS = ['Sun', 'Mars', 'Mercury', 'Jupiter', 'Venus', 'Saturn', 'Rahu', 'Ketu']
+
+class HouseStrengthCalculator:
+    """Yogeswarananda house strengths (the twelve KP powers) for one chart.
+
+    Works on the chart dict from AstroCalc.calculate_chart and has no Qt
+    dependency, so the windows and the command line tools share it.
+
+    For Rahu/Ketu the lord of the sign they occupy stands in for them; its
+    own placement earns ``lord_placement_points`` (None: the same points as
+    the power being scored).
+    """
+
+    def __init__(self, chart_data, lord_placement_points=None):
+        self.chart_data = chart_data
+        self.lord_placement_points = lord_placement_points
+
+        # House ownership only depends on the cusp signs, so work it out once
+        self.owned_houses = {}
+        for house_num in range(1, 13):
+            sign = chart_data['houses'][f"House_{house_num}"]['sign']
+            self.owned_houses.setdefault(SIGN_LORDS.get(sign), []).append(house_num)
+
+    def get_house_lord(self, sign):
+        """Get the lord of a sign"""
+        return SIGN_LORDS.get(sign)
+
+    def get_houses_owned_by(self, planet):
+        """Get list of houses owned by a planet"""
+        return self.owned_houses.get(planet, [])
+
+    def add_points(self, house_points, house_num, points, reason=""):
+        """Add points to a house and return the detail line"""
+        house_points[house_num] += points
+        return f"House {house_num}: +{points} points ({reason})\n"
+
+    def handle_rahu_ketu(self, house_points, planet, house_num, points, point_type):
+        """Score Rahu/Ketu through the lord of the sign they occupy"""
+        details = ""
+        if planet in ['Rahu', 'Ketu']:
+            house_sign = self.chart_data['houses'][f"House_{house_num}"]['sign']
+            house_lord = self.get_house_lord(house_sign)
+
+            # Give points to houses owned by the house lord
+            for owned_house in self.get_houses_owned_by(house_lord):
+                details += self.add_points(house_points, owned_house, points,
+                    f"{point_type} points via {planet}'s house lord {house_lord}")
+
+            # Extra points for house lord's placement
+            lord_house = self.chart_data['points'][house_lord]['house']
+            if lord_house:
+                if self.lord_placement_points is None:
+                    details += self.add_points(house_points, lord_house, points,
+                        f"Extra {points} points for {house_lord}'s placement (as {planet}'s house lord)")
+                else:
+                    details += self.add_points(house_points, lord_house, self.lord_placement_points,
+                        f"Extra point for {house_lord}'s placement (as {planet}'s house lord)")
+
+        return details
+
+    def house_strengths(self, x, y, z):
+        """Points per house for main planet X, star lord Y and sub lord Z.
+
+        Returns (house_points, details) where house_points maps 1-12 to
+        points and details lists every point awarded.
+        """
+        house_points = {i: 0 for i in range(1, 13)}
+        points = self.chart_data['points']
+        output = "Point Distribution Details:\n"
+        output += "-------------------------\n"
+
+        # Handle X (Main Planet)
+        if x in ['Rahu', 'Ketu']:
+            output += self.handle_rahu_ketu(house_points, x, points[x]['house'], 1, "Power 1: Main Planet")
+        else:
+            # Power 1: Houses owned by X
+            for house in self.get_houses_owned_by(x):
+                output += self.add_points(house_points, house, 1, f"Power 1: House owned by {x}")
+        # Power 2: House where X is placed
+        output += self.add_points(house_points, points[x]['house'], 2, f"Power 2: House where {x} is placed")
+
+        # Handle Y (Star Lord) - only if different from X
+        if y != x:
+            if y in ['Rahu', 'Ketu']:
+                output += self.handle_rahu_ketu(house_points, y, points[y]['house'], 3, "Power 3: Star Lord")
+            else:
+                # Power 3: Houses owned by Y
+                for house in self.get_houses_owned_by(y):
+                    output += self.add_points(house_points, house, 3, f"Power 3: House owned by {y}")
+            # Power 4: House where Y is placed
+            output += self.add_points(house_points, points[y]['house'], 4, f"Power 4: House where {y} is placed")
+
+        # Handle Z (Sub Lord)
+        if z in ['Rahu', 'Ketu']:
+            output += self.handle_rahu_ketu(house_points, z, points[z]['house'], 5, "Power 5: Sub Lord")
+        else:
+            # Power 5: Houses owned by Z
+            for house in self.get_houses_owned_by(z):
+                output += self.add_points(house_points, house, 5, f"Power 5: House owned by {z}")
+        # Power 6: House where Z is placed
+        output += self.add_points(house_points, points[z]['house'], 6, f"Power 6: House where {z} is placed")
+
+        # Handle cuspal points
+        for house_num in range(1, 13):
+            house_data = self.chart_data['houses'][f"House_{house_num}"]
+
+            # Powers 7 & 10: X as cuspal lord
+            if house_data['star_lord'] == x:
+                output += self.add_points(house_points, house_num, 7, f"Power 7: House where {x} is star lord of cusp")
+            if house_data['sub_lord'] == x:
+                output += self.add_points(house_points, house_num, 10, f"Power 10: House where {x} is sub lord of cusp")
+
+            # Powers 8 & 11: Y as cuspal lord (only if different from X)
+            if y != x:
+                if house_data['star_lord'] == y:
+                    output += self.add_points(house_points, house_num, 8, f"Power 8: House where {y} is star lord of cusp")
+                if house_data['sub_lord'] == y:
+                    output += self.add_points(house_points, house_num, 11, f"Power 11: House where {y} is sub lord of cusp")
+
+            # Powers 9 & 12: Z as cuspal lord
+            if house_data['star_lord'] == z:
+                output += self.add_points(house_points, house_num, 9, f"Power 9: House where {z} is star lord of cusp")
+            if house_data['sub_lord'] == z:
+                output += self.add_points(house_points, house_num, 12, f"Power 12: House where {z} is sub lord of cusp")
+
+        return house_points, output
+
+    def planet_strengths(self, planet, role="X"):
+        """House strengths for a planet with its own star and sub lords"""
+        planet_data = self.chart_data['points'][planet]
+        y = planet_data['star_lord']
+        z = planet_data['sub_lord']
+
+        details = f"Planets Involved:\n"
+        details += f"{role} (X): {planet}\n"
+        details += f"Star Lord (Y): {y}\n"
+        details += f"Sub Lord (Z): {z}\n\n"
+
+        house_points, distribution = self.house_strengths(planet, y, z)
+        details += distribution
+        details += "\nResults:\n"
+        for house, points in house_points.items():
+            details += f"House {house}: {points} points\n"
+
+        return house_points, details
+
+    def yogeswarananda_order(self):
+        """Moon, the Moon's star lord, then the remaining planets"""
+        order = ['Moon', self.chart_data['points']['Moon']['star_lord']]
+        order += [planet for planet in YOGESWARANANDA_PLANETS if planet not in order]
+        return list(dict.fromkeys(order))
+
+    def calculate_all(self):
+        """House strengths for every Yogeswarananda planet, in order.
+
+        Returns {planet: {"star_lord", "sub_lord", "points"}}.
+        """
+        results = {}
+        for planet in self.yogeswarananda_order():
+            planet_data = self.chart_data['points'][planet]
+            house_points, _ = self.house_strengths(planet, planet_data['star_lord'], planet_data['sub_lord'])
+            results[planet] = {
+                "star_lord": planet_data['star_lord'],
+                "sub_lord": planet_data['sub_lord'],
+                "points": house_points
+            }
+        return results
@@ -0,0 +1,95 @@
+"""Krishnamurti Paddhati (KP) sub divisions.
+
+Each nakshatra (13°20') is split into nine subs in Vimshottari order,
+starting from the nakshatra lord, each as long as its lord's dasha years
+out of 120. The 243 subs, cut again where a sign boundary falls inside
+one, give the 249 numbered KP subs used for horary charts.
+
+A planet's KP significations are kept as 12-bit house masks (bit 0 for
+house 1), so "does it signify any of 2, 7, 11" is one AND.
+"""
+import os
+import sys
+import bisect
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.astro_calc import AstroCalc
+from utils.house_strength import SIGN_LORDS
+
+DASHA_LORDS = ["Sun", "Moon", "Mars", "Rahu", "Jupiter", "Saturn", "Mercury", "Ketu", "Venus"]
+# For house placement in occupied_houses (built once, not per chart)
+CALC = AstroCalc()
+
+def build_sub_table():
+    """The 249 KP subs as dicts: number (1-249), start, end, sign, nakshatra,
+    star_lord and sub_lord"""
+    calc = AstroCalc()
+    ends = list(calc.sub_starts[1:]) + [360.0]
+    table = []
+    for index, (start, end) in enumerate(zip(calc.sub_starts, ends)):
+        star_lord = calc.nakshatra_lords[index // 9]
+        # A sign boundary inside the sub splits it in two numbered parts
+        cuts = [float(start)] + [30.0 * k for k in range(1, 12) if start < 30 * k < end] + [float(end)]
+        for part_start, part_end in zip(cuts, cuts[1:]):
+            table.append({
+                "number": len(table) + 1,
+                "start": part_start,
+                "end": part_end,
+                "sign": calc.signs[int(part_start // 30)],
+                "nakshatra": calc.nakshatras[index // 9],
+                "star_lord": star_lord,
+                "sub_lord": calc.sub_lords[star_lord][index % 9]
+            })
+    return table
+
+KP_SUBS = build_sub_table()
+SUB_STARTS = [sub["start"] for sub in KP_SUBS]
+# Longitudes where the sub lord changes (sign cuts inside a sub are left out)
+SUB_BOUNDARIES = [sub["start"] for previous, sub in zip(KP_SUBS[-1:] + KP_SUBS, KP_SUBS)
+                  if previous["sub_lord"] != sub["sub_lord"]]
+
+def kp_sub(longitude):
+    """The KP sub (see build_sub_table) containing a longitude"""
+    return KP_SUBS[bisect.bisect_right(SUB_STARTS, longitude % 360) - 1]
+
+def horary_sub(number):
+    """The KP sub of a horary number (1-249): the ascendant of the horary
+    chart is placed at its start"""
+    if not 1 <= int(number) <= len(KP_SUBS):
+        raise ValueError(f"Horary number must be between 1 and {len(KP_SUBS)}, got {number}")
+    return KP_SUBS[int(number) - 1]
+
+def house_bits(houses):
+    """12-bit mask of house numbers (1-12)"""
+    return sum(1 << (int(house) - 1) for house in set(houses))
+
+def occupied_houses(chart, planets=DASHA_LORDS):
+    """planet -> house it occupies, read off the chart's own cusps"""
+    cusps = [chart["houses"][f"House_{number}"]["longitude"] for number in range(1, 13)]
+    longitudes = [chart["points"][planet]["longitude"] for planet in planets]
+    return dict(zip(planets, (int(house) for house in CALC.determine_houses(longitudes, cusps)[0])))
+
+def significators(chart):
+    """Houses each dasha lord signifies in a chart, as house_bits masks.
+
+    A planet signifies the houses its star lord occupies and owns and the
+    houses it occupies and owns itself (ownership by cusp sign lord). Rahu
+    and Ketu also signify for the lord of the sign they are in. Occupation
+    comes from the cusps, not the stored house field, so the masks are in
+    the frame of the cusps that give the ownership.
+    """
+    owned = {lord: 0 for lord in DASHA_LORDS}
+    for number in range(1, 13):
+        owned[SIGN_LORDS[chart["houses"][f"House_{number}"]["sign"]]] |= 1 << (number - 1)
+    points = chart["points"]
+    occupied = occupied_houses(chart)
+
+    def own_bits(planet):
+        return owned[planet] | (1 << (occupied[planet] - 1))
+
+    bits = {}
+    for planet in DASHA_LORDS:
+        bits[planet] = own_bits(planet) | own_bits(points[planet]["star_lord"])
+        if planet in ("Rahu", "Ketu"):
+            bits[planet] |= own_bits(SIGN_LORDS[points[planet]["sign"]])
+    return bits
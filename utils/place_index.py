@@ -0,0 +1,233 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.constants import PLACE_INDEX_PATH, GAZETTEER_PATH, GEOCODE_CACHE_PATH
+from utils.gazetteer import Gazetteer, normalize_place
+
+class PlaceIndex:
+    """Sorted-array prefix index of place names for type-ahead suggestions.
+
+    Normalized names from the gazetteer and the geocode cache are stored as
+    a sorted fixed-width byte array next to their rank and place id, saved
+    as .npy files and memory-mapped on first use. A prefix query is two
+    binary searches (np.searchsorted) plus a top-k on the matching slice.
+    """
+
+    KEY_WIDTH = 48            # Bytes kept per name; more than enough for prefixes
+    CACHED_RANK = 2 ** 62     # Places the user already looked up come first
+    STALE_CHECK_SECONDS = 5   # How often queries look for changed sources
+
+    def __init__(self, index_path=PLACE_INDEX_PATH, gazetteer_path=GAZETTEER_PATH,
+                 cache_path=GEOCODE_CACHE_PATH):
+        self.index_path = index_path
+        self.gazetteer_path = gazetteer_path
+        self.cache_path = cache_path
+        self.gazetteer = None
+        self.keys = None
+        self.ranks = None
+        self.ids = None
+        self.labels = []   # Display names for geocode cache entries (ids < 0)
+        self.checked_at = None
+
+    def file(self, name):
+        return os.path.join(self.index_path, name)
+
+    def cache_state(self):
+        """[positive entries, latest expiry] of the geocode cache.
+
+        Changes when a found place is added or replaced, but not on
+        negative results or reads, unlike the cache file's mtime (its -wal
+        file is touched by every put).
+        """
+        if not os.path.exists(self.cache_path):
+            return [0, 0]
+        conn = sqlite3.connect(self.cache_path)
+        try:
+            count, latest = conn.execute(
+                "SELECT count(*), max(expires_at) FROM geocode_cache WHERE found = 1").fetchone()
+            return [count, latest or 0]
+        except sqlite3.OperationalError:
+            return [0, 0]
+        finally:
+            conn.close()
+
+    def is_stale(self):
+        """Check whether the saved index is missing, older than the gazetteer
+        or built from a different geocode cache state"""
+        meta_path = self.file('meta.json')
+        if not os.path.exists(meta_path):
+            return True
+        built = os.path.getmtime(meta_path)
+        if os.path.exists(self.gazetteer_path) and os.path.getmtime(self.gazetteer_path) > built:
+            return True
+        try:
+            with open(meta_path) as f:
+                built_from = json.load(f).get("cache")
+        except ValueError:
+            return True
+        return built_from != self.cache_state()
+
+    def build(self):
+        """Rebuild the index files from the gazetteer and the geocode cache"""
+        keys, ranks, ids, labels = [], [], [], []
+        cache_state = self.cache_state()
+
+        if os.path.exists(self.gazetteer_path):
+            conn = sqlite3.connect(self.gazetteer_path)
+            try:
+                rows = conn.execute("SELECT name_key, population, geonameid FROM place_names")
+                for name_key, population, geonameid in rows:
+                    keys.append(name_key.encode('utf-8')[:self.KEY_WIDTH])
+                    ranks.append(population or 0)
+                    ids.append(geonameid)
+            except sqlite3.OperationalError:
+                pass  # Gazetteer file exists but nothing was loaded yet
+            finally:
+                conn.close()
+
+        if os.path.exists(self.cache_path):
+            conn = sqlite3.connect(self.cache_path)
+            try:
+                rows = conn.execute(
+                    "SELECT query_key FROM geocode_cache WHERE found = 1 AND expires_at > ?",
+                    (time.time(),))
+                for (query_key,) in rows:
+                    keys.append(query_key.encode('utf-8')[:self.KEY_WIDTH])
+                    ranks.append(self.CACHED_RANK)
+                    ids.append(-1 - len(labels))
+                    labels.append(query_key.title())
+            except sqlite3.OperationalError:
+                pass
+            finally:
+                conn.close()
+
+        keys = np.array(keys, dtype=f'S{self.KEY_WIDTH}')
+        order = np.argsort(keys, kind='stable')
+
+        os.makedirs(self.index_path, exist_ok=True)
+        # Write everything under temporary names first so a reader never
+        # sees a half written index
+        arrays = {
+            'keys.npy': keys[order],
+            'ranks.npy': np.array(ranks, dtype=np.int64)[order],
+            'ids.npy': np.array(ids, dtype=np.int64)[order],
+        }
+        for name, array in arrays.items():
+            with open(self.file(name + '.tmp'), 'wb') as f:
+                np.save(f, array)
+        with open(self.file('labels.json.tmp'), 'w', encoding='utf-8') as f:
+            json.dump(labels, f)
+        for name in list(arrays) + ['labels.json']:
+            os.replace(self.file(name + '.tmp'), self.file(name))
+        with open(self.file('meta.json'), 'w') as f:
+            json.dump({"entries": int(len(keys)), "built": time.time(), "cache": cache_state}, f)
+
+        self.keys = None  # Remap on next query
+        return len(keys)
+
+    def load(self):
+        """Memory-map the index, rebuilding it first if it is stale.
+
+        Runs on every keystroke, so the sources are only checked every
+        STALE_CHECK_SECONDS; a place geocoded in between shows up after that.
+        """
+        now = time.monotonic()
+        if self.keys is not None and now - self.checked_at < self.STALE_CHECK_SECONDS:
+            return self
+        self.checked_at = now
+        stale = self.is_stale()
+        if stale:
+            self.build()
+        if self.keys is None:
+            self.keys = np.load(self.file('keys.npy'), mmap_mode='r')
+            self.ranks = np.load(self.file('ranks.npy'), mmap_mode='r')
+            self.ids = np.load(self.file('ids.npy'), mmap_mode='r')
+            with open(self.file('labels.json'), encoding='utf-8') as f:
+                self.labels = json.load(f)
+        return self
+
+    def get_gazetteer(self):
+        if self.gazetteer is None:
+            self.gazetteer = Gazetteer(self.gazetteer_path)
+        return self.gazetteer
+
+    def label(self, place_id):
+        """Display text for an index entry, e.g. "Bhubaneswar, IN" """
+        if place_id < 0:
+            return self.labels[-1 - place_id]
+        place = self.get_gazetteer().get_place(int(place_id))
+        if place is None:
+            return None
+        return f"{place['name']}, {place['country_code']}" if place['country_code'] else place['name']
+
+    def suggest(self, text, limit=8, cancelled=None):
+        """Return up to ``limit`` display names starting with text, best ranked first.
+
+        With "city, country" text the city part is searched and the
+        suggestions are filtered on the full text; the country part also
+        matches gazetteer places by country name ("puri, ind" finds
+        "Puri, IN"). ``cancelled`` is an
+        optional callable checked between steps so a newer keystroke can
+        abandon this query early.
+        """
+        parts = [normalize_place(part) for part in str(text).split(',')]
+        prefix = parts[0].encode('utf-8')[:self.KEY_WIDTH]
+        if not prefix:
+            return []
+
+        self.load()
+        lo = int(np.searchsorted(self.keys, prefix, side='left'))
+        hi = int(np.searchsorted(self.keys, prefix + b'\xff', side='left'))
+        if lo >= hi or (cancelled and cancelled()):
+            return []
+
+        # Best ranked matches first; over-fetch because several alternate
+        # names of the same place can match one prefix
+        ranks = np.asarray(self.ranks[lo:hi])
+        fetch = min(len(ranks), limit * 4)
+        top = np.argpartition(-ranks, fetch - 1)[:fetch] if fetch < len(ranks) else np.arange(len(ranks))
+        top = top[np.argsort(-ranks[top], kind='stable')]
+
+        full_text = ", ".join(part for part in parts if part)
+        countries = self.get_gazetteer().country_codes(parts[-1]) if len(parts) > 1 else set()
+        suggestions = []
+        seen = set()
+        for i in top:
+            if cancelled and cancelled():
+                return []
+            place_id = int(self.ids[lo + i])
+            if place_id in seen:
+                continue
+            seen.add(place_id)
+            label = self.label(place_id)
+            if not label or label in suggestions:
+                continue
+            if len(parts) > 1 and not self.label_matches(label, place_id, parts, full_text, countries):
+                continue
+            suggestions.append(label)
+            if len(suggestions) >= limit:
+                break
+        return suggestions
+
+    def label_matches(self, label, place_id, parts, full_text, countries):
+        """Whether a label fits typed "city, ..., country" parts"""
+        label_parts = [normalize_place(part) for part in label.split(',')]
+        if ", ".join(label_parts).startswith(full_text):
+            return True
+        # Gazetteer labels end in the country code; the typed country may be its name
+        return place_id >= 0 and len(label_parts) > 1 and label_parts[0].startswith(parts[0]) \
+            and label_parts[-1] in countries
+
+if __name__ == "__main__":
+    # python -m utils.place_index [prefix]
+    index = PlaceIndex()
+    start = time.perf_counter()
+    entries = index.build()
+    print(f"Indexed {entries} names in {time.perf_counter() - start:.2f}s")
+    if len(sys.argv) > 1:
+        print("\n".join(index.suggest(" ".join(sys.argv[1:]))))
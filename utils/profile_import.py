@@ -0,0 +1,229 @@
+import os
+import re
+import sys
+import csv
+import json
+import queue
+import threading
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.profile_store import ProfileStore, birth_iso
+
+# One pass over a whole batch of coordinate strings (joined by newlines).
+# Every line matches: DMS groups 1-4 (DD° MM' SS" N), a plain decimal in
+# group 5, or nothing for anything else.
+COORDINATE_PATTERN = re.compile(r"""
+    ^[ \t]*(?:
+        (\d+(?:\.\d*)?)[ \t]*[°º:d \t][ \t]*
+        (\d+(?:\.\d*)?)[ \t]*['′m: \t][ \t]*
+        (\d+(?:\.\d*)?)[ \t]*(?:"|″|''|s)?[ \t]*
+        ([NSEWnsew])
+      | ([+-]?\d+(?:\.\d*)?)
+      | [^\n]*?
+    )[ \t]*$
+""", re.VERBOSE | re.MULTILINE)
+
+# Accepted column names for each profile field (compared lower case)
+FIELD_ALIASES = {
+    "name": ("name", "client", "full name"),
+    "datetime": ("datetime", "date & time", "date time", "birth datetime"),
+    "city": ("city", "place", "birth place", "location"),
+    "latitude": ("latitude", "lat"),
+    "longitude": ("longitude", "lon", "long", "lng"),
+}
+
+def parse_coordinates(values, is_latitude=True):
+    """Convert a batch of DMS or decimal strings to decimal degrees.
+
+    Returns a float array with NaN where a value is malformed, has minutes
+    or seconds out of range, the wrong hemisphere letter for its axis, or
+    lies outside +-90 (latitude) / +-180 (longitude).
+    """
+    text = "\n".join(str(value).replace("\n", " ").replace("\r", " ") if value is not None else ""
+                     for value in values)
+    groups = np.array(COORDINATE_PATTERN.findall(text), dtype=str).reshape(-1, 5)
+    if len(groups) != len(values):
+        raise ValueError("Coordinate batch could not be aligned")
+
+    def column(i):
+        col = groups[:, i]
+        return np.where(col == "", "nan", col).astype(float)
+
+    degrees, minutes, seconds, decimal = column(0), column(1), column(2), column(4)
+    direction = np.char.upper(groups[:, 3])
+
+    result = degrees + minutes / 60 + seconds / 3600
+    result[(minutes >= 60) | (seconds >= 60)] = np.nan
+    negative, positive = ("S", "N") if is_latitude else ("W", "E")
+    result[np.isin(direction, [negative])] *= -1
+    result[(direction != "") & ~np.isin(direction, [negative, positive])] = np.nan
+
+    result = np.where(np.isnan(decimal), result, decimal)
+    limit = 90 if is_latitude else 180
+    result[np.abs(result) > limit] = np.nan
+    return result
+
+def format_dms(decimal, is_latitude=True):
+    """Same format as InputPage.decimal_to_dms, e.g. 20° 15' 37" N"""
+    direction = ("N" if decimal >= 0 else "S") if is_latitude else ("E" if decimal >= 0 else "W")
+    decimal = abs(decimal)
+    degrees = int(decimal)
+    minutes = int((decimal - degrees) * 60)
+    seconds = int(((decimal - degrees) * 60 - minutes) * 60)
+    return f"{degrees}° {minutes}' {seconds}\" {direction}"
+
+class ProfileImporter:
+    """Streaming CSV / JSONL importer into the profile store.
+
+    The file is read in batches of ``batch_size`` records, so memory stays
+    bounded by the batch however large the file is. While one thread parses
+    and validates the next batch, another writes the previous one in a
+    single transaction.
+    """
+
+    MAX_ERRORS = 1000  # Invalid records kept for the report; all are counted
+
+    def __init__(self, store=None, batch_size=5000, on_duplicate="replace"):
+        if on_duplicate not in ("replace", "skip"):
+            raise ValueError("on_duplicate must be 'replace' or 'skip'")
+        self.store = store if store is not None else ProfileStore()
+        self.batch_size = batch_size
+        self.on_duplicate = on_duplicate
+
+    def read_lines(self, f, stats):
+        """Decode a binary file line by line, counting bytes for progress"""
+        for raw in f:
+            stats["bytes_read"] += len(raw)
+            yield raw.decode("utf-8-sig" if stats["bytes_read"] == len(raw) else "utf-8")
+
+    def read_records(self, path, stats):
+        """Yield (line_number, record dict) from a CSV or JSONL file"""
+        with open(path, "rb") as f:
+            lines = self.read_lines(f, stats)
+            if path.lower().endswith((".jsonl", ".json", ".ndjson")):
+                for line_no, line in enumerate(lines, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_no, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_no, {"_error": f"Invalid JSON: {e}"}
+            else:
+                reader = csv.DictReader(lines)
+                columns = {}
+                for header in reader.fieldnames or []:
+                    for field, aliases in FIELD_ALIASES.items():
+                        if header.strip().lower() in aliases and field not in columns:
+                            columns[field] = header
+                for record in reader:
+                    yield reader.line_num, {field: record.get(header) for field, header in columns.items()}
+
+    def read_batches(self, path, stats):
+        batch = []
+        for item in self.read_records(path, stats):
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def validate(self, batch, stats, errors):
+        """Turn a batch of raw records into profile dicts; last duplicate name wins"""
+        latitudes = parse_coordinates([record.get("latitude") for _, record in batch], True)
+        longitudes = parse_coordinates([record.get("longitude") for _, record in batch], False)
+
+        profiles = {}
+        for (line_no, record), lat, lon in zip(batch, latitudes, longitudes):
+            name = str(record.get("name") or "").strip()
+            if "_error" in record:
+                reason = record["_error"]
+            elif not name:
+                reason = "Missing name"
+            elif np.isnan(lat) or np.isnan(lon):
+                reason = "Invalid latitude or longitude"
+            elif not birth_iso(record.get("datetime") or ""):
+                reason = "Invalid date & time (expected dd/mm/yyyy hh:mm[:ss])"
+            else:
+                profiles.pop(name, None)  # Keep file order for the winner
+                profiles[name] = {
+                    "name": name,
+                    "datetime": str(record["datetime"]).strip(),
+                    "city": str(record.get("city") or "").strip(),
+                    "latitude": format_dms(lat, True),
+                    "longitude": format_dms(lon, False),
+                    "latitude_decimal": float(lat),
+                    "longitude_decimal": float(lon)
+                }
+                continue
+            stats["invalid"] += 1
+            if len(errors) < self.MAX_ERRORS:
+                errors.append((line_no, reason))
+        return list(profiles.values())
+
+    def write(self, profiles, stats):
+        """Write one validated batch in a single transaction"""
+        if self.on_duplicate == "skip":
+            existing = self.store.existing_names([p["name"] for p in profiles])
+            stats["skipped"] += len(existing)
+            profiles = [p for p in profiles if p["name"] not in existing]
+        self.store.save_many(profiles)
+        stats["imported"] += len(profiles)
+
+    def import_file(self, path, progress=None):
+        """Import a .csv or .jsonl file; returns a stats dict with an errors list.
+
+        progress(stats) is called from the calling thread after every batch;
+        returning False from it stops the import after the batches already read.
+        """
+        stats = {"read": 0, "imported": 0, "skipped": 0, "invalid": 0,
+                 "bytes_read": 0, "total_bytes": os.path.getsize(path)}
+        errors = []
+        writes = queue.Queue(maxsize=2)  # Bounds how far parsing runs ahead
+        failure = []
+
+        def writer():
+            while True:
+                profiles = writes.get()
+                if profiles is None:
+                    return
+                try:
+                    if not failure:
+                        self.write(profiles, stats)
+                except Exception as e:
+                    failure.append(e)
+
+        thread = threading.Thread(target=writer, daemon=True)
+        thread.start()
+        try:
+            for batch in self.read_batches(path, stats):
+                stats["read"] += len(batch)
+                writes.put(self.validate(batch, stats, errors))
+                if failure or (progress and progress(dict(stats)) is False):
+                    break
+        finally:
+            writes.put(None)
+            thread.join()
+        if failure:
+            raise failure[0]
+        if progress:
+            progress(dict(stats))
+
+        stats["errors"] = errors
+        return stats
+
+if __name__ == "__main__":
+    # python -m utils.profile_import clients.csv [--skip-existing]
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.profile_import <file.csv|file.jsonl> [--skip-existing]")
+        sys.exit(1)
+    importer = ProfileImporter(on_duplicate="skip" if "--skip-existing" in sys.argv else "replace")
+    result = importer.import_file(
+        sys.argv[1],
+        progress=lambda s: print(f"\r{s['bytes_read'] * 100 // max(s['total_bytes'], 1)}% "
+                                 f"{s['imported']} imported", end="", flush=True))
+    print(f"\nRead {result['read']}, imported {result['imported']}, "
+          f"skipped {result['skipped']} existing, {result['invalid']} invalid")
+    for line_no, reason in result["errors"][:20]:
+        print(f"  line {line_no}: {reason}")
@@ -0,0 +1,317 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data.constants import PROFILE_DB_PATH, PROFILE_PATH
+
+# Date formats used by profiles.json ("dd/MM/yyyy hh:mm:ss" from the input page)
+PROFILE_DATETIME_FORMATS = ("%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M")
+
+def birth_iso(datetime_str):
+    """Convert a profile's "dd/mm/yyyy hh:mm[:ss]" to a sortable ISO string"""
+    for fmt in PROFILE_DATETIME_FORMATS:
+        try:
+            return datetime.strptime(str(datetime_str).strip(), fmt).isoformat()
+        except ValueError:
+            continue
+    return None
+
+def coordinate_decimal(value):
+    """Decimal degrees if the stored coordinate is already numeric, else None"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class ProfileStore:
+    """Birth profiles in an indexed SQLite database (WAL mode).
+
+    Profiles are unique by name; saving an existing name updates it in
+    place. Every query is a parameterized statement against an index, so
+    saving and opening a profile stay fast however many profiles there are.
+    """
+
+    SCHEMA_VERSION = 3
+    COLUMNS = ("name", "datetime", "city", "latitude", "longitude",
+               "latitude_decimal", "longitude_decimal")
+    PAGE_SIZE = 200
+    # Sort names for search_page() and the indexed column behind each
+    SORT_COLUMNS = {"id": "id", "name": "name_key", "city": "city_key", "birth": "birth_iso"}
+
+    UPSERT_SQL = """
+        INSERT INTO profiles (name, name_key, datetime, birth_iso, city, city_key, latitude, longitude,
+                              latitude_decimal, longitude_decimal, extra, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            name_key = excluded.name_key,
+            datetime = excluded.datetime,
+            birth_iso = excluded.birth_iso,
+            city = excluded.city,
+            city_key = excluded.city_key,
+            latitude = excluded.latitude,
+            longitude = excluded.longitude,
+            latitude_decimal = excluded.latitude_decimal,
+            longitude_decimal = excluded.longitude_decimal,
+            extra = excluded.extra,
+            updated_at = excluded.updated_at
+    """
+    SELECT_SQL = """
+        SELECT name, datetime, city, latitude, longitude,
+               latitude_decimal, longitude_decimal, extra
+        FROM profiles
+    """
+
+    def __init__(self, db_path=PROFILE_DB_PATH, json_path=PROFILE_PATH):
+        self.db_path = db_path
+        self.json_path = json_path
+        self.lock = threading.RLock()
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_schema()
+        self.fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'profiles_fts'").fetchone() is not None
+
+    def create_schema(self):
+        """Create or upgrade the schema; imports profiles.json on first run"""
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version >= self.SCHEMA_VERSION:
+            return
+        # Every step is safe to repeat: a failed profiles.json import leaves
+        # the version at 0, so the next start runs them again
+        with self.lock, self.conn:
+            if version < 1:
+                self.conn.executescript("""
+                    CREATE TABLE IF NOT EXISTS profiles (
+                        id INTEGER PRIMARY KEY,
+                        name TEXT NOT NULL UNIQUE,
+                        name_key TEXT NOT NULL,
+                        datetime TEXT,
+                        birth_iso TEXT,
+                        city TEXT,
+                        latitude TEXT,
+                        longitude TEXT,
+                        latitude_decimal REAL,
+                        longitude_decimal REAL,
+                        extra TEXT,
+                        updated_at REAL
+                    );
+                    CREATE INDEX IF NOT EXISTS profiles_birth ON profiles (birth_iso);
+                """)
+            if version < 2:
+                # Version 2: indexed prefix search on name and city, substring
+                # search through a trigram full text index
+                if not self.has_column("city_key"):
+                    self.conn.execute("ALTER TABLE profiles ADD COLUMN city_key TEXT NOT NULL DEFAULT ''")
+                self.conn.executescript("""
+                    UPDATE profiles SET city_key = lower(coalesce(city, '')),
+                                        birth_iso = coalesce(birth_iso, '');
+                    CREATE INDEX IF NOT EXISTS profiles_name_key ON profiles (name_key);
+                    CREATE INDEX IF NOT EXISTS profiles_city_key ON profiles (city_key);
+                """)
+                try:
+                    self.conn.executescript("""
+                        CREATE VIRTUAL TABLE IF NOT EXISTS profiles_fts USING fts5(
+                            name, city, content='profiles', content_rowid='id', tokenize='trigram');
+                        CREATE TRIGGER IF NOT EXISTS profiles_fts_insert AFTER INSERT ON profiles BEGIN
+                            INSERT INTO profiles_fts (rowid, name, city) VALUES (new.id, new.name, new.city);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS profiles_fts_delete AFTER DELETE ON profiles BEGIN
+                            INSERT INTO profiles_fts (profiles_fts, rowid, name, city)
+                            VALUES ('delete', old.id, old.name, old.city);
+                        END;
+                        CREATE TRIGGER IF NOT EXISTS profiles_fts_update AFTER UPDATE OF name, city ON profiles BEGIN
+                            INSERT INTO profiles_fts (profiles_fts, rowid, name, city)
+                            VALUES ('delete', old.id, old.name, old.city);
+                            INSERT INTO profiles_fts (rowid, name, city) VALUES (new.id, new.name, new.city);
+                        END;
+                        INSERT INTO profiles_fts (profiles_fts) VALUES ('rebuild');
+                    """)
+                except sqlite3.OperationalError as e:
+                    # SQLite without FTS5 trigrams: substring search falls back to LIKE
+                    print(f"Full text profile search unavailable: {e}")
+            if version < 3:
+                # Version 3: binary chart snapshot and the settings hash it was made with
+                for column, definition in (("chart_snapshot", "BLOB"), ("chart_hash", "TEXT")):
+                    if not self.has_column(column):
+                        self.conn.execute(f"ALTER TABLE profiles ADD COLUMN {column} {definition}")
+        if version == 0 and self.json_path and os.path.exists(self.json_path):
+            migrated = self.migrate_from_json(self.json_path)
+            print(f"Migrated {migrated} profiles from {self.json_path} to {self.db_path}")
+        # Only once profiles.json is in, so a failed import is retried
+        self.conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+
+    def has_column(self, column):
+        return any(row[1] == column for row in self.conn.execute("PRAGMA table_info(profiles)"))
+
+    def row_values(self, profile):
+        """Statement parameters for one profile dict"""
+        name = str(profile["name"]).strip()
+        if not name:
+            raise ValueError("Profile name is required")
+        extra = {k: v for k, v in profile.items() if k not in self.COLUMNS}
+        latitude = profile.get("latitude")
+        longitude = profile.get("longitude")
+        latitude_decimal = profile.get("latitude_decimal")
+        longitude_decimal = profile.get("longitude_decimal")
+        return (
+            name,
+            name.lower(),
+            profile.get("datetime"),
+            birth_iso(profile.get("datetime", "")) or "",
+            profile.get("city"),
+            str(profile.get("city") or "").lower(),
+            None if latitude is None else str(latitude),
+            None if longitude is None else str(longitude),
+            latitude_decimal if latitude_decimal is not None else coordinate_decimal(latitude),
+            longitude_decimal if longitude_decimal is not None else coordinate_decimal(longitude),
+            json.dumps(extra) if extra else None,
+            time.time()
+        )
+
+    def profile_from_row(self, row):
+        """Turn a SELECT_SQL row back into the profile dict the UI uses"""
+        profile = dict(zip(self.COLUMNS, row[:7]))
+        if profile["latitude_decimal"] is None:
+            del profile["latitude_decimal"]
+        if profile["longitude_decimal"] is None:
+            del profile["longitude_decimal"]
+        if row[7]:
+            profile.update(json.loads(row[7]))
+        return profile
+
+    def save(self, profile):
+        """Insert a profile or update the one with the same name"""
+        with self.lock, self.conn:
+            self.conn.execute(self.UPSERT_SQL, self.row_values(profile))
+
+    def save_many(self, profiles):
+        """Upsert many profiles in one transaction; later duplicates win"""
+        with self.lock, self.conn:
+            self.conn.executemany(self.UPSERT_SQL, (self.row_values(p) for p in profiles))
+
+    def exists(self, name):
+        """Whether save() would overwrite a profile (names are stored stripped)"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT 1 FROM profiles WHERE name = ?", (str(name).strip(),)).fetchone() is not None
+
+    def existing_names(self, names):
+        """The subset of names that already have a profile"""
+        names = list(names)
+        found = set()
+        with self.lock:
+            for start in range(0, len(names), 500):
+                chunk = names[start:start + 500]
+                rows = self.conn.execute(
+                    f"SELECT name FROM profiles WHERE name IN ({','.join('?' * len(chunk))})", chunk)
+                found.update(row[0] for row in rows)
+        return found
+
+    def get(self, name):
+        """Get one profile by name, or None"""
+        with self.lock:
+            row = self.conn.execute(self.SELECT_SQL + " WHERE name = ?", (name,)).fetchone()
+        return self.profile_from_row(row) if row else None
+
+    def delete(self, name):
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM profiles WHERE name = ?", (name,)).rowcount > 0
+
+    def count(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0]
+
+    def all_profiles(self):
+        """All profiles in insertion order"""
+        with self.lock:
+            rows = self.conn.execute(self.SELECT_SQL + " ORDER BY id").fetchall()
+        return [self.profile_from_row(row) for row in rows]
+
+    def get_snapshot(self, name):
+        """Stored chart snapshot and its settings hash, (None, None) if missing"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT chart_snapshot, chart_hash FROM profiles WHERE name = ?", (name,)).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def save_snapshot(self, name, snapshot, chart_hash):
+        """Attach a chart snapshot to an existing profile"""
+        with self.lock, self.conn:
+            return self.conn.execute(
+                "UPDATE profiles SET chart_snapshot = ?, chart_hash = ? WHERE name = ?",
+                (snapshot, chart_hash, name)).rowcount > 0
+
+    def has_profiles(self):
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM profiles LIMIT 1").fetchone() is not None
+
+    def search_page(self, search="", sort="id", descending=False, after=None, limit=None):
+        """One page of profiles matching search, in sort order.
+
+        search matches a prefix of the name or city through their indexes,
+        and from three characters on any substring through the trigram
+        index. Pages use keyset pagination: pass the cursor of the last row
+        of the previous page as ``after``. Returns a list of (cursor, profile).
+        """
+        column = self.SORT_COLUMNS[sort]
+        limit = limit or self.PAGE_SIZE
+        search = search.strip().lower()
+        where = []
+        params = []
+
+        if search and len(search) >= 3 and self.fts:
+            where.append("id IN (SELECT rowid FROM profiles_fts WHERE profiles_fts MATCH ?)")
+            params.append('"' + search.replace('"', '""') + '"')
+        elif search and len(search) >= 3:
+            where.append("(name_key LIKE ? ESCAPE '\\' OR city_key LIKE ? ESCAPE '\\')")
+            pattern = "%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            params += [pattern, pattern]
+        elif search:
+            where.append("((name_key >= ? AND name_key < ?) OR (city_key >= ? AND city_key < ?))")
+            params += [search, search + "\uffff", search, search + "\uffff"]
+
+        op = "<" if descending else ">"
+        if after is not None:
+            if column == "id":
+                where.append(f"id {op} ?")
+                params.append(after[1])
+            else:
+                where.append(f"({column}, id) {op} (?, ?)")
+                params += list(after)
+
+        order = "DESC" if descending else "ASC"
+        order_by = "id" if column == "id" else f"{column} {order}, id"
+        sql = (f"SELECT {column}, id, " + self.SELECT_SQL.strip()[len("SELECT"):] +
+               (" WHERE " + " AND ".join(where) if where else "") +
+               f" ORDER BY {order_by} {order} LIMIT ?")
+        with self.lock:
+            rows = self.conn.execute(sql, params + [limit]).fetchall()
+        return [((row[0], row[1]), self.profile_from_row(row[2:])) for row in rows]
+
+    def migrate_from_json(self, json_path):
+        """Import a profiles.json (one JSON object per line) file.
+
+        Duplicate names keep the last record in the file, matching what
+        the old save_profile left behind. Returns the number of records read.
+        """
+        profiles = []
+        with open(json_path, "r") as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    profiles.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"Skipping line {line_no} of {json_path}: {e}")
+        self.save_many(p for p in profiles if str(p.get("name", "")).strip())
+        return len(profiles)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,253 @@
+"""Birth time rectification over a time window.
+
+Within a window the KP lords of the ascendant, the twelve cusps and the
+Moon only change at a finite set of instants: whenever one of them enters
+a new sign or sub. The event finder enumerates those instants (the angles
+through AngleFinder, the Moon as a body), which splits the window into
+segments where every lord is constant. Each segment is then scored once,
+from the chart at its middle, by a list of scorers, in a process pool for
+wide windows, and runs of equally scored segments are ranked as candidate
+birth time intervals. Scorers take the charts of a chunk of segments at
+once (score_charts), so they can vectorize over the candidates.
+
+Birth times are entered like calculate_chart's (India time); positions
+are geocentric, as the event finder's are.
+"""
+import os
+import sys
+import contextlib
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import swisseph as swe
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.astro_calc import AstroCalc, DashaCalculator
+from utils.event_finder import EventFinder
+from utils.house_strength import SIGN_LORDS
+from utils.kp import house_bits, kp_sub, significators
+
+# calculate_chart treats entered times as UTC + 5:30
+BIRTH_TIME_OFFSET = timedelta(hours=5, minutes=30)
+ANGLES = ["Ascendant"] + [f"House_{house}" for house in range(1, 13)]
+# Houses a dasha lord must signify for common life events
+EVENT_HOUSES = {
+    "marriage": [2, 7, 11],
+    "job": [2, 6, 10, 11],
+    "child": [2, 5, 11],
+    "education": [4, 9, 11],
+    "property": [4, 11, 12],
+    "travel": [3, 9, 12]
+}
+# Set bits of every 12-bit house mask
+HOUSE_COUNTS = np.array([bin(bits).count("1") for bits in range(1 << 12)])
+
+class AngleFinder(EventFinder):
+    """EventFinder for the ascendant and house cusps at one place.
+
+    Angles always move forwards; speeds are taken from a short difference.
+    """
+
+    STEP_DAYS = {}
+    DEFAULT_STEP_DAYS = 10 / 1440
+    SPEED_STEP_DAYS = 1 / 86400
+
+    def __init__(self, lat, lon, house_system="Placidus", calc=None, zodiac="Sidereal", ayanamsa="Lahiri"):
+        super().__init__(calc, zodiac, ayanamsa)
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.house_system = self.calc.house_system_map[house_system]
+
+    def angle(self, name, julian_day):
+        cusps, ascmc = swe.houses_ex(julian_day, self.lat, self.lon, self.house_system)
+        longitude = ascmc[0] if name == "Ascendant" else cusps[int(name.split("_")[1]) - 1]
+        if self.zodiac == "Sidereal":
+            swe.set_sid_mode(self.calc.ayanamsa_map[self.ayanamsa])
+            longitude -= swe.get_ayanamsa(julian_day)
+        return longitude % 360
+
+    def positions(self, body, julian_days):
+        julian_days = np.asarray(julian_days, dtype=float)
+        longitudes = np.array([self.angle(body, julian_day) for julian_day in julian_days.ravel()])
+        later = np.array([self.angle(body, julian_day + self.SPEED_STEP_DAYS) for julian_day in julian_days.ravel()])
+        speeds = ((later - longitudes + 180) % 360 - 180) / self.SPEED_STEP_DAYS
+        return longitudes.reshape(julian_days.shape), speeds.reshape(julian_days.shape)
+
+class LordCriteria:
+    """Scores a chart by required lords.
+
+    Each criterion is a dict: point ("Ascendant", "House_7", "Moon", any
+    body), lord ("sign_lord", "star_lord" or "sub_lord"), in (accepted
+    planets) and an optional weight (default 1).
+    """
+
+    def __init__(self, criteria):
+        self.criteria = criteria
+
+    def lord(self, chart, point, lord):
+        data = chart["houses"].get(point) or chart["points"][point]
+        if lord == "sign_lord":
+            return SIGN_LORDS[data["sign"]]
+        if lord not in data:
+            data = kp_sub(data["longitude"])
+        return data[lord]
+
+    def score(self, chart):
+        return sum(criterion.get("weight", 1.0) for criterion in self.criteria
+                   if self.lord(chart, criterion["point"], criterion["lord"]) in criterion["in"])
+
+    def score_charts(self, charts):
+        return [self.score(chart) for chart in charts]
+
+class DashaEventScorer:
+    """Scores charts by whether the dasha lords running at dated life
+    events signify the houses of those events.
+
+    Each event is a dict: date (a datetime, entered like the birth time),
+    kind (an EVENT_HOUSES key) or houses, and an optional weight (default
+    1). At each of the levels (dasha, bhukti, ...) the running lord earns
+    the share of the event houses it signifies; an event scores its weight
+    times the average over the levels. Inside a segment the dasha dates
+    still drift with the birth time (by a few days per half hour); they
+    are taken at the segment middle.
+    """
+
+    EPOCH = datetime(1900, 1, 1)
+
+    def __init__(self, events, levels=2):
+        self.dashas = DashaCalculator()
+        self.levels = levels
+        self.event_minutes = np.array([self.minutes(event["date"]) for event in events])
+        self.event_bits = np.array([house_bits(event.get("houses") or EVENT_HOUSES[event["kind"]])
+                                    for event in events], dtype=np.int64)
+        self.weights = np.array([event.get("weight", 1.0) for event in events])
+
+    def minutes(self, when):
+        return (when - self.EPOCH).total_seconds() / 60
+
+    def score_charts(self, charts):
+        """Scores of many charts, vectorized over charts, events and levels"""
+        births = np.array([self.minutes(datetime.strptime(chart["meta"]["datetime"], "%Y-%m-%d %H:%M:%S"))
+                           for chart in charts])
+        moons = np.array([chart["points"]["Moon"]["longitude"] for chart in charts])
+        # (levels, charts, events) indices into dasha_order
+        lords = self.dashas.lord_indices(births[:, None], moons[:, None], self.event_minutes, self.levels)
+        bits = np.array([[signified[lord] for lord in self.dashas.dasha_order]
+                         for signified in map(significators, charts)])
+        signified = bits[np.arange(len(charts))[:, None], lords] & self.event_bits
+        shares = HOUSE_COUNTS[signified] / HOUSE_COUNTS[self.event_bits]
+        return list(shares.mean(axis=0) @ self.weights)
+
+    def score(self, chart):
+        return self.score_charts([chart])[0]
+
+# One Rectifier per worker process (pyswisseph keeps global state)
+worker_rectifier = None
+
+def init_worker(settings):
+    global worker_rectifier
+    worker_rectifier = Rectifier(**settings)
+
+def score_chunk(segments, scorers):
+    return worker_rectifier.score_batch(segments, scorers)
+
+class Rectifier:
+    """Rectifies a birth time at one place with one set of chart settings"""
+
+    def __init__(self, lat, lon, zodiac="Sidereal", ayanamsa="Krishnamurti",
+                 house_system="Placidus", node_type="True Node (Rahu/Ketu)"):
+        self.settings = {"lat": float(lat), "lon": float(lon), "zodiac": zodiac, "ayanamsa": ayanamsa,
+                         "house_system": house_system, "node_type": node_type}
+        self.calc = AstroCalc()
+        self.moon_finder = EventFinder(self.calc, zodiac, ayanamsa, node_type)
+        self.angle_finder = AngleFinder(lat, lon, house_system, self.calc, zodiac, ayanamsa)
+
+    def julian_day(self, birth_time):
+        """Julian Day of an entered birth time"""
+        return self.calc.julian_day_utc(birth_time - BIRTH_TIME_OFFSET)
+
+    def birth_time(self, julian_day):
+        """Entered birth time (naive, whole seconds) of a Julian Day"""
+        moment = self.calc.datetime_utc(julian_day).replace(tzinfo=None) + BIRTH_TIME_OFFSET
+        return moment.replace(microsecond=0) + timedelta(seconds=round(moment.microsecond / 1e6))
+
+    def changes(self, start_jd, end_jd):
+        """Sorted sign and sub ingress events of the angles and the Moon"""
+        events = self.moon_finder.events(start_jd, end_jd, bodies=["Moon"], kinds=["sign", "sub"])
+        events += self.angle_finder.events(start_jd, end_jd, bodies=ANGLES, kinds=["sign", "sub"])
+        events.sort(key=lambda event: event["julian_day"])
+        return events
+
+    def segments(self, start, end):
+        """Split the window between two entered birth times into segments
+        with constant angle and Moon lords.
+
+        A segment is a dict: start, end (Julian Days), start_time, end_time
+        (entered birth times), seconds and changes (what changed at its start).
+        """
+        start_jd, end_jd = self.julian_day(start), self.julian_day(end)
+        bounds = [(start_jd, [])]
+        for event in self.changes(start_jd, end_jd):
+            change = f"{event['body']} {event['kind']} {event['from']} -> {event['to']}"
+            # Events within a second are one instant (e.g. cusp 1 and the ascendant)
+            if event["julian_day"] - bounds[-1][0] < 1 / 86400:
+                bounds[-1][1].append(change)
+            else:
+                bounds.append((event["julian_day"], [change]))
+        bounds.append((end_jd, []))
+
+        return [{
+            "start": segment_start,
+            "end": segment_end,
+            "start_time": self.birth_time(segment_start),
+            "end_time": self.birth_time(segment_end),
+            "seconds": (segment_end - segment_start) * 86400,
+            "changes": changes
+        } for (segment_start, changes), (segment_end, _) in zip(bounds, bounds[1:]) if segment_end > segment_start]
+
+    def chart_at(self, julian_day):
+        """Geocentric chart for a Julian Day (debug output suppressed)"""
+        settings = self.settings
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            return self.calc.calculate_chart(
+                self.birth_time(julian_day), settings["lat"], settings["lon"], calc_type="Geocentric",
+                zodiac=settings["zodiac"], ayanamsa=settings["ayanamsa"],
+                house_system=settings["house_system"], node_type=settings["node_type"])
+
+    def score_batch(self, segments, scorers):
+        """Scores of segments, from the charts at their middles"""
+        charts = [self.chart_at((segment["start"] + segment["end"]) / 2) for segment in segments]
+        per_scorer = [scorer.score_charts(charts) for scorer in scorers]
+        return [{"scores": [float(score) for score in scores], "score": float(sum(scores))}
+                for scores in zip(*per_scorer)]
+
+    def score_segments(self, segments, scorers, workers=0, chunk_size=50):
+        """Score every segment, in ``workers`` processes (0: in this process)"""
+        chunks = [segments[i:i + chunk_size] for i in range(0, len(segments), chunk_size)]
+        if workers == 0 or len(chunks) <= 1:
+            return [result for chunk in chunks for result in self.score_batch(chunk, scorers)]
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self.settings,)) as pool:
+            results = pool.map(score_chunk, chunks, [scorers] * len(chunks))
+            return [result for chunk in results for result in chunk]
+
+    def rank(self, start, end, scorers, workers=0, top=None):
+        """Candidate birth time intervals between start and end, best first.
+
+        Neighbouring segments with the same score merge into one candidate:
+        a dict with start_time, end_time, seconds, score, the per-scorer
+        scores and the segments it spans.
+        """
+        segments = self.segments(start, end)
+        results = self.score_segments(segments, scorers, workers)
+
+        candidates = []
+        for segment, result in zip(segments, results):
+            if candidates and candidates[-1]["score"] == result["score"]:
+                candidate = candidates[-1]
+                candidate.update(end=segment["end"], end_time=segment["end_time"])
+                candidate["seconds"] += segment["seconds"]
+                candidate["segments"] += 1
+            else:
+                candidates.append(dict(segment, score=result["score"], scores=result["scores"], segments=1))
+        candidates.sort(key=lambda candidate: (-candidate["score"], -candidate["seconds"]))
+        return candidates[:top] if top else candidates
@@ -0,0 +1,139 @@
+"""KP ruling planets for any moment.
+
+The ruling planets are the sign, star and sub lords of the ascendant and of
+the Moon, plus the lord of the weekday (the day runs from sunrise to
+sunrise). They only change when the ascendant or the Moon crosses one of
+the 249 KP sub starts, or at sunrise, so a live display can compute them
+once and sleep until ``next_change``.
+"""
+import os
+import sys
+import numpy as np
+import swisseph as swe
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.astro_calc import AstroCalc
+from utils.house_strength import SIGN_LORDS
+from utils.kp import SUB_STARTS, kp_sub
+from utils.event_finder import EventFinder
+
+# Weekday lords, Monday first (swe.day_of_week numbering)
+DAY_LORDS = ["Moon", "Mars", "Mercury", "Jupiter", "Venus", "Saturn", "Sun"]
+
+class LagnaTable:
+    """The ascendant over one day at a location, sampled every few minutes.
+
+    The ascendant only moves forwards, so the time it reaches a longitude is
+    an interpolation in the table plus a couple of exact refinement steps.
+    """
+
+    def __init__(self, calc, lat, lon, zodiac="Sidereal", ayanamsa="Krishnamurti", step_minutes=4):
+        self.calc = calc
+        self.lat = lat
+        self.lon = lon
+        self.zodiac = zodiac
+        self.ayanamsa = ayanamsa
+        self.step = step_minutes / 1440
+        self.julian_days = None
+        self.unwrapped = None
+
+    def build(self, start_jd):
+        self.julian_days = start_jd + np.arange(0, 1 + self.step, self.step)
+        ascendants = [self.ascendant(julian_day) for julian_day in self.julian_days]
+        self.unwrapped = np.degrees(np.unwrap(np.radians(ascendants)))
+
+    def ascendant(self, julian_day):
+        return self.calc.ascendant(julian_day, self.lat, self.lon, self.zodiac, self.ayanamsa)
+
+    def time_of(self, julian_day, longitude):
+        """First time after julian_day the ascendant reaches a longitude"""
+        if self.julian_days is None or not self.julian_days[0] <= julian_day < self.julian_days[-2]:
+            self.build(julian_day)
+        now = np.interp(julian_day, self.julian_days, self.unwrapped)
+        target = now + (longitude - now) % 360
+        if target > self.unwrapped[-1]:
+            self.build(julian_day)
+            now = self.unwrapped[0]
+            target = now + (longitude - now) % 360
+        index = min(np.searchsorted(self.unwrapped, target), len(self.julian_days) - 1)
+        rate = (self.unwrapped[index] - self.unwrapped[index - 1]) / self.step
+        time = np.interp(target, self.unwrapped, self.julian_days)
+        for _ in range(3):
+            offset = (self.ascendant(time) - longitude + 180) % 360 - 180
+            time -= offset / rate
+        return float(time)
+
+class RulingPlanets:
+    """Ruling planets at one location, with cached sunrises and lagna table"""
+
+    def __init__(self, lat, lon, zodiac="Sidereal", ayanamsa="Krishnamurti", calc=None):
+        self.calc = calc or AstroCalc()
+        self.lat = float(lat)
+        self.lon = float(lon)
+        self.zodiac = zodiac
+        self.ayanamsa = ayanamsa
+        self.lagna = LagnaTable(self.calc, self.lat, self.lon, zodiac, ayanamsa)
+        self.finder = EventFinder(self.calc, zodiac, ayanamsa)
+        self.day = None  # (sunrise, next sunrise, day lord)
+
+    def next_sunrise(self, julian_day):
+        result, times = swe.rise_trans(julian_day, swe.SUN, swe.CALC_RISE, (self.lon, self.lat, 0))
+        return times[0] if result == 0 else None
+
+    def day_lord(self, julian_day):
+        """Lord of the day (sunrise to sunrise) and when it ends"""
+        if self.day is None or not self.day[0] <= julian_day < self.day[1]:
+            sunrise = self.next_sunrise(julian_day - 1)
+            if sunrise is not None and sunrise > julian_day:
+                sunrise = self.next_sunrise(julian_day - 1.5)
+            following = self.next_sunrise(julian_day)
+            if sunrise is None or following is None:
+                # No sunrise (polar day or night): the local mean time day
+                local = julian_day + self.lon / 360
+                sunrise = np.floor(local - 0.5) + 0.5 - self.lon / 360
+                following = sunrise + 1
+            # The weekday of the sunrise, by local mean time
+            self.day = (sunrise, following, DAY_LORDS[swe.day_of_week(sunrise + self.lon / 360)])
+        return self.day[2], self.day[1]
+
+    def lords(self, longitude):
+        sub = kp_sub(longitude)
+        return {"longitude": longitude, "sign": sub["sign"], "sign_lord": SIGN_LORDS[sub["sign"]],
+                "star_lord": sub["star_lord"], "sub_lord": sub["sub_lord"]}
+
+    def calculate(self, when=None):
+        """Ruling planets at a Julian Day or datetime (default: now).
+
+        Returns the ascendant and Moon lords, the day lord, the ruling
+        planets in that order without repeats, and next_change: the Julian
+        Day when any of them changes next.
+        """
+        julian_day = self.calc.julian_day_utc() if when is None else self.finder.julian_day(when)
+        ascendant = self.lords(self.calc.ascendant(julian_day, self.lat, self.lon, self.zodiac, self.ayanamsa))
+        moon = self.lords(float(self.finder.positions("Moon", [julian_day])[0][0]))
+        day_lord, day_end = self.day_lord(julian_day)
+
+        ruling = []
+        for lord in [ascendant["sign_lord"], ascendant["star_lord"], ascendant["sub_lord"],
+                     moon["sign_lord"], moon["star_lord"], moon["sub_lord"], day_lord]:
+            if lord not in ruling:
+                ruling.append(lord)
+
+        # The next sub start ahead of the ascendant; the Moon's next sub or sign ingress
+        next_start = SUB_STARTS[kp_sub(ascendant["longitude"])["number"] % len(SUB_STARTS)]
+        changes = {"ascendant": self.lagna.time_of(julian_day, next_start), "day": day_end}
+        moon_events = self.finder.events(julian_day, julian_day + 1, bodies=["Moon"], kinds=["sign", "sub"])
+        if moon_events:
+            changes["moon"] = moon_events[0]["julian_day"]
+        next_part = min(changes, key=changes.get)
+
+        return {
+            "julian_day": julian_day,
+            "time": self.calc.datetime_utc(julian_day),
+            "ascendant": ascendant,
+            "moon": moon,
+            "day_lord": day_lord,
+            "ruling_planets": ruling,
+            "next_change": changes[next_part],
+            "next_change_part": next_part
+        }
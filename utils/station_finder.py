@@ -0,0 +1,100 @@
+"""Retrograde and direct stations of the planets.
+
+A station is where a body's longitudinal speed crosses zero. Speeds are
+sampled on a grid spaced well inside the shortest retrograde or direct
+phase, and each sign change is bisected down to a fraction of a second
+(EventFinder.speed_roots). The stations of a span of years form a catalog
+per body, kept as sorted arrays of retrograde interval starts and ends, so
+"is X retrograde at D" is one binary search.
+"""
+import os
+import sys
+import bisect
+from datetime import datetime
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.event_finder import EventFinder
+
+class StationCatalog:
+    """Stations and retrograde intervals of the planets between two years.
+
+    The catalog of a body is built on first use. A station is a dict like an
+    EventFinder event: julian_day, time, body, kind ("retrograde" where the
+    body turns backwards, "direct" where it turns forwards) and longitude.
+    """
+
+    BODIES = ["Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+    # Sampling in days, well under each planet's shortest retrograde phase
+    STEP_DAYS = {"Mercury": 4.0, "Venus": 4.0, "Mars": 4.0}
+    DEFAULT_STEP_DAYS = 8.0
+
+    def __init__(self, finder=None, start_year=1900, end_year=2100):
+        self.finder = finder or EventFinder()
+        self.calc = self.finder.calc
+        self.start_jd = self.calc.julian_day_utc(datetime(start_year, 1, 1))
+        self.end_jd = self.calc.julian_day_utc(datetime(end_year, 1, 1))
+        self.catalog = {}
+
+    def find_stations(self, body, start, end):
+        """Stations of a body between start and end (Julian Days or datetimes)"""
+        start_jd, end_jd = self.finder.julian_day(start), self.finder.julian_day(end)
+        step = self.STEP_DAYS.get(body, self.DEFAULT_STEP_DAYS)
+        julian_days = np.append(np.arange(start_jd, end_jd, step), end_jd)
+        speeds = self.finder.positions(body, julian_days)[1]
+        turns = np.nonzero(speeds[:-1] * speeds[1:] < 0)[0]
+        times = self.finder.speed_roots(body, julian_days[turns], julian_days[turns + 1])
+        longitudes = self.finder.positions(body, times)[0] if len(times) else []
+
+        return [{
+            "julian_day": float(julian_day),
+            "time": self.calc.datetime_utc(julian_day),
+            "body": body,
+            "kind": "retrograde" if speeds[turn] > 0 else "direct",
+            "longitude": float(longitude)
+        } for turn, julian_day, longitude in zip(turns, times, longitudes)]
+
+    def body_catalog(self, body):
+        """Stations of a body over the catalog span, plus its retrograde
+        intervals as sorted (starts, ends) arrays"""
+        if body not in self.catalog:
+            stations = self.find_stations(body, self.start_jd, self.end_jd)
+            starts = [station["julian_day"] for station in stations if station["kind"] == "retrograde"]
+            ends = [station["julian_day"] for station in stations if station["kind"] == "direct"]
+            # Open intervals at the edges of the span
+            if ends and (not starts or ends[0] < starts[0]):
+                starts.insert(0, self.start_jd)
+            if len(starts) > len(ends):
+                ends.append(self.end_jd)
+            self.catalog[body] = {"stations": stations, "starts": np.array(starts), "ends": np.array(ends)}
+        return self.catalog[body]
+
+    def stations(self, body, start=None, end=None):
+        """Catalogued stations of a body, optionally only those between start and end"""
+        stations = self.body_catalog(body)["stations"]
+        start_jd = self.start_jd if start is None else self.finder.julian_day(start)
+        end_jd = self.end_jd if end is None else self.finder.julian_day(end)
+        return [station for station in stations if start_jd <= station["julian_day"] < end_jd]
+
+    def retrograde_intervals(self, body, start=None, end=None):
+        """(start, end) Julian Days of the retrograde periods overlapping start..end"""
+        catalog = self.body_catalog(body)
+        start_jd = self.start_jd if start is None else self.finder.julian_day(start)
+        end_jd = self.end_jd if end is None else self.finder.julian_day(end)
+        first = np.searchsorted(catalog["ends"], start_jd, side="right")
+        last = np.searchsorted(catalog["starts"], end_jd, side="left")
+        return [(float(catalog["starts"][i]), float(catalog["ends"][i])) for i in range(first, last)]
+
+    def is_retrograde(self, body, when):
+        """Whether a body is retrograde at a Julian Day or datetime.
+
+        Outside the catalog span the speed is calculated directly.
+        """
+        julian_day = self.finder.julian_day(when)
+        if body not in self.BODIES:
+            raise ValueError(f"No stations are catalogued for {body}")
+        if not self.start_jd <= julian_day < self.end_jd:
+            return bool(self.finder.positions(body, [julian_day])[1][0] < 0)
+        catalog = self.body_catalog(body)
+        index = bisect.bisect_right(catalog["starts"], julian_day) - 1
+        return index >= 0 and julian_day < catalog["ends"][index]
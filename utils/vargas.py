@@ -0,0 +1,85 @@
+"""Divisional charts (vargas) D1 to D60.
+
+A varga splits each sign into n equal parts and maps part k of a sign to
+start + step * k signs on, where start and step depend on the sign
+(Parashara's rules: odd/even, movable/fixed/dual or element). Kept as
+per-sign start and step arrays, every equal-part varga is one vectorized
+expression over any array of sidereal longitudes. The Trimsamsa (D30),
+with its unequal parts, is a degree table per odd/even sign instead.
+"""
+import numpy as np
+
+SIGNS = ['Aries', 'Taurus', 'Gemini', 'Cancer', 'Leo', 'Virgo',
+         'Libra', 'Scorpio', 'Sagittarius', 'Capricorn', 'Aquarius', 'Pisces']
+
+SIGN_INDEX = np.arange(12)
+ODD = SIGN_INDEX % 2 == 0  # Aries, Gemini, ... (counted from 1)
+# Movable, fixed, dual; fire, earth, air, water
+QUALITY = SIGN_INDEX % 3
+ELEMENT = SIGN_INDEX % 4
+
+def by_odd(odd, even):
+    return np.where(ODD, odd, even)
+
+def by_quality(movable, fixed, dual):
+    return np.array([movable, fixed, dual])[QUALITY]
+
+# number -> (name, start sign per sign, step per part per sign)
+VARGAS = {
+    1: ("Rasi", SIGN_INDEX, 0),
+    2: ("Hora", by_odd(4, 3), by_odd(-1, 1)),  # Odd: Sun (Leo) then Moon (Cancer)
+    3: ("Drekkana", SIGN_INDEX, 4),
+    4: ("Chaturthamsa", SIGN_INDEX, 3),
+    7: ("Saptamsa", by_odd(SIGN_INDEX, SIGN_INDEX + 6), 1),
+    9: ("Navamsa", np.array([0, 9, 6, 3])[ELEMENT], 1),  # Fire from Aries, earth Capricorn, ...
+    10: ("Dasamsa", by_odd(SIGN_INDEX, SIGN_INDEX + 8), 1),
+    12: ("Dwadasamsa", SIGN_INDEX, 1),
+    16: ("Shodasamsa", by_quality(0, 4, 8), 1),
+    20: ("Vimsamsa", by_quality(0, 8, 4), 1),
+    24: ("Chaturvimsamsa", by_odd(4, 3), 1),
+    27: ("Saptavimsamsa", np.array([0, 3, 6, 9])[ELEMENT], 1),
+    30: ("Trimsamsa", None, None),
+    40: ("Khavedamsa", by_odd(0, 6), 1),
+    45: ("Akshavedamsa", by_quality(0, 4, 8), 1),
+    60: ("Shashtiamsa", SIGN_INDEX, 1)
+}
+VARGA_NUMBERS = list(VARGAS)
+
+# Trimsamsa: degree limits within the sign and the sign each part maps to
+TRIMSAMSA_LIMITS = {
+    True: ([5, 10, 18, 25, 30], [0, 10, 8, 2, 6]),   # Mars, Saturn, Jupiter, Mercury, Venus
+    False: ([5, 12, 20, 25, 30], [1, 5, 11, 9, 7])   # Venus, Mercury, Jupiter, Saturn, Mars
+}
+
+def varga_signs(longitudes, number):
+    """Sign indices (0-11) of longitudes in the D<number> chart, same shape"""
+    longitudes = np.asarray(longitudes, dtype=float) % 360
+    sign = (longitudes // 30).astype(np.int64) % 12
+    degree = longitudes - sign * 30
+    if number == 30:
+        odd_limits, odd_signs = TRIMSAMSA_LIMITS[True]
+        even_limits, even_signs = TRIMSAMSA_LIMITS[False]
+        odd = np.array(odd_signs)[np.minimum(np.searchsorted(odd_limits, degree, side="right"), 4)]
+        even = np.array(even_signs)[np.minimum(np.searchsorted(even_limits, degree, side="right"), 4)]
+        return np.where(ODD[sign], odd, even)
+    _, starts, steps = VARGAS[number]
+    part = np.minimum((degree * number / 30).astype(np.int64), number - 1)
+    return (np.broadcast_to(starts, 12)[sign] + np.broadcast_to(steps, 12)[sign] * part) % 12
+
+def varga_matrix(longitudes, numbers=None):
+    """Signs of longitudes (..., bodies) in each varga: (..., vargas, bodies)"""
+    return np.stack([varga_signs(longitudes, number) for number in numbers or VARGA_NUMBERS], axis=-2)
+
+def column_vargas(columns, body, number):
+    """Signs of one body in D<number> for every chart of a columnar file,
+    e.g. column_vargas(columns, "Venus", 9) for the navamsa Venus"""
+    return varga_signs(columns["longitude"][:, columns.body_index(body)], number)
+
+def chart_vargas(chart):
+    """The varga sign matrix of a chart dict, cached in chart["vargas"]:
+    numbers (vargas), bodies and signs (vargas x bodies sign indices)"""
+    if "vargas" not in chart:
+        bodies = list(chart["points"])
+        longitudes = [chart["points"][body]["longitude"] for body in bodies]
+        chart["vargas"] = {"numbers": VARGA_NUMBERS, "bodies": bodies, "signs": varga_matrix(longitudes)}
+    return chart["vargas"]